@@ -0,0 +1,218 @@
+# benchmarks/run_benchmarks.py
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+import numpy as np
+
+from benchmarks.synthetic_data import generate_market_data
+from src.data.data_manager import DataManager
+from src.data.market_store import MarketDataStore
+from src.indicators.indicator_store import IndicatorStore
+from src.indicators.indicators import atr
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.risk.risk_manager import RiskManager
+from src.strategies.precomputed_signal_strategy import PrecomputedSignalStrategy
+from src.strategies.sopr_ema_strategy import SoprEmaStrategy
+from src.strategies.asymmetrical_ema_strategy import AsymmetricalEmaStrategy
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+
+DEFAULT_SIZES = [1_000, 100_000, 10_000_000]
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+STRATEGIES = [SoprEmaStrategy, AsymmetricalEmaStrategy, MovingAverageCrossoverStrategy]
+
+
+def measure(func, repeat=1, track_memory=True):
+    """
+    Times a stage and records its peak memory.
+
+    The timing is the best of `repeat` untraced runs; the peak memory comes from
+    one extra run under tracemalloc, so tracing never skews the timings.
+
+    Returns:
+        dict: 'seconds' and 'peak_memory_mb' (None when memory tracking is off).
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    peak_memory_mb = None
+    if track_memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_memory_mb = tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+    return {'seconds': best, 'peak_memory_mb': peak_memory_mb}
+
+
+def build_stages(data, work_dir, max_loop_bars):
+    """
+    Prepares every benchmark stage for one dataset.
+
+    Returns:
+        list: (stage name, zero-argument callable) pairs.
+    """
+    data_manager = DataManager()
+    ohlcv = data[['open', 'high', 'low', 'close', 'volume']]
+
+    csv_path = os.path.join(work_dir, 'bench.csv')
+    data.to_csv(csv_path)
+    partition = MarketDataStore(os.path.join(work_dir, 'store')).write('BENCH/USDT', '1m', data)
+
+    market = data.copy()
+    market['atr'] = atr(market['high'], market['low'], market['close'], window=14)
+    market = market.dropna()
+    signals = SoprEmaStrategy(indicator_store=IndicatorStore()).generate_signals(market)['signal']
+
+    stages = [
+        ('load_data:csv', lambda: data_manager.load_data(csv_path)),
+        ('load_data:store', lambda: data_manager.load_data(partition)),
+        ('clean_and_validate_data', lambda: data_manager.clean_and_validate_data(ohlcv)),
+        ('atr', lambda: atr(data['high'], data['low'], data['close'], window=14)),
+    ]
+    for strategy_class in STRATEGIES:
+        # A fresh indicator store per call so the cache never hides the computation
+        stages.append((f"generate_signals:{strategy_class.__name__}",
+                       lambda cls=strategy_class: cls(indicator_store=IndicatorStore()).generate_signals(market)))
+
+    engines = ['vectorized'] + (['loop', 'stream'] if len(data) <= max_loop_bars else [])
+    for engine in engines:
+        # The loop and vectorized engines replay precomputed signals to isolate execution
+        strategy = SoprEmaStrategy(indicator_store=IndicatorStore()) if engine == 'stream' else PrecomputedSignalStrategy(signals)
+        portfolio_manager = PortfolioManager(market, {'default': strategy}, RiskManager(),
+                                             commission_pct=0.001, slippage_pct=0.0005, engine=engine)
+        stages.append((f"run_backtest:{engine}", portfolio_manager.run_backtest))
+    return stages
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=1, stages=None, max_loop_bars=100_000, track_memory=True, seed=0):
+    """
+    Runs the benchmark suite on synthetic data of each size.
+
+    Args:
+        sizes (list): Dataset sizes in bars.
+        repeat (int): Timed runs per stage (the best is kept).
+        stages (list, optional): Stage name prefixes to run, e.g. ['load_data', 'run_backtest'].
+        max_loop_bars (int): Largest dataset for the per-bar loop and stream engines.
+        track_memory (bool): Whether to record peak memory per stage.
+        seed (int): The random seed for the synthetic data.
+
+    Returns:
+        dict: 'metadata' about the environment and a 'results' list of per-stage rows.
+    """
+    rows = []
+    for n_bars in sizes:
+        data = generate_market_data(n_bars, seed=seed)
+        work_dir = tempfile.mkdtemp(prefix='bench_')
+        try:
+            for name, func in build_stages(data, work_dir, max_loop_bars):
+                if stages and not any(name.startswith(prefix) for prefix in stages):
+                    continue
+                row = {'size': n_bars, 'stage': name}
+                row.update(measure(func, repeat=repeat, track_memory=track_memory))
+                rows.append(row)
+                memory = f"{row['peak_memory_mb']:10.1f} MB" if row['peak_memory_mb'] is not None else ''
+                print(f"{n_bars:>12,} bars  {name:<48} {row['seconds']:10.4f} s {memory}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return {'metadata': environment_metadata(), 'results': rows}
+
+
+def environment_metadata():
+    """Describes the machine and code version a benchmark ran on."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def save_results(report, results_dir=RESULTS_DIR):
+    """Saves a report as timestamped JSON and returns its path."""
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def latest_results(results_dir=RESULTS_DIR, exclude=None):
+    """Returns the path of the most recent saved report, or None."""
+    paths = sorted(p for p in glob.glob(os.path.join(results_dir, '*.json')) if p != exclude)
+    return paths[-1] if paths else None
+
+
+def compare_results(baseline, current, threshold=1.2):
+    """
+    Compares two reports stage by stage.
+
+    Args:
+        baseline (dict): The earlier report.
+        current (dict): The new report.
+        threshold (float): The slowdown ratio above which a stage counts as a regression.
+
+    Returns:
+        pd.DataFrame: Per (size, stage) the baseline and current seconds and memory,
+            their ratios, and a 'regression' flag.
+    """
+    old = pd.DataFrame(baseline['results']).set_index(['size', 'stage'])
+    new = pd.DataFrame(current['results']).set_index(['size', 'stage'])
+    table = old.join(new, lsuffix='_baseline', rsuffix='_current', how='inner')
+    table['time_ratio'] = table['seconds_current'] / table['seconds_baseline']
+    table['memory_ratio'] = table['peak_memory_mb_current'] / table['peak_memory_mb_baseline']
+    table['regression'] = table['time_ratio'] > threshold
+    return table.reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the backtest hot paths on synthetic data.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--stages', nargs='+', help="Only run stages starting with these names.")
+    parser.add_argument('--max-loop-bars', type=int, default=100_000)
+    parser.add_argument('--no-memory', action='store_true', help="Skip peak memory tracking.")
+    parser.add_argument('--compare', nargs='?', const='latest', help="A report to compare against (default: the latest).")
+    parser.add_argument('--threshold', type=float, default=1.2)
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.sizes, repeat=args.repeat, stages=args.stages,
+                            max_loop_bars=args.max_loop_bars, track_memory=not args.no_memory)
+    path = save_results(report)
+    print(f"\nResults saved to {path}")
+
+    if args.compare:
+        baseline_path = latest_results(exclude=path) if args.compare == 'latest' else args.compare
+        if baseline_path is None:
+            print("No earlier results to compare against.")
+            return
+        with open(baseline_path) as f:
+            table = compare_results(json.load(f), report, threshold=args.threshold)
+        print(f"\nCompared with {baseline_path}:")
+        print(table[['size', 'stage', 'seconds_baseline', 'seconds_current', 'time_ratio', 'memory_ratio', 'regression']].to_string(index=False))
+        if table['regression'].any():
+            print(f"\n{table['regression'].sum()} stage(s) slowed down by more than {args.threshold - 1:.0%}.")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
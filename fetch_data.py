@@ -1,19 +1,38 @@
 # fetch_data.py
 
+import argparse
+
 from src.data.data_manager import DataManager
+from src.data.batch_downloader import BatchDownloader
 
 def main():
     """
-    Main function to download our baseline historical data.
+    Main function to download our historical data. Fetches our baseline BTC/USDT
+    daily series by default, or many symbols and timeframes concurrently.
     """
-    data_manager = DataManager()
-    
     # --- Configuration ---
     SYMBOL = 'BTC/USDT'
     TIMEFRAME = '1d' # Daily data
     START_DATE = '2018-01-01'
-    
-    data_manager.fetch_and_save_data(SYMBOL, TIMEFRAME, START_DATE)
+
+    parser = argparse.ArgumentParser(description="Download OHLCV data into the market data store.")
+    parser.add_argument('--symbols', nargs='+', default=[SYMBOL])
+    parser.add_argument('--timeframes', nargs='+', default=[TIMEFRAME])
+    parser.add_argument('--start', default=START_DATE)
+    parser.add_argument('--workers', type=int, default=8, help="Series fetched concurrently in batch mode.")
+    parser.add_argument('--rate', type=float, default=1.0, help="Exchange requests per second in batch mode.")
+    args = parser.parse_args()
+
+    if len(args.symbols) * len(args.timeframes) == 1:
+        DataManager().fetch_and_save_data(args.symbols[0], args.timeframes[0], args.start)
+        return
+
+    downloader = BatchDownloader(max_workers=args.workers, requests_per_second=args.rate)
+    report = downloader.download(args.symbols, args.timeframes, args.start)
+    failed = [key for key, result in report.items() if result['status'] == 'failed']
+    print(f"\nDownloaded {len(report) - len(failed)}/{len(report)} series.")
+    for symbol, timeframe in failed:
+        print(f"  FAILED: {symbol} {timeframe}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,102 +1,66 @@
 # main.py - (This is the complete, final version)
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import configparser
+import argparse
 
-# Import all agents, including our new final strategy
-from src.data.data_manager import DataManager
-from src.risk.risk_manager import RiskManager
-from src.strategies.sopr_ema_strategy import SoprEmaStrategy # <-- Import new strategy
-from src.portfolio.portfolio_manager import PortfolioManager
+from src.jobs.job_runner import JobRunner
+from src.profiling.stage_profiler import profiler
 
-def plot_results(results, data):
-    """Plots the equity curve and trade signals."""
-    fig, ax1 = plt.subplots(figsize=(15, 8))
-    
-    # Plot equity curve
-    ax1.plot(results.index, results['equity'], label='Portfolio Equity', color='blue')
-    ax1.set_title('Final Strategy Performance', fontsize=16)
-    ax1.set_xlabel('Date')
-    ax1.set_ylabel('Portfolio Value ($)', color='blue')
-    ax1.tick_params(axis='y', labelcolor='blue')
-    ax1.grid(True)
+DEFAULT_JOB = 'jobs/final_backtest.json'
 
-    # Create a second y-axis for the price
-    ax2 = ax1.twinx()
-    ax2.plot(data.index, data['close'], label='BTC Price', color='gray', alpha=0.5, linewidth=0.75)
-    ax2.set_ylabel('BTC Price ($)', color='gray')
-    ax2.tick_params(axis='y', labelcolor='gray')
-    ax2.set_yscale('log')
-    
-    # Plot buy and sell markers on the price chart
-    trades = results[results['trades'].notna()]
-    for idx, trade in trades['trades'].items():
-        if trade['type'] == 'buy':
-            ax2.scatter(idx, trade['price'], marker='^', color='green', s=150, zorder=5, label='Buy')
-        elif trade['type'] == 'sell':
-            ax2.scatter(idx, trade['price'], marker='v', color='red', s=150, zorder=5, label='Sell')
-    
-    # Consolidate legends
-    lines, labels = ax1.get_legend_handles_labels()
-    lines2, labels2 = ax2.get_legend_handles_labels()
-    # To avoid duplicate labels, we can use a dictionary
-    unique_labels = dict(zip(labels2 + labels, lines2 + lines))
-    ax2.legend(unique_labels.values(), unique_labels.keys())
-    
-    plt.show()
-
-def main():
-    """Main function to run the final backtest."""
-    # --- 1. Configuration & Data Loading ---
-    data_manager = DataManager()
-    
-    price_df = data_manager.load_data('data/BTC_USDT_1d.csv', index_col='timestamp')
-    sopr_df = data_manager.load_data('data/bitcoin_sopr_data.csv', index_col='date')
-    sopr_df.rename(columns={'sopr_value': 'sopr'}, inplace=True)
-    
-    # Combine data sources
-    data = pd.merge(price_df, sopr_df['sopr'], left_index=True, right_index=True, how='inner')
-    
-    # Calculate ATR for risk manager
-    high_low = data['high'] - data['low']
-    high_close = abs(data['high'] - data['close'].shift())
-    low_close = abs(data['low'] - data['close'].shift())
-    ranges = pd.concat([high_low, high_close, low_close], axis=1)
-    true_range = ranges.max(axis=1)
-    data['atr'] = true_range.rolling(window=14).mean()
-    data = data.dropna()
-    
-    # --- 2. Initialize Agents ---
-    risk_manager = RiskManager()
-    strategies = {
-        'default': SoprEmaStrategy() # Use our new final strategy
-    }
-    
-    # --- 3. Run Backtest ---
-    print("Initializing Portfolio Manager and running FINAL backtest...")
-    portfolio_manager = PortfolioManager(
-        data=data,
-        strategies=strategies,
-        risk_manager=risk_manager,
-        initial_capital=100000.0,
-        commission_pct=0.001,
-        slippage_pct=0.0005
-    )
-    results = portfolio_manager.run_backtest()
-    
-    # --- 4. Analyze and Display Results ---
-    final_equity = results['equity'].iloc[-1]
-    initial_capital = results['equity'].iloc[0]
-    total_return_pct = ((final_equity / initial_capital) - 1) * 100
-    
+def print_report(row):
+    """Prints the performance report of a single run from the job summary."""
     print("\n--- Backtest Finished ---")
-    print(f"Initial Capital: ${initial_capital:,.2f}")
-    print(f"Final Equity:    ${final_equity:,.2f}")
-    print(f"Total Return:    {total_return_pct:.2f}%")
+    print(f"Initial Capital: ${row['initial_capital']:,.2f}")
+    print(f"Final Equity:    ${row['final_equity']:,.2f}")
+    print(f"Total Return:    {row['total_return'] * 100:.2f}%")
+    print(f"Sharpe Ratio:    {row['sharpe_ratio']:.2f}")
+    print(f"Sortino Ratio:   {row['sortino_ratio']:.2f}")
+    print(f"Max Drawdown:    {row['max_drawdown'] * 100:.2f}% ({row['max_drawdown_duration']:.0f} bars)")
+    print(f"Calmar Ratio:    {row['calmar_ratio']:.2f}")
+    print(f"Exposure:        {row['exposure'] * 100:.2f}%")
+    print(f"Trades:          {row['trade_count']:.0f} (win rate {row['win_rate'] * 100:.1f}%)")
     print("-------------------------")
-    
-    plot_results(results, data)
+
+def print_summary(summary):
+    """Prints the best runs of a job, per backtest."""
+    columns = ['backtest', 'run_id', 'total_return', 'max_drawdown', 'sharpe_ratio', 'trade_count']
+    ranked = summary.sort_values(['backtest', 'total_return'], ascending=[True, False])
+    print("\n--- Job Finished ---")
+    print(ranked[columns].groupby('backtest', sort=False).head(10).to_string(index=False))
+
+def main():
+    """Runs the backtests of a job file (by default, the final backtest)."""
+    parser = argparse.ArgumentParser(description="Run the backtests described by a job file.")
+    parser.add_argument('job', nargs='?', default=DEFAULT_JOB, help=f"The JSON job file (default: {DEFAULT_JOB}).")
+    parser.add_argument('--workers', type=int, help="Number of worker processes (default: the job's setting or the CPU count).")
+    parser.add_argument('--output-dir', help="Write the results here instead of the job's output_dir.")
+    parser.add_argument('--plot', action='store_true', help="Plot every run, not just those whose outputs request it.")
+    parser.add_argument('--no-cache', action='store_true', help="Recompute the backtests instead of loading them from the result cache.")
+    parser.add_argument('--profile', action='store_true', help="Print per-stage timings and allocations.")
+    parser.add_argument('--cprofile-output', help="Also write a cProfile (pstats) dump to this path.")
+    parser.add_argument('--chunk-rows', type=int, help="Stream every dataset from the store in chunks of this many rows.")
+    args = parser.parse_args()
+    if args.profile or args.cprofile_output:
+        profiler.enable(track_allocations=args.profile, cprofile=bool(args.cprofile_output))
+
+    runner = JobRunner(args.job, output_dir=args.output_dir, max_workers=args.workers,
+                       use_cache=False if args.no_cache else None, plot=args.plot,
+                       chunk_rows=args.chunk_rows)
+    print(f"Running {len(runner.runs())} backtest(s) from {args.job}...")
+    summary = runner.run()
+
+    if len(summary) == 1:
+        print_report(summary.iloc[0])
+    else:
+        print_summary(summary)
+    print(f"Results written to {runner.output_dir}")
+
+    if profiler.enabled:
+        profiler.disable()
+        profiler.print_summary()
+        if args.cprofile_output:
+            profiler.dump_cprofile(args.cprofile_output)
+            print(f"cProfile dump written to {args.cprofile_output}")
 
 
 if __name__ == "__main__":
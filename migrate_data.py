@@ -0,0 +1,21 @@
+# migrate_data.py
+
+from src.data.data_manager import DataManager
+
+def main():
+    """
+    One-time migration of our CSV data files into the columnar market data store.
+    """
+    data_manager = DataManager()
+
+    # --- Configuration: (CSV file, symbol, timeframe, index column) ---
+    MIGRATIONS = [
+        ('data/BTC_USDT_1d.csv', 'BTC/USDT', '1d', 'timestamp'),
+        ('data/bitcoin_sopr_data.csv', 'bitcoin_sopr', '1d', 'date'),
+    ]
+
+    for csv_path, symbol, timeframe, index_col in MIGRATIONS:
+        data_manager.migrate_csv_to_store(csv_path, symbol, timeframe, index_col=index_col)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,102 @@
+# src/analytics/monte_carlo.py
+
+import pandas as pd
+import numpy as np
+
+from src.analytics.performance_metrics import round_trips, max_drawdown
+
+class MonteCarloAnalyzer:
+    """
+    Measures how fragile a backtest result is by resampling it thousands of times.
+
+    All paths of a batch are simulated together as one (steps x paths) array, so
+    10,000 paths cost a handful of NumPy operations rather than 10,000 backtests.
+    """
+    def __init__(self, n_paths=10000, seed=None, batch_size=2000):
+        """
+        Initializes the analyzer.
+
+        Args:
+            n_paths (int): The number of resampled paths.
+            seed (int, optional): The random seed, for reproducible results.
+            batch_size (int): Paths simulated per array, bounding memory use.
+        """
+        self.n_paths = n_paths
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+
+    @staticmethod
+    def trade_returns(equity, trade_log):
+        """
+        Returns each closed trade's P&L as a fraction of the equity just before it
+        was entered. Position sizes are a fixed fraction of the account, so this is
+        the quantity that compounds when the trades are reordered.
+        """
+        equity = np.asarray(equity, dtype=float)
+        trips = round_trips(trade_log)
+        return trips['pnl'] / equity[trips['entry_bar'] - 1]
+
+    def bootstrap_trades(self, equity, trade_log):
+        """
+        Resamples the closed trades with replacement and recompounds the equity.
+
+        Returns:
+            dict: Per path arrays 'final_return' and 'max_drawdown'.
+        """
+        returns = self.trade_returns(equity, trade_log)
+        if len(returns) == 0:
+            raise ValueError("The backtest has no closed trades to resample.")
+        return self._simulate(lambda n: returns[self.rng.integers(0, len(returns), size=(len(returns), n))])
+
+    def block_bootstrap(self, equity, block_size=20):
+        """
+        Resamples the per-bar returns of the equity curve in contiguous blocks
+        (a moving block bootstrap), which keeps the short-range structure of
+        returns, e.g. volatility clusters and trends within a holding period.
+
+        Returns:
+            dict: Per path arrays 'final_return' and 'max_drawdown'.
+        """
+        equity = np.asarray(equity, dtype=float)
+        returns = equity[1:] / equity[:-1] - 1
+        n_returns = len(returns)
+        block_size = min(block_size, n_returns)
+        n_blocks = -(-n_returns // block_size)
+        offsets = np.arange(block_size)
+
+        def sample(n):
+            starts = self.rng.integers(0, n_returns - block_size + 1, size=(n_blocks, n))
+            # (blocks x block_size x paths) indices, flattened into one path per column
+            indices = (starts[:, None, :] + offsets[None, :, None]).reshape(n_blocks * block_size, n)
+            return returns[indices[:n_returns]]
+
+        return self._simulate(sample)
+
+    def _simulate(self, sample_returns):
+        """Compounds batches of sampled (steps x paths) returns into path statistics."""
+        final_return, drawdown = [], []
+        for start in range(0, self.n_paths, self.batch_size):
+            n = min(self.batch_size, self.n_paths - start)
+            growth = np.cumprod(1 + sample_returns(n), axis=0)
+            paths = np.vstack([np.ones((1, n)), growth])
+            final_return.append(paths[-1] - 1)
+            drawdown.append(max_drawdown(paths))
+        return {'final_return': np.concatenate(final_return), 'max_drawdown': np.concatenate(drawdown)}
+
+    @staticmethod
+    def summarize(simulation, percentiles=(5, 25, 50, 75, 95)):
+        """
+        Summarizes the simulated distributions.
+
+        Returns:
+            pd.DataFrame: The mean and percentiles of the final return and max
+                drawdown across paths, plus the probability of a loss.
+        """
+        rows = {}
+        for name, values in simulation.items():
+            row = {'mean': values.mean()}
+            row.update({f"p{p}": value for p, value in zip(percentiles, np.percentile(values, percentiles))})
+            rows[name] = row
+        table = pd.DataFrame(rows).T
+        table['probability_of_loss'] = [np.mean(simulation['final_return'] < 0), np.nan]
+        return table
\ No newline at end of file
@@ -0,0 +1,168 @@
+# src/analytics/performance_metrics.py
+
+import pandas as pd
+import numpy as np
+
+from src.portfolio.backtest_result import BacktestResult
+from src.portfolio.trade_log import TRADE_DTYPE, BUY, SELL
+
+# Performance metrics for backtest results. The equity functions accept a 1-D
+# curve or a 2-D (bars x runs) array and work along the bar axis, so a whole
+# sweep of equity curves is scored in one call.
+
+def returns(equity):
+    """Per-bar simple returns of one or many equity curves."""
+    equity = np.asarray(equity, dtype=float)
+    return equity[1:] / equity[:-1] - 1
+
+def total_return(equity):
+    """Total return over the whole curve."""
+    equity = np.asarray(equity, dtype=float)
+    return equity[-1] / equity[0] - 1
+
+def annualized_return(equity, periods_per_year=365):
+    """Compound annual growth rate."""
+    equity = np.asarray(equity, dtype=float)
+    years = (len(equity) - 1) / periods_per_year
+    return (equity[-1] / equity[0]) ** (1 / years) - 1
+
+def sharpe_ratio(equity, periods_per_year=365, risk_free_rate=0.0):
+    """Annualized Sharpe ratio of the per-bar returns."""
+    excess = returns(equity) - risk_free_rate / periods_per_year
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return excess.mean(axis=0) / excess.std(axis=0, ddof=1) * np.sqrt(periods_per_year)
+
+def sortino_ratio(equity, periods_per_year=365, risk_free_rate=0.0):
+    """Annualized Sortino ratio: excess return over downside deviation."""
+    excess = returns(equity) - risk_free_rate / periods_per_year
+    downside = np.sqrt((np.minimum(excess, 0) ** 2).mean(axis=0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return excess.mean(axis=0) / downside * np.sqrt(periods_per_year)
+
+def drawdowns(equity):
+    """The drawdown from the running peak at every bar, as a (negative) fraction."""
+    equity = np.asarray(equity, dtype=float)
+    return equity / np.maximum.accumulate(equity, axis=0) - 1
+
+def max_drawdown(equity):
+    """
+    The deepest drawdown, as a positive fraction. For a BacktestResult, the one
+    it stored when compacted, as downsampled curves can miss the peak.
+    """
+    if isinstance(equity, BacktestResult):
+        if equity.max_drawdown is not None:
+            return equity.max_drawdown
+        equity = equity.equity
+    return -drawdowns(equity).min(axis=0)
+
+def max_drawdown_duration(equity):
+    """The longest time spent below a previous peak, in bars."""
+    equity = np.asarray(equity, dtype=float)
+    bars = np.arange(len(equity)).reshape((-1,) + (1,) * (equity.ndim - 1))
+    at_peak = equity >= np.maximum.accumulate(equity, axis=0)
+    last_peak = np.maximum.accumulate(np.where(at_peak, bars, 0), axis=0)
+    return (bars - last_peak).max(axis=0)
+
+def calmar_ratio(equity, periods_per_year=365):
+    """Annualized return over maximum drawdown."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return annualized_return(equity, periods_per_year) / max_drawdown(equity)
+
+def round_trips(trade_log, final_bar=None):
+    """
+    Pairs every buy in a trade log with the sell that closes it. Multi-asset
+    logs are paired per symbol, and the round trips ordered by entry bar.
+
+    Args:
+        trade_log (np.ndarray): A TRADE_DTYPE array of alternating buys and sells,
+            or a MULTI_ASSET_TRADE_DTYPE array alternating per symbol.
+        final_bar (int, optional): The last bar of the backtest, used to count the
+            holding period of a position still open at the end.
+
+    Returns:
+        dict: Per round trip arrays 'entry_bar', 'exit_bar', 'pnl' and 'return'.
+            Positions still open at the end have no P&L and are left out of it.
+    """
+    if 'symbol' in trade_log.dtype.names and len(trade_log):
+        per_symbol = [round_trips(trade_log[trade_log['symbol'] == symbol][list(TRADE_DTYPE.names)], final_bar)
+                      for symbol in np.unique(trade_log['symbol'])]
+        # Closed trips first, by entry, then the open positions, so the P&L lines up with the bars
+        closed = [{name: trips[name][:len(trips['pnl'])] for name in ('entry_bar', 'exit_bar')} for trips in per_symbol]
+        still_open = [{name: trips[name][len(trips['pnl']):] for name in ('entry_bar', 'exit_bar')} for trips in per_symbol]
+        order = np.argsort(np.concatenate([trips['entry_bar'] for trips in closed]), kind='stable')
+        open_order = np.argsort(np.concatenate([trips['entry_bar'] for trips in still_open]), kind='stable')
+
+        def merged(parts, name, by):
+            return np.concatenate([part[name] for part in parts])[by]
+        return {
+            'entry_bar': np.concatenate([merged(closed, 'entry_bar', order), merged(still_open, 'entry_bar', open_order)]),
+            'exit_bar': np.concatenate([merged(closed, 'exit_bar', order), merged(still_open, 'exit_bar', open_order)]),
+            'pnl': merged(per_symbol, 'pnl', order),
+            'return': merged(per_symbol, 'return', order),
+        }
+
+    buys = trade_log[trade_log['side'] == BUY]
+    sells = trade_log[trade_log['side'] == SELL]
+    closed = len(sells)
+
+    entry_cost = buys['price'][:closed] * buys['size'][:closed] + buys['commission'][:closed]
+    exit_value = sells['price'] * sells['size'] - sells['commission']
+
+    exit_bar = sells['bar']
+    if len(buys) > closed and final_bar is not None:
+        exit_bar = np.append(exit_bar, final_bar)
+    return {
+        'entry_bar': buys['bar'][:len(exit_bar)],
+        'exit_bar': exit_bar,
+        'pnl': exit_value - entry_cost,
+        'return': exit_value / entry_cost - 1,
+    }
+
+def compute_metrics(equity, trade_log=None, periods_per_year=365, risk_free_rate=0.0):
+    """
+    Computes the standard performance report for backtest results.
+
+    Args:
+        equity: One equity curve (a BacktestResult, which brings its trade log, a
+            frame with an 'equity' column, a Series or a 1-D array) or a 2-D
+            (bars x runs) array of curves.
+        trade_log (np.ndarray, optional): The run's TRADE_DTYPE trade log, enabling the
+            exposure, turnover, win-rate and per-trade metrics (single curve only).
+        periods_per_year (int): Bars per year, e.g. 365 for daily crypto data.
+        risk_free_rate (float): The annual risk-free rate.
+
+    Returns:
+        dict for a single curve, pd.DataFrame with one row per run for a 2-D array.
+    """
+    if isinstance(equity, BacktestResult):
+        if equity.is_downsampled:
+            raise ValueError("Metrics need the full equity curve; compute them before downsampling a result.")
+        if trade_log is None:
+            trade_log = equity.trades
+        equity = equity.equity
+    elif isinstance(equity, pd.DataFrame):
+        equity = equity['equity']
+    equity = np.asarray(equity, dtype=float)
+
+    metrics = {
+        'total_return': total_return(equity),
+        'annualized_return': annualized_return(equity, periods_per_year),
+        'sharpe_ratio': sharpe_ratio(equity, periods_per_year, risk_free_rate),
+        'sortino_ratio': sortino_ratio(equity, periods_per_year, risk_free_rate),
+        'max_drawdown': max_drawdown(equity),
+        'max_drawdown_duration': max_drawdown_duration(equity),
+        'calmar_ratio': calmar_ratio(equity, periods_per_year),
+    }
+    if equity.ndim == 2:
+        return pd.DataFrame(metrics)
+
+    if trade_log is not None:
+        trips = round_trips(trade_log, final_bar=len(equity) - 1)
+        traded_value = (trade_log['price'] * trade_log['size']).sum()
+        metrics['exposure'] = (trips['exit_bar'] - trips['entry_bar']).sum() / len(equity)
+        metrics['turnover'] = traded_value / equity.mean()
+        metrics['trade_count'] = len(trips['pnl'])
+        metrics['win_rate'] = (trips['pnl'] > 0).mean() if len(trips['pnl']) else np.nan
+        metrics['average_trade_pnl'] = trips['pnl'].mean() if len(trips['pnl']) else np.nan
+        metrics['total_commission'] = trade_log['commission'].sum()
+    return {name: float(value) for name, value in metrics.items()}
\ No newline at end of file
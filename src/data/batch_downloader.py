@@ -0,0 +1,148 @@
+# src/data/batch_downloader.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import ccxt
+
+from src.data.data_manager import DataManager
+from src.data.market_store import MarketDataStore
+
+class RateLimiter:
+    """
+    Spaces out requests so that all threads sharing the limiter together stay
+    under a given number of requests per second.
+    """
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Blocks until the caller may send its next request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class RateLimitedExchange:
+    """
+    Wraps a ccxt exchange so that every OHLCV request waits on a shared rate
+    limiter and transient network errors are retried with exponential backoff.
+    All other attributes are passed through to the wrapped exchange.
+    """
+    def __init__(self, exchange, rate_limiter, max_retries=3, backoff_seconds=1.0, on_page=None):
+        """
+        Args:
+            exchange: The ccxt-compatible exchange object.
+            rate_limiter (RateLimiter): The limiter shared by all requests to this exchange.
+            max_retries (int): Retries per request after the first attempt.
+            backoff_seconds (float): The delay before the first retry, doubled on each further one.
+            on_page (callable, optional): Called with the number of candles of every page received.
+        """
+        self.exchange = exchange
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.on_page = on_page
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=None):
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.wait()
+            try:
+                ohlcv = self.exchange.fetch_ohlcv(symbol, timeframe, since, limit=limit)
+                break
+            except ccxt.NetworkError:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff_seconds * 2 ** attempt)
+        if self.on_page is not None:
+            self.on_page(len(ohlcv))
+        return ohlcv
+
+    def __getattr__(self, name):
+        return getattr(self.exchange, name)
+
+
+class BatchDownloader:
+    """
+    Fills the market data store for many (symbol, timeframe) series at once,
+    fetching them concurrently on a bounded thread pool through DataManager's
+    incremental, resumable fetch.
+    """
+    def __init__(self, exchange_factory=None, max_workers=8, requests_per_second=1.0, max_retries=3, backoff_seconds=1.0, progress=None):
+        """
+        Initializes the downloader.
+
+        Args:
+            exchange_factory (callable, optional): Creates an exchange object. Each worker
+                thread gets its own. Defaults to ccxt.kraken.
+            max_workers (int): The number of series fetched concurrently.
+            requests_per_second (float): The rate limit shared by all workers for this exchange.
+            max_retries (int): Retries per request on network errors.
+            backoff_seconds (float): The initial retry delay, doubled on each retry.
+            progress (callable, optional): Called as progress(symbol, timeframe, event, detail)
+                for 'start', 'page', 'done' and 'failed' events. Defaults to printing.
+        """
+        self.exchange_factory = exchange_factory or ccxt.kraken
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.progress = progress or self._print_progress
+        self._local = threading.local()
+
+    def download(self, symbols, timeframes, start_date_str, data_dir='data'):
+        """
+        Fetches every (symbol, timeframe) combination.
+
+        Returns:
+            dict: Per (symbol, timeframe), a dict with 'status' ('done' or 'failed'),
+                'new_candles' and, on failure, 'error'.
+        """
+        series = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+        store = MarketDataStore(os.path.join(data_dir, 'store'))
+        report = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._download_one, symbol, timeframe, start_date_str, data_dir, store): (symbol, timeframe)
+                for symbol, timeframe in series
+            }
+            for future in as_completed(futures):
+                symbol, timeframe = futures[future]
+                try:
+                    new_candles = future.result()
+                    report[(symbol, timeframe)] = {'status': 'done', 'new_candles': new_candles}
+                    self.progress(symbol, timeframe, 'done', f"{new_candles} new candles ({len(report)}/{len(series)})")
+                except Exception as e:
+                    report[(symbol, timeframe)] = {'status': 'failed', 'new_candles': 0, 'error': e}
+                    self.progress(symbol, timeframe, 'failed', f"{e!r} ({len(report)}/{len(series)})")
+
+        return report
+
+    def _download_one(self, symbol, timeframe, start_date_str, data_dir, store):
+        """Runs one incremental fetch on the calling worker thread's exchange."""
+        if not hasattr(self._local, 'exchange'):
+            self._local.exchange = self.exchange_factory()
+
+        self.progress(symbol, timeframe, 'start', start_date_str)
+        exchange = RateLimitedExchange(
+            self._local.exchange, self.rate_limiter, max_retries=self.max_retries,
+            backoff_seconds=self.backoff_seconds,
+            on_page=lambda candles: self.progress(symbol, timeframe, 'page', f"{candles} candles")
+        )
+
+        rows_before = store.row_count(symbol, timeframe)
+        DataManager().fetch_and_save_data(symbol, timeframe, start_date_str, data_dir=data_dir, exchange=exchange, verbose=False)
+        return store.row_count(symbol, timeframe) - rows_before
+
+    @staticmethod
+    def _print_progress(symbol, timeframe, event, detail):
+        if event != 'page':
+            print(f"[{event}] {symbol} {timeframe}: {detail}")
\ No newline at end of file
@@ -7,39 +7,73 @@ from datetime import datetime
 import requests
 import numpy as np
 
+from src.data.market_store import MarketDataStore
+from src.data.data_quality import validate_ohlcv
+from src.profiling.stage_profiler import profiled
+
 class DataManager:
     """
     An agent responsible for fetching, loading, and cleaning data from various sources.
     """
-    def fetch_and_save_data(self, symbol, timeframe, start_date_str, data_dir='data'):
+    @profiled('fetch_and_save_data')
+    def fetch_and_save_data(self, symbol, timeframe, start_date_str, data_dir='data', exchange=None, verbose=True):
         """
-        Fetches historical OHLCV data from an exchange and saves it to a CSV file.
+        Fetches historical OHLCV data from an exchange and saves it to the columnar
+        market data store under `data_dir/store`.
+
+        The fetch is incremental: if the store already holds candles for this
+        series, only the candles after the last stored one are downloaded. Every
+        page is appended to the store as soon as it arrives, so an interrupted
+        fetch resumes from its last completed page, and candles overlapping the
+        stored history are dropped.
+
+        Args:
+            symbol (str): The market symbol, e.g. 'BTC/USDT'.
+            timeframe (str): The candle timeframe, e.g. '1d'.
+            start_date_str (str): The first date to fetch when nothing is stored yet.
+            data_dir (str): The data directory holding the store.
+            exchange (optional): A ccxt-compatible exchange object. Defaults to ccxt.kraken().
+            verbose (bool): Whether to print progress for every page.
+
+        Returns:
+            str: The store partition path.
         """
-        print(f"Fetching {symbol} {timeframe} data from {start_date_str}...")
-        exchange = ccxt.kraken() # Using Kraken as our reliable source
+        log = print if verbose else (lambda *args, **kwargs: None)
+        if exchange is None:
+            exchange = ccxt.kraken() # Using Kraken as our reliable source
+        store = MarketDataStore(os.path.join(data_dir, 'store'))
 
         since = exchange.parse8601(f'{start_date_str}T00:00:00Z')
-
-        all_ohlcv = []
+        last_stored = store.last_timestamp(symbol, timeframe)
+        if last_stored is not None:
+            since = max(since, last_stored.value // 10**6 + 1)
+            log(f"Resuming {symbol} {timeframe} after last stored candle {last_stored}...")
+        else:
+            log(f"Fetching {symbol} {timeframe} data from {start_date_str}...")
+
+        new_candles = 0
         while True:
             ohlcv = exchange.fetch_ohlcv(symbol, timeframe, since, limit=1000)
             if len(ohlcv) == 0:
                 break
-            all_ohlcv += ohlcv
+            # Checkpoint: each page is persisted before the next one is requested
+            new_candles += store.append(symbol, timeframe, self._ohlcv_to_frame(ohlcv))
+            if ohlcv[-1][0] < since:
+                break
             since = ohlcv[-1][0] + 1
-            print(f"  Fetched {len(ohlcv)} candles, continuing from {exchange.iso8601(since)}")
+            log(f"  Fetched {len(ohlcv)} candles, continuing from {exchange.iso8601(since)}")
+
+        file_path = store.partition_path(symbol, timeframe)
+        log(f"\nSaved {new_candles} new candles to {file_path}")
+        return file_path
 
-        df = pd.DataFrame(all_ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    @staticmethod
+    def _ohlcv_to_frame(ohlcv):
+        """Converts a page of ccxt OHLCV candles to a DataFrame indexed by timestamp."""
+        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
         df.set_index('timestamp', inplace=True)
-
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-
-        file_path = os.path.join(data_dir, f"{symbol.replace('/', '_')}_{timeframe}.csv")
-        df.to_csv(file_path)
-        print(f"\nData successfully saved to {file_path}")
-        return file_path
+        return df.astype(float)
 
     def fetch_fear_and_greed_index(self, data_dir='data'):
         """
@@ -70,12 +104,23 @@ class DataManager:
             print(f"Error fetching data from API: {e}")
             return None
 
-    def load_data(self, file_path, index_col='timestamp'):
+    @profiled('load_data')
+    def load_data(self, file_path, index_col='timestamp', start=None, end=None):
         """
-        Loads data from a given CSV file path.
+        Loads data from a market data store partition directory or a CSV file path.
+
+        Args:
+            file_path (str): A store partition (e.g. 'data/store/BTC_USDT/1d') or a CSV file.
+            index_col (str): The CSV column holding the timestamps.
+            start (optional): The first timestamp to load. Store partitions only read this window.
+            end (optional): The last timestamp to load.
         """
         try:
+            if os.path.isdir(file_path):
+                return MarketDataStore.read_partition(file_path, start=start, end=end)
             df = pd.read_csv(file_path, index_col=index_col, parse_dates=True)
+            if start is not None or end is not None:
+                df = df.loc[start:end]
             return df
         except FileNotFoundError:
             print(f"Error: Data file not found at {file_path}")
@@ -84,20 +129,76 @@ class DataManager:
             print(f"Error: Column '{index_col}' not found in {file_path}. Please check the CSV.")
             return pd.DataFrame()
 
-    def clean_and_validate_data(self, df):
+    def migrate_csv_to_store(self, csv_path, symbol, timeframe, index_col='timestamp', data_dir='data'):
+        """
+        One-time migration of a CSV file into the columnar market data store.
+        Non-numeric columns cannot be stored and are dropped with a warning.
+
+        Returns:
+            str: The partition path, which can be passed to `load_data`.
+        """
+        df = pd.read_csv(csv_path, index_col=index_col, parse_dates=True).sort_index()
+        numeric_df = df.select_dtypes(include=['number', 'bool'])
+        dropped = [c for c in df.columns if c not in numeric_df.columns]
+        if dropped:
+            print(f"Warning: Dropping non-numeric columns {dropped} from {csv_path}.")
+        df = numeric_df
+        file_path = MarketDataStore(os.path.join(data_dir, 'store')).write(symbol, timeframe, df)
+        print(f"Migrated {len(df)} rows from {csv_path} to {file_path}")
+        return file_path
+
+    @profiled('clean_and_validate_data')
+    def clean_and_validate_data(self, df, freq=None, return_report=False):
         """
         Cleans and validates the raw market data.
+
+        The bars are validated in one pass (see validate_ohlcv). Unusable rows and
+        repeated timestamps are dropped, bars that arrived out of order are sorted
+        into place, gaps are filled at the bar interval by carrying the last valid
+        value forward, and the result is assembled column by column in a single
+        step instead of through intermediate full-frame copies.
+
+        Args:
+            df (pd.DataFrame): Bars with a DatetimeIndex.
+            freq (optional): The bar interval used to fill gaps, e.g. '1h'. Defaults
+                to the most common spacing of the series' own timestamps; with fewer
+                than two distinct timestamps there are no gaps to fill.
+            return_report (bool): Whether to also return the DataQualityReport.
+
+        Returns:
+            pd.DataFrame: The cleaned bars, or a tuple (bars, report).
         """
-        # 1. Validate OHLC data: drop rows where low > high
-        invalid_rows = df[df['low'] > df['high']]
-        if not invalid_rows.empty:
-            print(f"Warning: Found and dropped {len(invalid_rows)} rows with impossible OHLC data.")
-            df = df.drop(invalid_rows.index)
-
-        # 2. Fill gaps in the timeline
-        full_date_range = pd.date_range(start=df.index.min(), end=df.index.max(), freq='D')
-        df = df.reindex(full_date_range)
-        df.ffill(inplace=True)
-        df.dropna(inplace=True)
-
-        return df
\ No newline at end of file
+        # 1. Validate everything in one pass and flag the unusable rows
+        report, invalid = validate_ohlcv(df, interval=freq)
+        if not report.is_clean:
+            print(f"Warning: Data quality issues found, dropped {int(invalid.sum())} unusable rows.\n{report}")
+
+        keep = np.flatnonzero(~invalid)
+        if len(keep) == 0:
+            cleaned = df.iloc[:0]
+            return (cleaned, report) if return_report else cleaned
+
+        # 2. Put late bars in place, then map every bar of the full timeline to the last kept row at or before it
+        if report.counts['out_of_order_timestamps']:
+            keep = keep[np.argsort(df.index.as_unit('ns').asi8[keep], kind='stable')]
+        kept_index = df.index[keep]
+        if report.interval is not None:
+            full_range = pd.date_range(start=kept_index[0], end=kept_index[-1], freq=report.interval, name=df.index.name)
+        else:
+            full_range = kept_index
+        source = np.searchsorted(kept_index.as_unit('ns').asi8, full_range.as_unit('ns').asi8, side='right') - 1
+
+        # 3. Forward-fill each column's missing values and gaps with one gather
+        columns = {}
+        complete = np.ones(len(full_range), dtype=bool)
+        for column in df.columns:
+            values = df[column].to_numpy()[keep]
+            last_valid = np.maximum.accumulate(np.where(pd.isna(values), -1, np.arange(len(values))))[source]
+            complete &= last_valid >= 0
+            columns[column] = values[np.maximum(last_valid, 0)]
+
+        # Rows before a column's first valid value can't be filled and are dropped
+        cleaned = pd.DataFrame(columns, index=full_range)
+        if not complete.all():
+            cleaned = cleaned[complete]
+        return (cleaned, report) if return_report else cleaned
\ No newline at end of file
@@ -0,0 +1,178 @@
+# src/data/data_quality.py
+
+import pandas as pd
+import numpy as np
+
+from src.data.resampler import infer_bar_interval
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+class DataQualityReport:
+    """
+    Counts of the data issues found by validate_ohlcv, accumulated over every
+    chunk of a series that was validated.
+    """
+    ISSUES = ('missing_values', 'ohlc_inconsistent', 'non_positive_price', 'negative_volume', 'zero_volume',
+              'volume_spikes', 'duplicate_timestamps', 'out_of_order_timestamps', 'gaps', 'missing_bars')
+
+    def __init__(self, interval=None):
+        """
+        Initializes an empty report.
+
+        Args:
+            interval (pd.Timedelta, optional): The expected bar interval. Inferred
+                from the first chunk if not given; None while there are fewer than
+                two distinct timestamps, in which case gaps are not checked.
+        """
+        self.interval = interval
+        self.rows = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self.largest_gap = pd.Timedelta(0)
+        self.counts = dict.fromkeys(self.ISSUES, 0)
+
+    @property
+    def is_clean(self):
+        """True if no issue was found, ignoring zero-volume bars."""
+        return all(count == 0 for issue, count in self.counts.items() if issue != 'zero_volume')
+
+    def to_dict(self):
+        """Returns the report as a flat dict."""
+        report = {
+            'rows': self.rows,
+            'interval': self.interval,
+            'first_timestamp': self.first_timestamp,
+            'last_timestamp': self.last_timestamp,
+            'largest_gap': self.largest_gap,
+        }
+        report.update(self.counts)
+        return report
+
+    def __str__(self):
+        lines = [f"{self.rows} rows from {self.first_timestamp} to {self.last_timestamp} every {self.interval}"]
+        lines += [f"  {issue}: {count}" for issue, count in self.counts.items() if count]
+        return "\n".join(lines)
+
+
+def _as_timedelta(interval):
+    """Converts an interval such as 'D', '4h' or a Timedelta to a pd.Timedelta."""
+    if isinstance(interval, str) and not interval[0].isdigit():
+        interval = '1' + interval
+    return pd.Timedelta(interval)
+
+
+def validate_ohlcv(df, interval=None, report=None, volume_spike_factor=50.0):
+    """
+    Checks a chunk of OHLCV bars in one pass over each column.
+
+    Pass the report of the previous chunk to validate a series chunk by chunk:
+    timestamps are then checked against the latest timestamp of the earlier
+    chunks as well, so the counts equal those of validating the whole series.
+
+    Args:
+        df (pd.DataFrame): Bars with a DatetimeIndex and 'open', 'high', 'low',
+            'close' and optionally 'volume' columns.
+        interval (optional): The expected bar interval, e.g. '1h'. Defaults to the
+            interval of the report, or the most common spacing of the timestamps.
+            Gaps are not checked if it can't be inferred.
+        report (DataQualityReport, optional): The report to add this chunk's counts to.
+        volume_spike_factor (float): Volumes above this multiple of the chunk's
+            median volume are counted as spikes.
+
+    Returns:
+        A tuple (report, invalid) where invalid flags the rows that cannot be used:
+        impossible or non-positive prices, and repeats of an earlier timestamp.
+        Bars that merely arrive out of order within the chunk are reported but
+        not invalid; sort them into place before use. Bars at or before the end
+        of the earlier chunks can no longer be sorted into place and are invalid.
+    """
+    if report is None:
+        report = DataQualityReport()
+    if interval is not None:
+        report.interval = _as_timedelta(interval)
+    elif report.interval is None:
+        try:
+            report.interval = infer_bar_interval(df.index)
+        except ValueError:
+            # Fewer than two distinct timestamps: nothing to measure gaps against yet
+            pass
+    if len(df) == 0:
+        return report, np.zeros(0, dtype=bool)
+
+    counts = report.counts
+    opens, highs, lows, closes = (df[column].to_numpy(dtype=float) for column in PRICE_COLUMNS)
+
+    # 1. Prices: NaNs, impossible bars and non-positive prices
+    missing = np.isnan(opens) | np.isnan(highs) | np.isnan(lows) | np.isnan(closes)
+    inconsistent = (lows > highs) | (opens > highs) | (opens < lows) | (closes > highs) | (closes < lows)
+    non_positive = (opens <= 0) | (highs <= 0) | (lows <= 0) | (closes <= 0)
+
+    # 2. Volume: missing, negative, zero and spikes
+    if 'volume' in df.columns:
+        volume = df['volume'].to_numpy(dtype=float)
+        missing |= np.isnan(volume)
+        counts['negative_volume'] += int(np.sum(volume < 0))
+        counts['zero_volume'] += int(np.sum(volume == 0))
+        traded = volume[volume > 0]
+        if len(traded):
+            counts['volume_spikes'] += int(np.sum(volume > volume_spike_factor * np.median(traded)))
+
+    # 3. Timestamps: compare every bar with the latest one before it, including the previous chunk
+    timestamps = df.index.as_unit('ns').asi8
+    carried = None if report.last_timestamp is None else report.last_timestamp.value
+    running_max = np.maximum.accumulate(timestamps)
+    if carried is not None:
+        running_max = np.maximum(running_max, carried)
+    previous = np.empty_like(timestamps)
+    previous[1:] = running_max[:-1]
+    previous[0] = timestamps[0] - 1 if carried is None else carried
+    step = timestamps - previous
+
+    duplicate = step == 0
+    out_of_order = step < 0
+    gap_steps = step[step > report.interval.value] if report.interval is not None else step[:0]
+
+    # Late bars are only unusable if they repeat a timestamp seen earlier in the chunk
+    repeated = duplicate.copy()
+    if out_of_order.any():
+        order = np.argsort(timestamps, kind='stable')
+        repeated[order[1:]] |= timestamps[order[1:]] == timestamps[order[:-1]]
+    if carried is not None:
+        repeated |= timestamps <= carried
+
+    counts['missing_values'] += int(np.sum(missing))
+    counts['ohlc_inconsistent'] += int(np.sum(inconsistent))
+    counts['non_positive_price'] += int(np.sum(non_positive))
+    counts['duplicate_timestamps'] += int(np.sum(duplicate))
+    counts['out_of_order_timestamps'] += int(np.sum(out_of_order))
+    counts['gaps'] += len(gap_steps)
+    if len(gap_steps):
+        counts['missing_bars'] += int(np.sum(gap_steps // report.interval.value - 1))
+    if len(gap_steps):
+        report.largest_gap = max(report.largest_gap, pd.Timedelta(int(gap_steps.max()), unit='ns'))
+
+    report.rows += len(df)
+    first = df.index[int(np.argmin(timestamps))]
+    report.first_timestamp = first if report.first_timestamp is None else min(report.first_timestamp, first)
+    last = df.index[int(np.argmax(timestamps))]
+    report.last_timestamp = last if report.last_timestamp is None else max(report.last_timestamp, last)
+
+    return report, inconsistent | non_positive | repeated
+
+
+def validate_chunks(chunks, interval=None, volume_spike_factor=50.0):
+    """
+    Validates a series that is too large for memory, one chunk at a time.
+
+    Args:
+        chunks (iterable): DataFrames in time order, e.g. from MarketDataStore.iter_chunks.
+        interval (optional): The expected bar interval. Inferred from the first chunk if not given.
+        volume_spike_factor (float): See validate_ohlcv.
+
+    Returns:
+        DataQualityReport: The report over the whole series.
+    """
+    report = DataQualityReport(_as_timedelta(interval) if interval is not None else None)
+    for chunk in chunks:
+        report, _ = validate_ohlcv(chunk, report=report, volume_spike_factor=volume_spike_factor)
+    return report
\ No newline at end of file
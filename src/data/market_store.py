@@ -0,0 +1,246 @@
+# src/data/market_store.py
+
+import json
+import os
+
+import pandas as pd
+import numpy as np
+
+class MarketDataStore:
+    """
+    A columnar on-disk store for market data.
+
+    Each symbol/timeframe pair is a partition directory holding one raw binary
+    file per column plus the int64 timestamp index, described by a small JSON
+    metadata file. Reads memory-map the files and binary-search the sorted index,
+    so only the requested date range and columns are ever read from disk.
+    """
+    META_FILE = '_meta.json'
+    INDEX_FILE = '_index.bin'
+
+    def __init__(self, root):
+        """
+        Initializes the store.
+
+        Args:
+            root (str): The directory holding all partitions.
+        """
+        self.root = root
+
+    def partition_path(self, symbol, timeframe):
+        """Returns the directory of a symbol/timeframe partition."""
+        return os.path.join(self.root, symbol.replace('/', '_'), timeframe)
+
+    def exists(self, symbol, timeframe):
+        """Checks whether a partition has been written."""
+        return os.path.exists(os.path.join(self.partition_path(symbol, timeframe), self.META_FILE))
+
+    def write(self, symbol, timeframe, df):
+        """
+        Writes a DataFrame to a partition, replacing any existing contents.
+
+        Args:
+            symbol (str): The market symbol, e.g. 'BTC/USDT'.
+            timeframe (str): The bar timeframe, e.g. '1d'.
+            df (pd.DataFrame): Numeric columns on a sorted DatetimeIndex.
+
+        Returns:
+            str: The partition path.
+        """
+        path = self.partition_path(symbol, timeframe)
+        os.makedirs(path, exist_ok=True)
+        index, columns = self._to_arrays(df)
+
+        meta = {
+            'index_name': df.index.name,
+            'columns': {name: values.dtype.str for name, values in columns.items()},
+            'rows': 0,
+        }
+        self._write_meta(path, meta)
+        for name, values in [(self.INDEX_FILE, index)] + list(columns.items()):
+            with open(self._column_file(path, name), 'wb') as f:
+                f.write(values.tobytes())
+
+        meta['rows'] = len(index)
+        self._write_meta(path, meta)
+        return path
+
+    def append(self, symbol, timeframe, df):
+        """
+        Appends the rows of a DataFrame that are newer than the last stored row.
+        Creates the partition if it does not exist yet.
+
+        Rows at or before the last stored timestamp and duplicate timestamps
+        within the DataFrame are dropped, so overlapping fetches can be appended
+        safely. The metadata is only updated once all columns are written, which
+        makes every append an atomic checkpoint.
+
+        Returns:
+            int: The number of rows appended.
+        """
+        if not self.exists(symbol, timeframe):
+            df = df[~df.index.duplicated(keep='last')].sort_index()
+            self.write(symbol, timeframe, df)
+            return len(df)
+
+        path = self.partition_path(symbol, timeframe)
+        meta = self._read_meta(path)
+        last = self.last_timestamp(symbol, timeframe)
+
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+        if last is not None:
+            df = df[df.index > last]
+        if df.empty:
+            return 0
+        if list(df.columns) != list(meta['columns']):
+            raise ValueError(f"Columns {list(df.columns)} do not match the stored columns {list(meta['columns'])}.")
+
+        index, columns = self._to_arrays(df)
+        for name, values in [(self.INDEX_FILE, index)] + list(columns.items()):
+            dtype = np.dtype(meta['columns'].get(name, '<i8'))
+            with open(self._column_file(path, name), 'r+b') as f:
+                # Discard anything a previously interrupted append left behind
+                f.truncate(meta['rows'] * dtype.itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(values.astype(dtype, copy=False).tobytes())
+
+        meta['rows'] += len(index)
+        self._write_meta(path, meta)
+        return len(index)
+
+    def read(self, symbol, timeframe, start=None, end=None, columns=None):
+        """
+        Reads a partition, optionally restricted to a date range and a subset of columns.
+
+        Args:
+            symbol (str): The market symbol.
+            timeframe (str): The bar timeframe.
+            start (optional): The first timestamp to include.
+            end (optional): The last timestamp to include.
+            columns (list, optional): The columns to read. Defaults to all.
+
+        Returns:
+            pd.DataFrame: The requested rows and columns.
+        """
+        return self.read_partition(self.partition_path(symbol, timeframe), start, end, columns)
+
+    def row_count(self, symbol, timeframe):
+        """Returns the number of stored rows, 0 if the partition does not exist."""
+        if not self.exists(symbol, timeframe):
+            return 0
+        return self._read_meta(self.partition_path(symbol, timeframe))['rows']
+
+    def last_timestamp(self, symbol, timeframe):
+        """Returns the timestamp of the last stored row, or None if there is none."""
+        if not self.exists(symbol, timeframe):
+            return None
+        path = self.partition_path(symbol, timeframe)
+        rows = self._read_meta(path)['rows']
+        if rows == 0:
+            return None
+        index = np.memmap(self._column_file(path, self.INDEX_FILE), dtype='<i8', mode='r', shape=(rows,))
+        return pd.Timestamp(int(index[-1]))
+
+    @classmethod
+    def read_partition(cls, path, start=None, end=None, columns=None):
+        """
+        Reads a partition directory directly. See `read`.
+        """
+        meta = cls._read_meta(path)
+        rows = meta['rows']
+        columns = list(meta['columns']) if columns is None else list(columns)
+
+        index = cls._map(path, cls.INDEX_FILE, '<i8', rows)
+        # Predicate pushdown: binary-search the sorted timestamps for the requested window
+        lo = 0 if start is None else int(np.searchsorted(index, pd.Timestamp(start).value, side='left'))
+        hi = rows if end is None else int(np.searchsorted(index, pd.Timestamp(end).value, side='right'))
+
+        df = pd.DataFrame(
+            {name: np.array(cls._map(path, name, meta['columns'][name], rows)[lo:hi]) for name in columns},
+            index=pd.DatetimeIndex(np.array(index[lo:hi]).view('datetime64[ns]'), name=meta['index_name']),
+        )
+        return df
+
+    def iter_chunks(self, symbol, timeframe, chunk_rows=1_000_000, columns=None, join=None):
+        """
+        Yields a partition in consecutive DataFrames of at most chunk_rows rows, so
+        series larger than memory can be processed one window at a time.
+
+        Args:
+            symbol (str): The market symbol.
+            timeframe (str): The bar timeframe.
+            chunk_rows (int): The maximum number of rows per chunk.
+            columns (list, optional): The columns to read. Defaults to all.
+            join (list, optional): (symbol, timeframe, columns) partitions whose rows
+                are inner-joined onto every chunk by timestamp, e.g. on-chain data.
+        """
+        for chunk in self.iter_partition_chunks(self.partition_path(symbol, timeframe), chunk_rows, columns=columns):
+            for other_symbol, other_timeframe, other_columns in join or []:
+                other = self.read(other_symbol, other_timeframe, start=chunk.index[0], end=chunk.index[-1], columns=other_columns)
+                chunk = chunk.join(other, how='inner')
+            yield chunk
+
+    @classmethod
+    def iter_partition_chunks(cls, path, chunk_rows=1_000_000, start=None, end=None, columns=None):
+        """
+        Yields a partition directory in chunks of at most chunk_rows rows,
+        optionally restricted to a date range. See `iter_chunks`.
+        """
+        meta = cls._read_meta(path)
+        rows = meta['rows']
+        columns = list(meta['columns']) if columns is None else list(columns)
+
+        index = cls._map(path, cls.INDEX_FILE, '<i8', rows)
+        first = 0 if start is None else int(np.searchsorted(index, pd.Timestamp(start).value, side='left'))
+        last = rows if end is None else int(np.searchsorted(index, pd.Timestamp(end).value, side='right'))
+        mapped = {name: cls._map(path, name, meta['columns'][name], rows) for name in columns}
+        for lo in range(first, last, chunk_rows):
+            hi = min(lo + chunk_rows, last)
+            yield pd.DataFrame(
+                {name: np.array(values[lo:hi]) for name, values in mapped.items()},
+                index=pd.DatetimeIndex(np.array(index[lo:hi]).view('datetime64[ns]'), name=meta['index_name']),
+            )
+
+    @classmethod
+    def _map(cls, path, name, dtype, rows):
+        """Memory-maps one column file."""
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(cls._column_file(path, name), dtype=dtype, mode='r', shape=(rows,))
+
+    @staticmethod
+    def _to_arrays(df):
+        """Splits a DataFrame into its int64 timestamps and numeric column arrays."""
+        if not isinstance(df.index, pd.DatetimeIndex):
+            raise TypeError("The market data store requires a DatetimeIndex.")
+        if not df.index.is_monotonic_increasing:
+            raise ValueError("The market data store requires a sorted index.")
+
+        columns = {}
+        for name in df.columns:
+            values = df[name].to_numpy()
+            if not (np.issubdtype(values.dtype, np.number) or values.dtype == bool):
+                raise TypeError(f"Column '{name}' is not numeric and cannot be stored.")
+            columns[name] = np.ascontiguousarray(values)
+
+        index = df.index.as_unit('ns').asi8 if df.index.tz is None else df.index.tz_convert(None).as_unit('ns').asi8
+        return index.astype('<i8'), columns
+
+    @staticmethod
+    def _column_file(path, name):
+        if name == MarketDataStore.INDEX_FILE:
+            return os.path.join(path, name)
+        return os.path.join(path, f"{name}.bin")
+
+    @classmethod
+    def _read_meta(cls, path):
+        with open(os.path.join(path, cls.META_FILE)) as f:
+            return json.load(f)
+
+    @classmethod
+    def _write_meta(cls, path, meta):
+        # Write-then-rename so readers never see a half-written metadata file
+        tmp_path = os.path.join(path, cls.META_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(path, cls.META_FILE))
\ No newline at end of file
@@ -0,0 +1,174 @@
+# src/data/resampler.py
+
+import re
+from collections import OrderedDict
+
+import pandas as pd
+import numpy as np
+
+from src.profiling.stage_profiler import profiled
+
+# How each column is combined into a bar; any other column keeps its last value
+AGGREGATIONS = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+_TIMEFRAME_UNITS = {'m': 'min', 'h': 'h', 'd': 'D'}
+
+def timeframe_to_timedelta(timeframe):
+    """Converts an exchange timeframe such as '1m', '4h' or '1d' to a pd.Timedelta."""
+    match = re.fullmatch(r'(\d+)([mhd])', timeframe)
+    if match is None:
+        raise ValueError(f"Unsupported timeframe '{timeframe}'. Use minutes, hours or days, e.g. '15m', '4h', '1d'.")
+    return pd.Timedelta(int(match.group(1)), unit=_TIMEFRAME_UNITS[match.group(2)])
+
+def infer_bar_interval(index):
+    """Returns the most common spacing between consecutive timestamps as a pd.Timedelta."""
+    timestamps = index.as_unit('ns').asi8
+    if not index.is_monotonic_increasing:
+        timestamps = np.sort(timestamps)
+    steps = np.diff(timestamps)
+    steps = steps[steps > 0]
+    if len(steps) == 0:
+        raise ValueError("At least two distinct timestamps are needed to infer the bar interval.")
+    values, counts = np.unique(steps, return_counts=True)
+    return pd.Timedelta(int(values[np.argmax(counts)]), unit='ns')
+
+@profiled('resample_ohlcv')
+def resample_ohlcv(df, timeframe):
+    """
+    Aggregates bars into a higher timeframe in a single pass over each column.
+
+    Bars are labelled by the start of their period, as exchanges label candles,
+    so a '1d' bar stamped 2024-01-01 covers 2024-01-01 00:00 up to midnight.
+
+    Args:
+        df (pd.DataFrame): Bars with a sorted DatetimeIndex and numeric columns.
+        timeframe (str): The target timeframe, e.g. '1h', '4h' or '1d'.
+
+    Returns:
+        pd.DataFrame: The resampled bars. Periods without any source bar are left out,
+            so no source bars give an empty frame with the same columns.
+    """
+    if not df.index.is_monotonic_increasing or not df.index.is_unique:
+        raise ValueError("The index must be sorted and free of duplicate timestamps.")
+    if len(df) == 0:
+        return df.iloc[:0].copy()
+
+    # 1. Find where each period starts in the sorted bars
+    periods = df.index.floor(timeframe_to_timedelta(timeframe))
+    codes = periods.asi8
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)] - 1
+
+    # 2. Reduce every column over the period boundaries at once
+    columns = {}
+    for column in df.columns:
+        values = df[column].to_numpy()
+        how = AGGREGATIONS.get(column, 'last')
+        if how == 'first':
+            columns[column] = values[starts]
+        elif how == 'max':
+            columns[column] = np.maximum.reduceat(values, starts)
+        elif how == 'min':
+            columns[column] = np.minimum.reduceat(values, starts)
+        elif how == 'sum':
+            columns[column] = np.add.reduceat(values, starts)
+        else:
+            columns[column] = values[ends]
+
+    return pd.DataFrame(columns, index=periods[starts])
+
+def align_to_timeframe(higher, higher_timeframe, index, timeframe):
+    """
+    Joins higher-timeframe values (e.g. a daily regime MA) onto lower-timeframe
+    bars without lookahead: a lower bar only sees the higher bars that had closed
+    by the time it closed itself.
+
+    Args:
+        higher (pd.Series or pd.DataFrame): Values on higher-timeframe bars, labelled by period start.
+        higher_timeframe (str): The timeframe of `higher`, e.g. '1d'.
+        index (pd.DatetimeIndex): The lower-timeframe bars, labelled by period start.
+        timeframe (str): The timeframe of `index`, e.g. '1h'.
+
+    Returns:
+        The values of the latest closed higher bar on every lower bar, NaN before the first one.
+    """
+    if len(higher) == 0:
+        if isinstance(higher, pd.DataFrame):
+            return pd.DataFrame(np.nan, index=index, columns=higher.columns)
+        return pd.Series(np.nan, index=index, name=higher.name)
+    available_at = (higher.index + timeframe_to_timedelta(higher_timeframe)).as_unit('ns')
+    decided_at = (index + timeframe_to_timedelta(timeframe)).as_unit('ns')
+    position = available_at.searchsorted(decided_at, side='right') - 1
+
+    aligned = higher.iloc[np.maximum(position, 0)].astype(float)
+    aligned.index = index
+    aligned.iloc[position < 0] = np.nan
+    return aligned
+
+
+class OhlcvResampler:
+    """
+    Derives higher-timeframe bars on demand from the base bars kept in a
+    MarketDataStore, so every timeframe is served from a single stored series.
+
+    Results are cached per (symbol, timeframe, window) and invalidated when the
+    base partition grows; the least recently used entries are dropped first.
+    """
+    def __init__(self, store, base_timeframe='1m', max_entries=32):
+        """
+        Initializes the resampler.
+
+        Args:
+            store (MarketDataStore): The store holding the base bars.
+            base_timeframe (str): The timeframe of the stored base bars.
+            max_entries (int): The number of resampled frames kept in memory.
+        """
+        self.store = store
+        self.base_timeframe = base_timeframe
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, symbol, timeframe, start=None, end=None, columns=None):
+        """
+        Returns the bars of a symbol at the requested timeframe.
+
+        Args:
+            symbol (str): The market symbol, e.g. 'BTC/USDT'.
+            timeframe (str): The requested timeframe, e.g. '4h'.
+            start (optional): The first timestamp to include. It is rounded down to
+                a period start so the first bar is complete.
+            end (optional): The last base-bar timestamp to include.
+            columns (list, optional): The columns to read. Defaults to all.
+
+        Returns:
+            pd.DataFrame: The resampled bars. Treat it as read-only.
+        """
+        if timeframe == self.base_timeframe:
+            return self.store.read(symbol, timeframe, start=start, end=end, columns=columns)
+        if start is not None:
+            start = pd.Timestamp(start).floor(timeframe_to_timedelta(timeframe))
+
+        key = (symbol, timeframe, start, end, tuple(columns) if columns else None,
+               self.store.row_count(symbol, self.base_timeframe))
+        bars = self._cache.get(key)
+        if bars is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return bars
+
+        self.misses += 1
+        base = self.store.read(symbol, self.base_timeframe, start=start, end=end, columns=columns)
+        bars = resample_ohlcv(base, timeframe)
+        self._cache[key] = bars
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return bars
+
+    def clear(self):
+        """Drops every cached frame."""
+        self._cache.clear()
\ No newline at end of file
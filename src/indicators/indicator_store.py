@@ -0,0 +1,87 @@
+# src/indicators/indicator_store.py
+
+import hashlib
+from collections import OrderedDict
+
+import pandas as pd
+import numpy as np
+
+from src.indicators.indicators import INDICATORS
+from src.profiling.stage_profiler import profiler
+
+class IndicatorStore:
+    """
+    Memoizes computed indicator columns so that strategies (and parameter sweeps
+    running thousands of configurations) compute each indicator only once.
+
+    Entries are keyed by (input series contents, indicator name, parameters) and
+    evicted least-recently-used first once the memory cap is exceeded.
+    """
+    def __init__(self, max_bytes=512 * 1024 ** 2):
+        """
+        Initializes the store.
+
+        Args:
+            max_bytes (int): The memory cap for cached indicator values, in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def get(self, name, *series, **params):
+        """
+        Returns an indicator computed over the given input series, from the cache if possible.
+
+        Args:
+            name (str): The indicator name, e.g. 'ema', 'sma' or 'atr'.
+            *series (pd.Series): The input series the indicator is computed from.
+            **params: The indicator parameters, e.g. span=21.
+
+        Returns:
+            pd.Series: The indicator on the index of the first input series. Treat it as read-only.
+        """
+        key = (tuple(self._fingerprint(s) for s in series), name, tuple(sorted(params.items())))
+
+        values = self._cache.get(key)
+        if values is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        else:
+            self.misses += 1
+            with profiler.stage(f'indicator:{name}'):
+                values = INDICATORS[name](*series, **params).to_numpy()
+            self._store(key, values)
+
+        # Cached values are index-free, so identical data under a different index shares one entry
+        return pd.Series(values, index=series[0].index, copy=False)
+
+    def clear(self):
+        """Drops every cached indicator."""
+        self._cache.clear()
+        self.nbytes = 0
+
+    def _store(self, key, values):
+        """Adds an entry and evicts the least recently used ones beyond the memory cap."""
+        if values.nbytes > self.max_bytes:
+            return
+        values.flags.writeable = False
+        self._cache[key] = values
+        self.nbytes += values.nbytes
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    @staticmethod
+    def _fingerprint(series):
+        """Identifies a series by its length, dtype and a digest of its values."""
+        values = np.ascontiguousarray(series.to_numpy())
+        return (len(values), values.dtype.str, hashlib.sha1(memoryview(values).cast('B')).hexdigest())
+
+
+# The store shared by all strategies unless they are given their own
+default_store = IndicatorStore()
\ No newline at end of file
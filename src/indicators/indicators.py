@@ -0,0 +1,97 @@
+# src/indicators/indicators.py
+
+import pandas as pd
+import numpy as np
+
+# The indicator library. Every function takes pandas Series and returns a Series
+# on the same index, so results can be memoized by the IndicatorStore.
+
+def ema(series, span, initial=None):
+    """
+    Exponential moving average (recursive form, adjust=False).
+
+    With `initial`, the EMA of the bar before the series, the recursion continues
+    from that value exactly as if the earlier bars had been part of the series.
+    """
+    if initial is None:
+        return series.ewm(span=span, adjust=False).mean()
+    seeded = pd.Series(np.concatenate([[initial], series.to_numpy(dtype=float)]))
+    return pd.Series(seeded.ewm(span=span, adjust=False).mean().to_numpy()[1:], index=series.index)
+
+def sma(series, window):
+    """Simple moving average over a fixed window."""
+    return series.rolling(window=window).mean()
+
+def rolling_min(series, window):
+    """Lowest value over a fixed window."""
+    return series.rolling(window=window).min()
+
+def rolling_slope(series, window, block_size=1024):
+    """
+    Slope of the least-squares line through the last `window` values.
+
+    Equivalent to a rolling np.polyfit(range(window), x, 1)[0] (NaN until a full
+    window of valid values is available) but computed in O(n) from running sums:
+    with S the window sum and D the sum of j * y[j] over the window positions j,
+    slope = (D - S * (window - 1) / 2) / Sxx. D follows the recurrence
+    D[i] = D[i-1] + window * y[i] - S[i], which is accumulated in blocks that are
+    re-anchored with an exact dot product to keep rounding error bounded.
+
+    Args:
+        series (pd.Series): The input values.
+        window (int): The number of points in each regression (at least 2).
+        block_size (int): Bars between exact re-anchoring of the running sum.
+
+    Returns:
+        pd.Series: The rolling slope, per bar.
+    """
+    if window < 2:
+        raise ValueError("The slope window must contain at least 2 points.")
+
+    y = series.to_numpy(dtype=float)
+    n = len(y)
+    valid = ~np.isnan(y)
+    y = np.where(valid, y, 0.0)
+
+    # 1. Window sums (pandas' rolling sum is compensated against drift)
+    window_sum = pd.Series(y).rolling(window=window, min_periods=1).sum().to_numpy()
+
+    # 2. D via the recurrence, accumulated per block from exact anchors
+    n_blocks = -(-n // block_size)
+    increments = np.zeros(n_blocks * block_size)
+    increments[:n] = window * y - window_sum
+    padded = np.concatenate([np.zeros(window), y, np.zeros(n_blocks * block_size - n)])
+    weights = np.arange(window, dtype=float)
+    anchors = np.lib.stride_tricks.sliding_window_view(padded, window)[::block_size][:n_blocks] @ weights
+    weighted_sum = (np.cumsum(increments.reshape(n_blocks, block_size), axis=1) + anchors[:, None]).ravel()[:n]
+
+    # 3. Slope from the centred sums
+    sxx = window * (window ** 2 - 1) / 12.0
+    slope = (weighted_sum - window_sum * (window - 1) / 2.0) / sxx
+
+    # 4. Only windows made entirely of valid values have a slope
+    valid_count = np.concatenate([[0], np.cumsum(valid)])
+    full_window = np.zeros(n, dtype=bool)
+    full_window[window - 1:] = (valid_count[window:] - valid_count[:-window]) == window
+    slope[~full_window] = np.nan
+
+    return pd.Series(slope, index=series.index)
+
+def atr(high, low, close, window=14):
+    """Average True Range: the rolling mean of the true range."""
+    high_low = high - low
+    high_close = abs(high - close.shift())
+    low_close = abs(low - close.shift())
+    ranges = pd.concat([high_low, high_close, low_close], axis=1)
+    true_range = ranges.max(axis=1)
+    return true_range.rolling(window=window).mean()
+
+
+# Indicators available through the IndicatorStore, keyed by name
+INDICATORS = {
+    'ema': ema,
+    'sma': sma,
+    'rolling_min': rolling_min,
+    'rolling_slope': rolling_slope,
+    'atr': atr,
+}
\ No newline at end of file
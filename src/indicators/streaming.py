@@ -0,0 +1,106 @@
+# src/indicators/streaming.py
+
+from collections import deque
+
+import numpy as np
+
+# Incremental counterparts of the indicator library. Each keeps just enough
+# state to fold in one new value in O(1) and returns the indicator's latest value,
+# matching the batch functions in src/indicators/indicators.py.
+
+class StreamingEma:
+    """Exponential moving average (adjust=False), updated one value at a time."""
+    def __init__(self, span):
+        # Same alpha derivation as pandas' ewm(span=...)
+        com = (span - 1) / 2.0
+        self.alpha = 1.0 / (1.0 + com)
+        self.value = np.nan
+        self._old_weight = 1.0
+
+    def update(self, x):
+        # Mirrors pandas' recursive ewm, including how missing values decay the old weight
+        if self.value != self.value:
+            if x == x:
+                self.value = x
+                self._old_weight = 1.0
+            return self.value
+
+        self._old_weight *= (1 - self.alpha)
+        if x == x:
+            if self.value != x:
+                self.value = (self._old_weight * self.value + self.alpha * x) / (self._old_weight + self.alpha)
+            self._old_weight = 1.0
+        return self.value
+
+
+class StreamingSma:
+    """Simple moving average over a fixed window, using a compensated running sum."""
+    def __init__(self, window):
+        self.window = window
+        self._values = deque(maxlen=window)
+        self._sum = 0.0
+        self._compensation = 0.0
+        self._valid = 0
+
+    def _add(self, x):
+        # Kahan summation keeps the running sum from drifting over long streams
+        y = x - self._compensation
+        t = self._sum + y
+        self._compensation = (t - self._sum) - y
+        self._sum = t
+
+    def update(self, x):
+        if len(self._values) == self.window:
+            dropped = self._values[0]
+            if dropped == dropped:
+                self._add(-dropped)
+                self._valid -= 1
+        self._values.append(x)
+        if x == x:
+            self._add(x)
+            self._valid += 1
+        return self._sum / self.window if self._valid == self.window else np.nan
+
+
+class StreamingRollingMin:
+    """Lowest value over a fixed window, using a monotonic queue."""
+    def __init__(self, window):
+        self.window = window
+        self._count = 0
+        self._candidates = deque()  # (position, value) with increasing values
+        self._missing = deque()     # positions of missing values still inside the window
+
+    def update(self, x):
+        position = self._count
+        self._count += 1
+        if x == x:
+            while self._candidates and self._candidates[-1][1] >= x:
+                self._candidates.pop()
+            self._candidates.append((position, x))
+        else:
+            self._missing.append(position)
+
+        oldest = position - self.window + 1
+        while self._candidates and self._candidates[0][0] < oldest:
+            self._candidates.popleft()
+        while self._missing and self._missing[0] < oldest:
+            self._missing.popleft()
+
+        if oldest < 0 or self._missing:
+            return np.nan
+        return self._candidates[0][1]
+
+
+class StreamingSlope:
+    """Slope of the least-squares line through the last `window` values."""
+    def __init__(self, window):
+        self.window = window
+        self._values = deque(maxlen=window)
+        self._weights = (np.arange(window) - (window - 1) / 2.0) / (window * (window ** 2 - 1) / 12.0)
+
+    def update(self, x):
+        self._values.append(x)
+        if len(self._values) < self.window:
+            return np.nan
+        # A fixed-size dot product: constant work per value regardless of history length
+        return float(np.dot(self._weights, self._values))
\ No newline at end of file
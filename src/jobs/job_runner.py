@@ -0,0 +1,397 @@
+# src/jobs/job_runner.py
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from src.analytics.performance_metrics import compute_metrics
+from src.data.data_manager import DataManager
+from src.data.market_store import MarketDataStore
+from src.indicators.indicators import atr
+from src.optimization.parameter_sweep import RISK_PARAMETERS, SharedMarketData, attach_shared_data, parameter_grid
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.portfolio.result_cache import ResultCache
+from src.risk.risk_manager import RiskManager
+from src.strategies.sopr_ema_strategy import SoprEmaStrategy
+from src.strategies.asymmetrical_ema_strategy import AsymmetricalEmaStrategy
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+
+# The strategies a job file can name
+STRATEGIES = {
+    'sopr_ema': SoprEmaStrategy,
+    'asymmetrical_ema': AsymmetricalEmaStrategy,
+    'ma_crossover': MovingAverageCrossoverStrategy,
+}
+
+# The files a run can write next to its run.json
+RUN_OUTPUTS = ('equity', 'trades', 'plot')
+
+
+def load_job_file(path):
+    """
+    Reads and checks a JSON job file. A job has:
+
+    - datasets: named inputs, each {"path": ..., "index_col", "start", "end",
+      "rename": {old: new}, "join": [inputs joined on the timestamps, with an
+      optional "columns" list], "atr_window", "periods_per_year", "chunk_rows"}.
+      Datasets with "chunk_rows" are store partitions streamed in chunks of that
+      many rows through PortfolioManager.run_chunked instead of being loaded.
+    - cost_models: named {"commission_pct": ..., "slippage_pct": ...}; backtests
+      without a "cost_model" use the one named "default", if any.
+    - backtests: each {"name", "dataset", "strategy" (a key of STRATEGIES),
+      "params" (values or lists of values, expanded into a grid), "cost_model",
+      "initial_capital", "engine", "risk" (RiskManager overrides), "outputs"}.
+    - optionally output_dir, config (the config.ini with the [Risk] and [Cache]
+      sections), workers and cache.
+
+    Returns:
+        dict: The job.
+    """
+    with open(path) as f:
+        job = json.load(f)
+
+    for key in ('datasets', 'backtests'):
+        if not job.get(key):
+            raise ValueError(f"The job file {path} has no '{key}'.")
+    for name, spec in job['datasets'].items():
+        chunk_rows = spec.get('chunk_rows')
+        if chunk_rows is not None and (not isinstance(chunk_rows, int) or chunk_rows < 1):
+            raise ValueError(f"Dataset '{name}' needs a positive integer 'chunk_rows', got {chunk_rows!r}.")
+    cost_models = job.get('cost_models', {})
+    names = set()
+    for backtest in job['backtests']:
+        name = backtest.get('name')
+        if not name or name in names:
+            raise ValueError(f"Every backtest in {path} needs a unique 'name'.")
+        names.add(name)
+        if backtest.get('dataset') not in job['datasets']:
+            raise ValueError(f"Backtest '{name}' uses an unknown dataset '{backtest.get('dataset')}'.")
+        if backtest.get('strategy') not in STRATEGIES:
+            raise ValueError(f"Backtest '{name}' uses an unknown strategy '{backtest.get('strategy')}'. "
+                             f"Choose one of {tuple(STRATEGIES)}.")
+        if 'cost_model' in backtest and backtest['cost_model'] not in cost_models:
+            raise ValueError(f"Backtest '{name}' uses an unknown cost model '{backtest['cost_model']}'.")
+        unknown = set(backtest.get('outputs', [])) - set(RUN_OUTPUTS)
+        if unknown:
+            raise ValueError(f"Backtest '{name}' requests unknown outputs {sorted(unknown)}. Choose from {RUN_OUTPUTS}.")
+        if 'plot' in backtest.get('outputs', []) and job['datasets'][backtest['dataset']].get('chunk_rows'):
+            raise ValueError(f"Backtest '{name}' cannot plot its chunked dataset '{backtest['dataset']}'.")
+    return job
+
+
+def expand_runs(job):
+    """
+    Expands the backtests of a job into one run per parameter set.
+
+    Returns:
+        list: One dict per run, with its backtest name, run id, dataset, strategy,
+            strategy and PortfolioManager risk parameters, costs and outputs.
+    """
+    cost_models = job.get('cost_models', {})
+    runs = []
+    for backtest in job['backtests']:
+        costs = cost_models.get(backtest.get('cost_model', 'default'), {})
+        param_ranges = {name: values if isinstance(values, list) else [values]
+                        for name, values in backtest.get('params', {}).items()}
+        for number, params in enumerate(parameter_grid(param_ranges)):
+            runs.append({
+                'backtest': backtest['name'],
+                'run_id': f'run_{number:04d}',
+                'dataset': backtest['dataset'],
+                'strategy': backtest['strategy'],
+                'strategy_params': {k: v for k, v in params.items() if k not in RISK_PARAMETERS},
+                'risk_params': {k: v for k, v in params.items() if k in RISK_PARAMETERS},
+                'risk': backtest.get('risk', {}),
+                'initial_capital': backtest.get('initial_capital', 100000.0),
+                'commission_pct': costs.get('commission_pct', 0.0),
+                'slippage_pct': costs.get('slippage_pct', 0.0),
+                'engine': backtest.get('engine', 'vectorized'),
+                'outputs': backtest.get('outputs', ['equity', 'trades']),
+                'periods_per_year': job['datasets'][backtest['dataset']].get('periods_per_year', 365),
+            })
+    return runs
+
+
+def load_dataset(spec, data_manager=None):
+    """
+    Loads a job dataset: the main input, its renamed columns, the joined inputs
+    and the ATR the risk manager sizes with.
+
+    Returns:
+        pd.DataFrame: The numeric columns of the rows where every input has data.
+    """
+    data_manager = data_manager or DataManager()
+
+    def read(source):
+        df = data_manager.load_data(source['path'], index_col=source.get('index_col', 'timestamp'),
+                                    start=spec.get('start'), end=spec.get('end'))
+        if df.empty:
+            raise ValueError(f"No data loaded from {source['path']}.")
+        return _select_columns(df, source)
+
+    data = read(spec)
+    for source in spec.get('join', []):
+        data = pd.merge(data, read(source), left_index=True, right_index=True, how='inner')
+    if 'atr' not in data:
+        data['atr'] = atr(data['high'], data['low'], data['close'], window=spec.get('atr_window', 14))
+    return data.select_dtypes('number').dropna()
+
+
+def iter_dataset_chunks(spec):
+    """
+    Streams a chunked job dataset: consecutive windows of its store partition of
+    at most spec['chunk_rows'] rows, each with its renamed columns and joined
+    inputs. The ATR is left to PortfolioManager.run_chunked, which carries its
+    warm-up across chunks.
+
+    Yields:
+        pd.DataFrame: The numeric columns of the chunk's rows where every input has data.
+    """
+    if not os.path.isdir(spec['path']):
+        raise ValueError(f"Chunked datasets must be market data store partitions; {spec['path']} is not one.")
+    for chunk in MarketDataStore.iter_partition_chunks(spec['path'], spec['chunk_rows'],
+                                                       start=spec.get('start'), end=spec.get('end')):
+        chunk = _select_columns(chunk, spec)
+        for source in spec.get('join', []):
+            other = MarketDataStore.read_partition(source['path'], start=chunk.index[0], end=chunk.index[-1])
+            chunk = chunk.join(_select_columns(other, source), how='inner')
+        yield chunk.select_dtypes('number').dropna()
+
+
+def _select_columns(df, source):
+    """Applies an input's 'rename' mapping and keeps its 'columns', if given."""
+    df = df.rename(columns=source.get('rename', {}))
+    return df[source['columns']] if 'columns' in source else df
+
+
+def build_risk_manager(config_path, overrides=None):
+    """Creates the RiskManager from the config file's [Risk] section plus a run's overrides."""
+    risk_manager = RiskManager.from_config(config_path)
+    if overrides:
+        risk_manager = RiskManager(**{**vars(risk_manager), **overrides})
+    return risk_manager
+
+
+def execute_run(run, context):
+    """
+    Runs one backtest and writes its outputs.
+
+    Args:
+        run (dict): A run from expand_runs.
+        context (dict): The loaded 'datasets', the runner 'settings' (with the
+            'data_digests' of the datasets and the specs of the 'chunked_datasets')
+            and the 'result_cache' (or None) of the current process. Chunked runs
+            are streamed from disk and not cached.
+
+    Returns:
+        dict: The summary row of the run: its identity, parameters and metrics.
+    """
+    settings = context['settings']
+    chunked = settings['chunked_datasets'].get(run['dataset'])
+    data = None if chunked else context['datasets'][run['dataset']]
+    portfolio_manager = PortfolioManager(
+        data=data,
+        strategies={'default': STRATEGIES[run['strategy']](**run['strategy_params'])},
+        risk_manager=build_risk_manager(settings['config_path'], run['risk']),
+        initial_capital=run['initial_capital'],
+        commission_pct=run['commission_pct'],
+        slippage_pct=run['slippage_pct'],
+        engine=run['engine'],
+        result_cache=None if chunked else context['result_cache'],
+        data_digest=settings['data_digests'].get(run['dataset']),
+        **run['risk_params']
+    )
+    if chunked:
+        result = portfolio_manager.run_chunked(iter_dataset_chunks(chunked), atr_window=chunked.get('atr_window', 14))
+    else:
+        result = portfolio_manager.run_backtest()
+    metrics = {name: float(value) for name, value in compute_metrics(result, periods_per_year=run['periods_per_year']).items()}
+    metrics['final_equity'] = result.final_equity
+    params = {**run['strategy_params'], **run['risk_params']}
+
+    # 1. The run's own directory: its description, metrics and requested outputs
+    run_dir = os.path.join(settings['output_dir'], run['backtest'], run['run_id'])
+    os.makedirs(run_dir, exist_ok=True)
+    with open(os.path.join(run_dir, 'run.json'), 'w') as f:
+        json.dump({'run': run, 'metrics': metrics}, f, indent=2, default=float)
+    if 'equity' in run['outputs']:
+        result.equity_series().to_csv(os.path.join(run_dir, 'equity.csv'))
+    if 'trades' in run['outputs']:
+        result.trades_frame().to_csv(os.path.join(run_dir, 'trades.csv'), index_label='timestamp')
+    if ('plot' in run['outputs'] or settings['plot']) and chunked:
+        print(f"Warning: Not plotting {run['backtest']} {run['run_id']}: its dataset is streamed in chunks.")
+    elif 'plot' in run['outputs'] or settings['plot']:
+        plot_run(result, data, os.path.join(run_dir, 'plot.png'), title=f"{run['backtest']} {run['run_id']}")
+
+    # 2. The row of the job summary
+    return {'backtest': run['backtest'], 'run_id': run['run_id'], 'dataset': run['dataset'],
+            'strategy': run['strategy'], 'initial_capital': run['initial_capital'], **params, **metrics}
+
+
+def plot_run(result, data, path, title='Strategy Performance'):
+    """
+    Saves the equity curve and the trades over the price chart as an image.
+    matplotlib is imported here, so runs without plots never load it.
+    """
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(15, 8))
+    ax1 = fig.subplots()
+
+    # Plot equity curve
+    ax1.plot(result.index, result.equity, label='Portfolio Equity', color='blue')
+    ax1.set_title(title, fontsize=16)
+    ax1.set_xlabel('Date')
+    ax1.set_ylabel('Portfolio Value ($)', color='blue')
+    ax1.tick_params(axis='y', labelcolor='blue')
+    ax1.grid(True)
+
+    # Create a second y-axis for the price
+    ax2 = ax1.twinx()
+    ax2.plot(data.index, data['close'], label='Price', color='gray', alpha=0.5, linewidth=0.75)
+    ax2.set_ylabel('Price ($)', color='gray')
+    ax2.tick_params(axis='y', labelcolor='gray')
+    ax2.set_yscale('log')
+
+    # Plot buy and sell markers on the price chart
+    trades = result.trades_frame()
+    buys = trades[trades['type'] == 'buy']
+    sells = trades[trades['type'] == 'sell']
+    ax2.scatter(buys.index, buys['price'], marker='^', color='green', s=150, zorder=5, label='Buy')
+    ax2.scatter(sells.index, sells['price'], marker='v', color='red', s=150, zorder=5, label='Sell')
+
+    # Consolidate legends without duplicate labels
+    lines, labels = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    unique_labels = dict(zip(labels2 + labels, lines2 + lines))
+    ax2.legend(unique_labels.values(), unique_labels.keys())
+
+    fig.savefig(path)
+
+
+# --- Worker process state ---
+_worker_state = {}
+
+
+def _init_worker(dataset_specs, settings):
+    """Attaches each worker process to the shared datasets and opens the result cache once."""
+    _worker_state['handles'] = []
+    datasets = {}
+    for name, spec in dataset_specs.items():
+        datasets[name], shm = attach_shared_data(spec)
+        _worker_state['handles'].append(shm)
+    _worker_state['context'] = {
+        'datasets': datasets,
+        'settings': settings,
+        'result_cache': _open_cache(settings),
+    }
+
+
+def _run_worker(run):
+    """Runs one backtest inside a worker process."""
+    return execute_run(run, _worker_state['context'])
+
+
+def _open_cache(settings):
+    """Opens the result cache configured for the job, if caching is on."""
+    return ResultCache.from_config(settings['config_path']) if settings['use_cache'] else None
+
+
+class JobRunner:
+    """
+    Runs the backtests described by a job file. Every dataset is loaded once
+    (chunked datasets are streamed by each of their runs instead), the runs are
+    spread over a process pool that attaches to the datasets in shared memory,
+    and the results are written to a structured output directory:
+
+        <output_dir>/job.json                     the job that was run
+        <output_dir>/summary.csv                  one row per run, all backtests
+        <output_dir>/<backtest>/summary.csv       the rows of one backtest
+        <output_dir>/<backtest>/<run_id>/         run.json plus equity.csv,
+                                                  trades.csv and plot.png on request
+    """
+    def __init__(self, job, output_dir=None, max_workers=None, config_path=None, use_cache=None, plot=False,
+                 chunk_rows=None):
+        """
+        Initializes the runner. Arguments left as None take the job's settings.
+
+        Args:
+            job (dict or str): The job, or the path of its JSON file.
+            output_dir (str, optional): The directory results are written to.
+            max_workers (int, optional): Number of worker processes; 1 runs everything
+                in the current process. Defaults to the CPU count.
+            config_path (str, optional): The config file with the [Risk] and [Cache] sections.
+            use_cache (bool, optional): Whether to load and store results in the result cache.
+            plot (bool): Whether to plot every run, whatever its outputs.
+            chunk_rows (int, optional): Stream every dataset in chunks of this many
+                rows, overriding the datasets' own 'chunk_rows'.
+        """
+        self.job = load_job_file(job) if isinstance(job, str) else job
+        if chunk_rows is not None:
+            datasets = {name: {**spec, 'chunk_rows': chunk_rows} for name, spec in self.job['datasets'].items()}
+            self.job = {**self.job, 'datasets': datasets}
+        self.output_dir = output_dir or self.job.get('output_dir', os.path.join('results', 'jobs'))
+        self.max_workers = max_workers or self.job.get('workers') or os.cpu_count() or 1
+        self.config_path = config_path or self.job.get('config', 'config.ini')
+        self.use_cache = self.job.get('cache', True) if use_cache is None else use_cache
+        self.plot = plot
+
+    def runs(self):
+        """Returns the runs of the job, one per backtest parameter set."""
+        return expand_runs(self.job)
+
+    def run(self):
+        """
+        Runs every backtest of the job and writes the results.
+
+        Returns:
+            pd.DataFrame: The job summary, one row per run.
+        """
+        runs = self.runs()
+        settings = {
+            'output_dir': self.output_dir,
+            'config_path': self.config_path,
+            'use_cache': self.use_cache,
+            'plot': self.plot,
+        }
+
+        # 1. Load every dataset the runs need, once; chunked ones are streamed per run
+        data_manager = DataManager()
+        specs = {name: self.job['datasets'][name] for name in dict.fromkeys(run['dataset'] for run in runs)}
+        settings['chunked_datasets'] = {name: spec for name, spec in specs.items() if spec.get('chunk_rows')}
+        datasets = {name: load_dataset(spec, data_manager)
+                    for name, spec in specs.items() if name not in settings['chunked_datasets']}
+        # Hash each dataset once for the result cache keys, not once per run
+        settings['data_digests'] = ({name: ResultCache.data_digest(data) for name, data in datasets.items()}
+                                    if self.use_cache else {})
+
+        # 2. Run in-process or across the worker pool
+        os.makedirs(self.output_dir, exist_ok=True)
+        with open(os.path.join(self.output_dir, 'job.json'), 'w') as f:
+            json.dump(self.job, f, indent=2)
+        if self.max_workers == 1 or len(runs) <= 1:
+            context = {'datasets': datasets, 'settings': settings, 'result_cache': _open_cache(settings)}
+            rows = [execute_run(run, context) for run in runs]
+        else:
+            rows = self._run_parallel(runs, datasets, settings)
+
+        # 3. The summaries, job-wide and per backtest
+        summary = pd.DataFrame(rows)
+        summary.to_csv(os.path.join(self.output_dir, 'summary.csv'), index=False)
+        for backtest, backtest_rows in summary.groupby('backtest', sort=False):
+            backtest_rows.dropna(axis=1, how='all').to_csv(os.path.join(self.output_dir, backtest, 'summary.csv'), index=False)
+        return summary
+
+    def _run_parallel(self, runs, datasets, settings):
+        """Fans the runs out over a process pool sharing the datasets."""
+        shared = {name: SharedMarketData(data) for name, data in datasets.items()}
+        try:
+            chunksize = max(1, len(runs) // (self.max_workers * 4))
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=({name: s.spec for name, s in shared.items()}, settings)) as executor:
+                return list(executor.map(_run_worker, runs, chunksize=chunksize))
+        finally:
+            for block in shared.values():
+                block.close()
\ No newline at end of file
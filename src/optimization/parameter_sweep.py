@@ -0,0 +1,295 @@
+# src/optimization/parameter_sweep.py
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import pandas as pd
+import numpy as np
+
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.risk.risk_manager import RiskManager
+from src.analytics.performance_metrics import total_return, max_drawdown
+
+# Parameters that configure the PortfolioManager's risk sizing and stop orders rather than the strategy
+RISK_PARAMETERS = ('risk_percentage', 'stop_loss_atr_multiplier', 'stop_loss',
+                   'take_profit_atr_multiplier', 'trailing_stop_atr_multiplier')
+
+
+class SharedMarketData:
+    """
+    Holds a market data DataFrame in a shared memory block so that worker
+    processes can attach to it read-only instead of receiving a pickled copy.
+    """
+    def __init__(self, data):
+        """
+        Copies the numeric columns of the DataFrame into shared memory.
+
+        Args:
+            data (pd.DataFrame): The market data to share.
+        """
+        values = data.to_numpy(dtype=np.float64).T  # one contiguous row per column
+        self._shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        block = np.ndarray(values.shape, dtype=np.float64, buffer=self._shm.buf)
+        block[:] = values
+
+        self.spec = {
+            'name': self._shm.name,
+            'shape': values.shape,
+            'columns': list(data.columns),
+            'index': data.index,
+        }
+
+    def close(self):
+        """Releases and destroys the shared memory block."""
+        self._shm.close()
+        self._shm.unlink()
+
+
+def attach_shared_data(spec):
+    """
+    Attaches to a SharedMarketData block and returns a read-only DataFrame view
+    of it, together with the SharedMemory handle that keeps the view alive.
+    """
+    shm = shared_memory.SharedMemory(name=spec['name'])
+    block = np.ndarray(spec['shape'], dtype=np.float64, buffer=shm.buf)
+    block.flags.writeable = False
+    # The transposed view has the (bars x columns) layout pandas stores natively, so no copy is made
+    data = pd.DataFrame(block.T, index=spec['index'], columns=spec['columns'], copy=False)
+    return data, shm
+
+
+# --- Worker process state ---
+_worker_state = {}
+
+
+def _init_worker(spec, settings):
+    """Attaches each worker process to the shared market data once."""
+    data, shm = attach_shared_data(spec)
+    _worker_state['data'] = data
+    _worker_state['shm'] = shm
+    _worker_state['settings'] = settings
+
+
+def _run_worker_config(params):
+    """Runs one configuration inside a worker process."""
+    # Strategies only read their input, so every run shares the attached block as is
+    return run_single_backtest(_worker_state['data'], params, _worker_state['settings'])
+
+
+def run_single_backtest(data, params, settings):
+    """
+    Runs one backtest for a parameter set and summarises the result.
+
+    Args:
+        data (pd.DataFrame): Market data with OHLC, ATR and any strategy inputs.
+        params (dict): Strategy parameters plus optional risk parameters.
+        settings (dict): Strategy class, capital, costs, engine and result storage for the run.
+
+    Returns:
+        dict: The parameters together with return, drawdown and trade count, plus
+            the compacted BacktestResult under 'result' if results are kept.
+    """
+    strategy_params = {k: v for k, v in params.items() if k not in RISK_PARAMETERS}
+    risk_params = {k: v for k, v in params.items() if k in RISK_PARAMETERS}
+
+    portfolio_manager = PortfolioManager(
+        data=data,
+        strategies={'default': settings['strategy_class'](**strategy_params)},
+        risk_manager=settings['risk_manager'],
+        initial_capital=settings['initial_capital'],
+        commission_pct=settings['commission_pct'],
+        slippage_pct=settings['slippage_pct'],
+        engine=settings['engine'],
+        result_cache=settings.get('result_cache'),
+        data_digest=settings.get('data_digest'),
+        **risk_params
+    )
+    return summarize_run(params, portfolio_manager.run_backtest(), settings)
+
+
+def summarize_run(params, result, settings):
+    """Summarises one configuration's BacktestResult as a results row."""
+    summary = dict(params)
+    summary['total_return_pct'] = total_return(result.equity) * 100
+    summary['max_drawdown_pct'] = max_drawdown(result) * 100
+    summary['trade_count'] = len(result.trades)
+    if settings.get('keep_results'):
+        summary['result'] = result.compact(dtype=settings['result_dtype'], max_points=settings['max_equity_points'])
+    return summary
+
+
+def parameter_grid(param_ranges):
+    """Returns every combination of the parameter ranges as a list of dicts."""
+    names = list(param_ranges)
+    return [dict(zip(names, values)) for values in itertools.product(*param_ranges.values())]
+
+
+class ParameterSweep:
+    """
+    Backtests many strategy/risk configurations in parallel and ranks the results.
+    The market data is placed in shared memory once and attached read-only by
+    every worker process.
+    """
+    def __init__(self, data, strategy_class, param_ranges, initial_capital=100000.0, commission_pct=0.0, slippage_pct=0.0, engine='vectorized', max_workers=None,
+                 keep_results=False, result_dtype='float64', max_equity_points=None, batched=False,
+                 result_cache=None, risk_manager=None):
+        """
+        Initializes the sweep.
+
+        Args:
+            data (pd.DataFrame): Market data with OHLC, ATR and any strategy inputs.
+            strategy_class: The strategy class to instantiate for every configuration.
+            param_ranges (dict): Candidate values per parameter, e.g. {'short_ema': [13, 21]}.
+                The keys in RISK_PARAMETERS (risk sizing and stop orders) are passed
+                to the PortfolioManager, all others to the strategy.
+            initial_capital (float): Starting capital for every backtest.
+            commission_pct (float): The commission percentage per trade.
+            slippage_pct (float): The slippage percentage per trade.
+            engine (str): The PortfolioManager engine to use.
+            max_workers (int, optional): Number of worker processes. Defaults to the CPU count;
+                1 runs everything in the current process.
+            keep_results (bool): Whether to keep every run's BacktestResult in a 'result' column.
+            result_dtype (str): The dtype kept results store their equity in, e.g. 'float32'.
+            max_equity_points (int, optional): Downsample kept equity curves to about
+                this many points (see BacktestResult.compact).
+            batched (bool): Whether to evaluate all configurations sharing the same risk
+                parameters together, through the strategy's generate_signals_batch and
+                a batched backtest, in the current process.
+            result_cache (ResultCache, optional): A persistent result cache shared by all
+                runs, so configurations computed by earlier sweeps are loaded, not rerun.
+            risk_manager (RiskManager, optional): The risk manager of every run, e.g.
+                RiskManager.from_config; swept risk parameters override its settings.
+                Defaults to RiskManager().
+        """
+        if batched and not hasattr(strategy_class, 'generate_signals_batch'):
+            raise ValueError(f"{strategy_class.__name__} has no batched signal generation.")
+        if batched and engine != 'vectorized':
+            raise ValueError("Batched sweeps require the 'vectorized' engine.")
+        self.data = data
+        self.strategy_class = strategy_class
+        self.param_ranges = param_ranges
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.batched = batched
+        self.settings = {
+            'strategy_class': strategy_class,
+            'initial_capital': initial_capital,
+            'commission_pct': commission_pct,
+            'slippage_pct': slippage_pct,
+            'engine': engine,
+            'keep_results': keep_results,
+            'result_dtype': result_dtype,
+            'max_equity_points': max_equity_points,
+            'result_cache': result_cache,
+            'risk_manager': risk_manager or RiskManager(),
+            # Hashed once here rather than by every configuration's backtest
+            'data_digest': result_cache.data_digest(data) if result_cache is not None else None,
+        }
+
+    def grid(self):
+        """Returns every combination of the parameter ranges."""
+        return parameter_grid(self.param_ranges)
+
+    def random(self, n_samples, seed=None):
+        """Returns n_samples configurations drawn uniformly from the parameter ranges."""
+        rng = np.random.default_rng(seed)
+        return [
+            {name: values[rng.integers(len(values))] for name, values in self.param_ranges.items()}
+            for _ in range(n_samples)
+        ]
+
+    def run(self, search='grid', n_samples=100, seed=None, rank_by='total_return_pct', ascending=False):
+        """
+        Runs the sweep.
+
+        Args:
+            search (str): 'grid' for the full grid or 'random' for random search.
+            n_samples (int): Number of configurations to draw for random search.
+            seed (int, optional): Seed for random search.
+            rank_by (str): The result column to rank by.
+            ascending (bool): Whether smaller values of rank_by rank higher.
+
+        Returns:
+            pd.DataFrame: One row per configuration, best first.
+        """
+        if search == 'grid':
+            configs = self.grid()
+        elif search == 'random':
+            configs = self.random(n_samples, seed=seed)
+        else:
+            raise ValueError(f"Unknown search '{search}'. Choose 'grid' or 'random'.")
+
+        if self.batched:
+            rows = self._run_batched(configs)
+        elif self.max_workers == 1 or len(configs) <= 1:
+            rows = [run_single_backtest(self.data, params, self.settings) for params in configs]
+        else:
+            rows = self._run_parallel(configs)
+
+        results = pd.DataFrame(rows)
+        return results.sort_values(rank_by, ascending=ascending).reset_index(drop=True)
+
+    def _run_batched(self, configs):
+        """
+        Runs the configurations in batches: one batch of signals and one batched
+        backtest per distinct combination of risk parameters. With a result cache,
+        only the configurations missing from it are computed.
+        """
+        cache = self.settings['result_cache']
+        groups = {}
+        for params in configs:
+            risk_params = tuple((k, v) for k, v in params.items() if k in RISK_PARAMETERS)
+            groups.setdefault(risk_params, []).append(params)
+
+        rows = []
+        for risk_params, group in groups.items():
+            strategy_params = [{k: v for k, v in params.items() if k not in RISK_PARAMETERS} for params in group]
+            keys = [None] * len(group)
+            missing = list(range(len(group)))
+            if cache is not None:
+                missing = []
+                for k, params in enumerate(strategy_params):
+                    keys[k] = self._portfolio_manager(self.strategy_class(**params), risk_params).cache_key()
+                    result = cache.load_result(keys[k], self.data.index)
+                    if result is None:
+                        missing.append(k)
+                    else:
+                        rows.append(summarize_run(group[k], result, self.settings))
+            if not missing:
+                continue
+
+            strategy = self.strategy_class()
+            signals = strategy.generate_signals_batch(self.data, [strategy_params[k] for k in missing])
+            portfolio_manager = self._portfolio_manager(strategy, risk_params)
+            portfolio_manager.run_backtest_batch(signals)
+            for k, result in zip(missing, portfolio_manager.batch_results):
+                if cache is not None:
+                    cache.save_result(keys[k], result)
+                rows.append(summarize_run(group[k], result, self.settings))
+        return rows
+
+    def _portfolio_manager(self, strategy, risk_params):
+        """Creates the PortfolioManager of a batched run with the sweep's settings."""
+        return PortfolioManager(
+            data=self.data,
+            strategies={'default': strategy},
+            risk_manager=self.settings['risk_manager'],
+            initial_capital=self.settings['initial_capital'],
+            commission_pct=self.settings['commission_pct'],
+            slippage_pct=self.settings['slippage_pct'],
+            engine=self.settings['engine'],
+            data_digest=self.settings['data_digest'],
+            **dict(risk_params)
+        )
+
+    def _run_parallel(self, configs):
+        """Fans the configurations out over a process pool sharing the market data."""
+        shared = SharedMarketData(self.data)
+        try:
+            chunksize = max(1, len(configs) // (self.max_workers * 4))
+            with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker,
+                                     initargs=(shared.spec, self.settings)) as executor:
+                return list(executor.map(_run_worker_config, configs, chunksize=chunksize))
+        finally:
+            shared.close()
\ No newline at end of file
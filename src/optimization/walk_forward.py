@@ -0,0 +1,215 @@
+# src/optimization/walk_forward.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.risk.risk_manager import RiskManager
+from src.analytics.performance_metrics import compute_metrics
+from src.optimization.parameter_sweep import RISK_PARAMETERS, SharedMarketData, attach_shared_data, parameter_grid
+from src.strategies.precomputed_signal_strategy import PrecomputedSignalStrategy
+from src.strategies.strategy_contract import read_only_view
+
+
+# --- Worker process state ---
+_worker_state = {}
+
+
+def _init_worker(data_spec, signal_spec, settings):
+    """Attaches each worker process to the shared market data and signals once."""
+    _worker_state['data'], _worker_state['data_shm'] = attach_shared_data(data_spec)
+    _worker_state['signals'], _worker_state['signal_shm'] = attach_shared_data(signal_spec)
+    _worker_state['settings'] = settings
+
+
+def _run_worker_fold(fold):
+    return run_fold(_worker_state['data'], _worker_state['signals'], fold, _worker_state['settings'])
+
+
+def _backtest(data, signals, risk_params, settings):
+    """Runs one backtest of precomputed signals over a window of data."""
+    portfolio_manager = PortfolioManager(
+        data=data,
+        strategies={'default': PrecomputedSignalStrategy(signals)},
+        risk_manager=settings['risk_manager'],
+        initial_capital=settings['initial_capital'],
+        commission_pct=settings['commission_pct'],
+        slippage_pct=settings['slippage_pct'],
+        engine=settings['engine'],
+        **risk_params
+    )
+    return portfolio_manager.run_backtest().equity
+
+
+def run_fold(data, signals, fold, settings):
+    """
+    Optimizes on one fold's training window and evaluates the winner on its test window.
+
+    Args:
+        data (pd.DataFrame): The full market data.
+        signals (pd.DataFrame): One column of full-history signals per strategy configuration.
+        fold (dict): The fold's positional 'train' and 'test' (start, stop) bounds.
+        settings (dict): The configurations, objective, capital and costs.
+
+    Returns:
+        dict: The fold bounds, the chosen parameters, the train score and the test equity.
+    """
+    train = data.iloc[slice(*fold['train'])]
+    test = data.iloc[slice(*fold['test'])]
+
+    best_score, best = -np.inf, None
+    for config in settings['configs']:
+        column = signals[config['signal_column']]
+        equity = _backtest(train, column, config['risk_params'], settings)
+        score = compute_metrics(equity, periods_per_year=settings['periods_per_year'])[settings['objective']]
+        # Configurations without a defined score (e.g. no trades at all) never win
+        if not np.isnan(score) and score > best_score:
+            best_score, best = score, config
+
+    if best is None:
+        best = settings['configs'][0]
+    test_equity = _backtest(test, signals[best['signal_column']], best['risk_params'], settings)
+
+    return dict(fold, params=best['params'], train_score=best_score, test_equity=test_equity)
+
+
+class WalkForwardOptimizer:
+    """
+    Walk-forward optimization: slices the data into rolling train/test windows,
+    picks the best parameters on each training window, evaluates them on the
+    following unseen test window, and stitches the out-of-sample equity together.
+
+    Signals for every strategy configuration are generated once over the full
+    history and shared by all folds (they overlap heavily), and the folds run in
+    parallel worker processes attached to the shared data.
+    """
+    def __init__(self, data, strategy_class, param_ranges, train_bars, test_bars, step_bars=None, objective='sharpe_ratio', initial_capital=100000.0, commission_pct=0.0, slippage_pct=0.0, engine='vectorized', periods_per_year=365, max_workers=None,
+                 risk_manager=None):
+        """
+        Initializes the optimizer.
+
+        Args:
+            data (pd.DataFrame): Market data with OHLC, ATR and any strategy inputs.
+            strategy_class: The strategy class to optimize.
+            param_ranges (dict): Candidate values per parameter, as for ParameterSweep.
+            train_bars (int): The length of each training window.
+            test_bars (int): The length of each test window.
+            step_bars (int, optional): How far the windows roll forward, at least test_bars
+                so test windows never overlap. Defaults to test_bars (contiguous test windows).
+            objective (str): The compute_metrics key maximized on the training window.
+            initial_capital (float): Starting capital for every window.
+            commission_pct (float): The commission percentage per trade.
+            slippage_pct (float): The slippage percentage per trade.
+            engine (str): The PortfolioManager engine to use.
+            periods_per_year (int): Bars per year, for annualized objectives.
+            max_workers (int, optional): Worker processes; 1 runs in the current process.
+            risk_manager (RiskManager, optional): The risk manager of every backtest;
+                swept risk parameters override its settings. Defaults to RiskManager().
+        """
+        self.data = data
+        self.strategy_class = strategy_class
+        self.param_ranges = param_ranges
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.step_bars = step_bars or test_bars
+        if self.step_bars < test_bars:
+            raise ValueError("step_bars must be at least test_bars so that test windows do not overlap.")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.settings = {
+            'objective': objective,
+            'initial_capital': initial_capital,
+            'commission_pct': commission_pct,
+            'slippage_pct': slippage_pct,
+            'engine': engine,
+            'periods_per_year': periods_per_year,
+            'risk_manager': risk_manager or RiskManager(),
+        }
+
+    def folds(self):
+        """Returns the positional (start, stop) train and test bounds of every fold."""
+        folds = []
+        start = 0
+        while start + self.train_bars + self.test_bars <= len(self.data):
+            train_stop = start + self.train_bars
+            folds.append({'train': (start, train_stop), 'test': (train_stop, train_stop + self.test_bars)})
+            start += self.step_bars
+        return folds
+
+    def run(self):
+        """
+        Runs every fold.
+
+        Returns:
+            A tuple containing (out_of_sample_equity, report): the stitched test-window
+            equity as a pd.Series, and a pd.DataFrame with one row per fold holding its
+            dates, chosen parameters, train score and test return.
+        """
+        folds = self.folds()
+        if not folds:
+            raise ValueError("The data is too short for a single train/test window.")
+
+        signals = self._generate_all_signals()
+        if self.max_workers == 1 or len(folds) == 1:
+            results = [run_fold(self.data, signals, fold, self.settings) for fold in folds]
+        else:
+            results = self._run_parallel(signals, folds)
+
+        return self._stitch(results), self._report(results)
+
+    def _generate_all_signals(self):
+        """Generates full-history signals once per distinct strategy configuration."""
+        columns, configs = {}, []
+        for params in parameter_grid(self.param_ranges):
+            strategy_params = {k: v for k, v in params.items() if k not in RISK_PARAMETERS}
+            key = repr(sorted(strategy_params.items()))
+            if key not in columns:
+                strategy = self.strategy_class(**strategy_params)
+                columns[key] = strategy.generate_signals(read_only_view(self.data))['signal'].to_numpy(dtype=float)
+            configs.append({
+                'params': params,
+                'signal_column': list(columns).index(key),
+                'risk_params': {k: v for k, v in params.items() if k in RISK_PARAMETERS},
+            })
+
+        self.settings['configs'] = configs
+        return pd.DataFrame(np.column_stack(list(columns.values())), index=self.data.index)
+
+    def _run_parallel(self, signals, folds):
+        """Fans the folds out over a process pool sharing the data and signals."""
+        shared_data = SharedMarketData(self.data)
+        shared_signals = SharedMarketData(signals)
+        try:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(folds)), initializer=_init_worker,
+                                     initargs=(shared_data.spec, shared_signals.spec, self.settings)) as executor:
+                return list(executor.map(_run_worker_fold, folds))
+        finally:
+            shared_data.close()
+            shared_signals.close()
+
+    def _stitch(self, results):
+        """Chains the test windows: each one starts from the previous window's final equity."""
+        pieces = []
+        capital = self.settings['initial_capital']
+        for result in results:
+            start, stop = result['test']
+            growth = result['test_equity'] / result['test_equity'][0]
+            pieces.append(pd.Series(capital * growth, index=self.data.index[start:stop]))
+            capital = pieces[-1].iloc[-1]
+        return pd.concat(pieces).rename('equity')
+
+    def _report(self, results):
+        rows = []
+        for result in results:
+            row = {
+                'train_start': self.data.index[result['train'][0]],
+                'test_start': self.data.index[result['test'][0]],
+                'test_end': self.data.index[result['test'][1] - 1],
+            }
+            row.update(result['params'])
+            row['train_score'] = result['train_score']
+            row['test_return_pct'] = (result['test_equity'][-1] / result['test_equity'][0] - 1) * 100
+            rows.append(row)
+        return pd.DataFrame(rows)
\ No newline at end of file
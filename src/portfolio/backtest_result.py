@@ -0,0 +1,107 @@
+# src/portfolio/backtest_result.py
+
+import pandas as pd
+import numpy as np
+
+from src.portfolio.trade_log import to_trade_log, BUY
+
+class BacktestResult:
+    """
+    The outcome of one backtest in compact form: the equity curve as a plain
+    float array and the trades as a structured TRADE_DTYPE array, with the
+    timestamp of every trade looked up from its bar.
+
+    Sweeps that keep thousands of results can shrink them further with compact(),
+    which stores the equity as float32 and/or keeps only its extremes, along with
+    the maximum drawdown of the full curve.
+    """
+    def __init__(self, index, equity, trades, trade_index, n_bars=None, bars=None, max_drawdown=None):
+        """
+        Initializes the result. Use from_run to build one from an engine's output.
+
+        Args:
+            index (pd.Index): The timestamps of the stored equity points.
+            equity (np.ndarray): The stored equity points.
+            trades (np.ndarray): The TRADE_DTYPE trade log; 'bar' counts bars of the full run.
+            trade_index (pd.Index): The timestamp of every trade.
+            n_bars (int, optional): The number of bars in the run. Defaults to len(equity).
+            bars (np.ndarray, optional): The bar of every stored equity point, if downsampled.
+            max_drawdown (float, optional): The maximum drawdown of the full equity
+                curve, kept by compacted results.
+        """
+        self.index = index
+        self.equity = equity
+        self.trades = trades
+        self.trade_index = trade_index
+        self.n_bars = len(equity) if n_bars is None else n_bars
+        self.bars = bars
+        self.max_drawdown = max_drawdown
+
+    @classmethod
+    def from_run(cls, index, equity, trades):
+        """
+        Builds a result from an engine's equity values and list of trade dicts.
+        """
+        trade_log = to_trade_log(trades)
+        return cls(index, np.asarray(equity, dtype=np.float64), trade_log, index[trade_log['bar']])
+
+    @property
+    def is_downsampled(self):
+        return self.bars is not None
+
+    @property
+    def final_equity(self):
+        return float(self.equity[-1])
+
+    @property
+    def nbytes(self):
+        """The memory held by the equity and trade arrays, in bytes."""
+        stored = self.equity.nbytes + self.trades.nbytes
+        return stored + (self.bars.nbytes if self.bars is not None else 0)
+
+    def equity_series(self):
+        """Returns the stored equity as a Series on its timestamps."""
+        return pd.Series(self.equity, index=self.index, name='equity')
+
+    def trades_frame(self):
+        """Returns the trades as a DataFrame indexed by their timestamps, with a 'type' of 'buy' or 'sell'."""
+        frame = pd.DataFrame(self.trades, index=self.trade_index)
+        frame['type'] = np.where(self.trades['side'] == BUY, 'buy', 'sell')
+        return frame
+
+    def compact(self, dtype=np.float32, max_points=None):
+        """
+        Returns a smaller copy for storing many results, e.g. from a sweep.
+
+        Args:
+            dtype: The dtype to store the equity in.
+            max_points (int, optional): Keep at most about this many equity points:
+                the lowest and highest value of every bucket of bars, plus the first
+                and last bar. The final equity is kept exactly, but a bucket's
+                extremes can miss a peak that precedes its trough, so the maximum
+                drawdown is measured on the full curve first and stored as
+                max_drawdown.
+
+        Returns:
+            BacktestResult: The compact result. Per-bar metrics need the full curve,
+                so compute them before downsampling.
+        """
+        equity = self.equity
+        bars = self.bars
+        index = self.index
+        drawdown = self.max_drawdown
+        if drawdown is None:
+            drawdown = float(1 - np.min(equity / np.maximum.accumulate(equity)))
+        if max_points is not None and len(equity) > max_points:
+            n_buckets = max(max_points // 2, 1)
+            size = -(-len(equity) // n_buckets)
+            padded = np.pad(equity, (0, n_buckets * size - len(equity)), mode='edge').reshape(n_buckets, size)
+            offsets = np.arange(n_buckets) * size
+            kept = np.concatenate([[0, len(equity) - 1], offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1)])
+            kept = np.unique(np.minimum(kept, len(equity) - 1))
+            bars = kept if bars is None else bars[kept]
+            index = index[kept]
+            equity = equity[kept]
+
+        return BacktestResult(index, equity.astype(dtype), self.trades, self.trade_index, n_bars=self.n_bars, bars=bars,
+                              max_drawdown=drawdown)
\ No newline at end of file
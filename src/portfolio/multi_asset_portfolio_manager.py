@@ -0,0 +1,129 @@
+# src/portfolio/multi_asset_portfolio_manager.py
+
+import pandas as pd
+import numpy as np
+
+from src.portfolio.backtest_result import BacktestResult
+from src.portfolio.trade_log import to_trade_log
+from src.strategies.strategy_contract import read_only_view
+
+class MultiAssetPortfolioManager:
+    """
+    Backtests one strategy over a panel of instruments that share a single cash pool.
+    Positions are tracked per symbol and the per-bar work is done on arrays
+    spanning all symbols at once, so adding instruments adds columns, not loops.
+    """
+    def __init__(self, data, strategy, risk_manager, initial_capital=100000.0, commission_pct=0.0, slippage_pct=0.0, risk_percentage=None, stop_loss_atr_multiplier=None):
+        """
+        Initializes the MultiAssetPortfolioManager.
+
+        Args:
+            data (dict): DataFrames with market data (OHLC, ATR and strategy inputs), keyed by symbol.
+                They are aligned on the timestamps common to all symbols.
+            strategy: The strategy agent run on every symbol, or a dict of strategies keyed by symbol.
+            risk_manager: The risk manager agent that sizes every entry from the shared cash.
+            initial_capital (float): Starting capital for the backtest.
+            commission_pct (float): The commission percentage per trade.
+            slippage_pct (float): The slippage percentage per trade.
+            risk_percentage (float, optional): The fraction of cash risked per trade.
+                Defaults to the risk manager's setting.
+            stop_loss_atr_multiplier (float, optional): The stop-loss distance in
+                multiples of ATR. Defaults to the risk manager's setting.
+        """
+        self.symbols = list(data)
+        common_index = data[self.symbols[0]].index
+        for symbol in self.symbols[1:]:
+            common_index = common_index.intersection(data[symbol].index)
+        self.index = common_index
+        self.data = {symbol: data[symbol].reindex(common_index) for symbol in self.symbols}
+
+        self.strategies = strategy if isinstance(strategy, dict) else {symbol: strategy for symbol in self.symbols}
+        self.risk_manager = risk_manager
+        self.initial_capital = initial_capital
+        self.commission_pct = commission_pct
+        self.slippage_pct = slippage_pct
+        self.risk_percentage = risk_percentage if risk_percentage is not None else risk_manager.risk_percentage
+        self.stop_loss_atr_multiplier = (stop_loss_atr_multiplier if stop_loss_atr_multiplier is not None
+                                         else risk_manager.stop_loss_atr_multiplier)
+        self.trades = []
+        self.trade_log = to_trade_log([], with_symbol=True)
+        self.positions = None
+        self.cash = None
+
+    def _panel(self, column):
+        """Stacks one column of every symbol into a (bars x symbols) array."""
+        return np.column_stack([self.data[symbol][column].to_numpy(dtype=float) for symbol in self.symbols])
+
+    def run_backtest(self):
+        """
+        Executes the backtest across all symbols. Signals from bar i-1 are executed
+        at the open of bar i; within a bar, exits are filled before entries so the
+        freed cash can fund new positions. All of a bar's entries are sized together
+        from the cash available after the exits, then filled in panel order; an
+        entry the remaining cash can't pay for is skipped and the next one tried.
+
+        Returns:
+            BacktestResult: The portfolio equity per bar and the MULTI_ASSET_TRADE_DTYPE
+                trade log, which records the symbol of every fill. The cash and the units
+                held per symbol are stored in self.cash and self.positions.
+        """
+        signals = np.column_stack([
+            self.strategies[symbol].generate_signals(read_only_view(self.data[symbol]))['signal'].to_numpy(dtype=float)
+            for symbol in self.symbols
+        ])
+        opens, closes, atrs = self._panel('open'), self._panel('close'), self._panel('atr')
+        n_bars, n_symbols = opens.shape
+
+        cash = self.initial_capital
+        units_held = np.zeros(n_symbols)
+        equity = np.empty(n_bars)
+        cash_curve = np.empty(n_bars)
+        positions = np.zeros((n_bars, n_symbols))
+        equity[0] = cash_curve[0] = self.initial_capital
+        trades = []
+
+        for i in range(1, n_bars):
+            signal = signals[i-1]
+            market_price = opens[i]
+
+            # 1. Exits: every held symbol with a SELL signal, all at once
+            exits = np.flatnonzero((signal == -1.0) & (units_held > 0))
+            if len(exits):
+                slipped_sell_price = market_price[exits] * (1 - self.slippage_pct)
+                trade_value = units_held[exits] * slipped_sell_price
+                commission = trade_value * self.commission_pct
+                cash += np.sum(trade_value - commission)
+                for k, symbol_idx in enumerate(exits):
+                    trades.append({'bar': i, 'symbol': self.symbols[symbol_idx], 'type': 'sell', 'price': slipped_sell_price[k],
+                                   'size': units_held[symbol_idx], 'commission': commission[k]})
+                units_held[exits] = 0.0
+
+            # 2. Entries: every flat symbol with a BUY signal, sized together from the shared cash
+            entries = np.flatnonzero((signal == 1.0) & (units_held == 0))
+            if len(entries):
+                position_size, _ = self.risk_manager.size_positions(
+                    cash, market_price[entries], atrs[i-1, entries],
+                    risk_percentage=self.risk_percentage, stop_loss_atr_multiplier=self.stop_loss_atr_multiplier
+                )
+                slipped_buy_price = market_price[entries] * (1 + self.slippage_pct)
+                trade_value = position_size * slipped_buy_price
+                commission = trade_value * self.commission_pct
+                # Fill in panel order; skipped entries don't use up any cash
+                for k in range(len(entries)):
+                    if not position_size[k] > 0 or cash < (trade_value[k] + commission[k]):
+                        continue
+                    cash -= (trade_value[k] + commission[k])
+                    units_held[entries[k]] = position_size[k]
+                    trades.append({'bar': i, 'symbol': self.symbols[entries[k]], 'type': 'buy', 'price': slipped_buy_price[k],
+                                   'size': position_size[k], 'commission': commission[k]})
+
+            # 3. Mark every position to market in one step
+            equity[i] = cash + (units_held @ closes[i])
+            cash_curve[i] = cash
+            positions[i] = units_held
+
+        self.trades = trades
+        self.trade_log = to_trade_log(trades, with_symbol=True)
+        self.positions = pd.DataFrame(positions, index=self.index, columns=self.symbols)
+        self.cash = pd.Series(cash_curve, index=self.index, name='cash')
+        return BacktestResult(self.index, equity, self.trade_log, self.index[self.trade_log['bar']])
\ No newline at end of file
@@ -3,24 +3,62 @@
 import pandas as pd
 import numpy as np
 
+from src.indicators.indicators import atr
+from src.portfolio.backtest_result import BacktestResult
+from src.portfolio.result_cache import ResultCache, describe_component
+from src.portfolio.trade_log import to_trade_log, from_trade_log
+from src.profiling.stage_profiler import profiler, profiled
+from src.strategies.strategy_contract import read_only_view
+
 class PortfolioManager:
     """
     Orchestrates the backtest, using all other agents.
     This version includes logic to prevent lookahead bias and to model transaction costs.
     """
-    def __init__(self, data, strategies, risk_manager, initial_capital=100000.0, commission_pct=0.0, slippage_pct=0.0, regime_filter=None):
+    ENGINES = ('loop', 'vectorized', 'stream')
+
+    def __init__(self, data, strategies, risk_manager, initial_capital=100000.0, commission_pct=0.0, slippage_pct=0.0, regime_filter=None, engine='loop', risk_percentage=None, stop_loss_atr_multiplier=None,
+                 stop_loss=False, take_profit_atr_multiplier=None, trailing_stop_atr_multiplier=None, result_cache=None,
+                 data_digest=None):
         """
         Initializes the PortfolioManager.
 
         Args:
             data (pd.DataFrame): DataFrame with market data (OHLC, ATR).
             strategies (dict): Dictionary of strategy agents, keyed by regime name.
+                'default' is required and trades every bar whose regime has no
+                strategy of its own.
             risk_manager: The risk manager agent.
             initial_capital (float): Starting capital for the backtest.
             commission_pct (float): The commission percentage per trade (e.g., 0.001 for 0.1%).
             slippage_pct (float): The slippage percentage per trade (e.g., 0.0005 for 0.05%).
-            regime_filter (optional): The regime filter agent.
+            regime_filter (optional): The regime filter agent. With it, each bar takes
+                its signal from the strategy of that bar's regime.
+            engine (str): The execution engine: 'loop' (bar-by-bar reference
+                implementation), 'vectorized' (array-based, same results) or 'stream'
+                (incremental strategy signals fed bar by bar, as in live trading).
+            risk_percentage (float, optional): The fraction of cash risked per trade.
+                Defaults to the risk manager's setting.
+            stop_loss_atr_multiplier (float, optional): The stop-loss distance in
+                multiples of ATR. Defaults to the risk manager's setting.
+            stop_loss (bool): Whether to exit intrabar when the low reaches the
+                risk manager's stop-loss price. Stops need the 'vectorized' engine
+                and 'high'/'low' columns.
+            take_profit_atr_multiplier (float, optional): Exit intrabar when the
+                high reaches the entry price plus this many ATRs.
+            trailing_stop_atr_multiplier (float, optional): Exit intrabar when the
+                low falls this many ATRs below the highest price since entry.
+            result_cache (ResultCache, optional): A persistent cache for the results
+                and signals of run_backtest, so unchanged runs are not recomputed.
+            data_digest (str, optional): The ResultCache.data_digest of `data`, so
+                callers running many backtests on one dataset hash it only once.
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}'. Choose one of {self.ENGINES}.")
+        self.uses_stops = stop_loss or take_profit_atr_multiplier is not None or trailing_stop_atr_multiplier is not None
+        if self.uses_stops and engine != 'vectorized':
+            raise ValueError("Stop-loss, take-profit and trailing-stop orders require the 'vectorized' engine.")
+
         self.data = data
         self.strategies = strategies
         self.risk_manager = risk_manager
@@ -28,60 +66,500 @@ class PortfolioManager:
         self.initial_capital = initial_capital
         self.commission_pct = commission_pct
         self.slippage_pct = slippage_pct
+        self.engine = engine
+        self.risk_percentage = risk_percentage if risk_percentage is not None else risk_manager.risk_percentage
+        self.stop_loss_atr_multiplier = (stop_loss_atr_multiplier if stop_loss_atr_multiplier is not None
+                                         else risk_manager.stop_loss_atr_multiplier)
+        self.stop_loss = stop_loss
+        self.take_profit_atr_multiplier = take_profit_atr_multiplier
+        self.trailing_stop_atr_multiplier = trailing_stop_atr_multiplier
+        self.result_cache = result_cache
+        self._data_digest = data_digest
+        self.trades = []
+        self.trade_log = to_trade_log([])
 
+    @profiled('run_backtest')
     def run_backtest(self):
         """
-        Executes the backtest loop with realistic trade execution.
+        Executes the backtest with realistic trade execution, using the selected engine.
+
+        Returns:
+            BacktestResult: The equity per bar and the structured trade log.
+        """
+        strategy = self.strategies.get('default')
+        if strategy is None:
+            raise ValueError("A 'default' strategy must be provided.")
+
+        if self.result_cache is not None:
+            key = self.cache_key()
+            with profiler.stage('result_cache'):
+                result = self.result_cache.load_result(key, self.data.index)
+            if result is not None:
+                self.trade_log = result.trades
+                self.trades = from_trade_log(result.trades)
+                return result
+
+        if self.engine == 'stream':
+            if self.regime_filter is not None:
+                raise ValueError("Regime switching is not supported by the 'stream' engine.")
+            with profiler.stage('execution:stream'):
+                equity, trades = self._run_stream()
+        else:
+            if self.regime_filter is not None:
+                final_signals = self._dispatch_signals()
+            else:
+                final_signals = self._generate_signals(strategy, read_only_view(self.data))
+            with profiler.stage(f'execution:{self.engine}'):
+                if self.engine == 'vectorized':
+                    equity, trades, _ = self._run_vectorized(final_signals)
+                else:
+                    equity, trades = self._run_loop(final_signals)
+        self.trades = trades
+        result = BacktestResult.from_run(self.data.index, equity, trades)
+        self.trade_log = result.trades
+        if self.result_cache is not None:
+            self.result_cache.save_result(key, result)
+        return result
+
+    def cache_key(self, data_digest=None):
+        """
+        Returns the result cache key of this backtest: a hash of the data contents,
+        the strategies, regime filter and risk manager settings, and the run settings.
+
+        Args:
+            data_digest (str, optional): The ResultCache.data_digest of self.data, if
+                already known.
+        """
+        if data_digest is not None:
+            self._data_digest = data_digest
+        elif self._data_digest is None:
+            self._data_digest = ResultCache.data_digest(self.data)
+        settings = {
+            'initial_capital': self.initial_capital,
+            'commission_pct': self.commission_pct,
+            'slippage_pct': self.slippage_pct,
+            'engine': self.engine,
+            'risk_percentage': self.risk_percentage,
+            'stop_loss_atr_multiplier': self.stop_loss_atr_multiplier,
+            'stop_loss': self.stop_loss,
+            'take_profit_atr_multiplier': self.take_profit_atr_multiplier,
+            'trailing_stop_atr_multiplier': self.trailing_stop_atr_multiplier,
+        }
+        strategies = {name: describe_component(strategy) for name, strategy in self.strategies.items()}
+        return ResultCache.key('backtest', self._data_digest, strategies, describe_component(self.regime_filter),
+                               describe_component(self.risk_manager), settings)
+
+    def _generate_signals(self, strategy, data):
+        """
+        Generates a strategy's signals over the read-only view of self.data, from
+        the result cache if one is set and holds them.
+        """
+        if self.result_cache is None:
+            return strategy.generate_signals(data)
+        if self._data_digest is None:
+            self._data_digest = self.result_cache.data_digest(self.data)
+        key = self.result_cache.key('signals', self._data_digest, describe_component(strategy))
+        signals = self.result_cache.load_frame(key, self.data.index)
+        if signals is None:
+            signals = strategy.generate_signals(data)
+            self.result_cache.save_frame(key, signals)
+        return signals
+
+    @profiled('run_backtest_batch')
+    def run_backtest_batch(self, signals):
+        """
+        Backtests many signal columns, e.g. the output of a strategy's
+        generate_signals_batch, against the same data and risk settings with the
+        vectorized engine. The market columns and entry sizing terms are shared by
+        every run; only the event walk is repeated per column.
+
+        Args:
+            signals (pd.DataFrame): One column of signals per configuration, on the data's index.
+
+        Returns:
+            pd.DataFrame: One equity column per configuration. The BacktestResult of
+                each column is stored in self.batch_results, in the same order.
+        """
+        if self.engine != 'vectorized':
+            raise ValueError("Batched backtests require the 'vectorized' engine.")
+        if self.regime_filter is not None:
+            raise ValueError("Regime switching is not supported by batched backtests.")
+
+        index = self.data.index
+        market = self._market_arrays(self.data)
+        signal_matrix = signals.to_numpy(dtype=float)
+        equity = np.empty(signal_matrix.shape, order='F')
+        self.batch_results = []
+        with profiler.stage('execution:vectorized'):
+            for k in range(signal_matrix.shape[1]):
+                equity[:, k], trades, _ = self._execute_signals(signal_matrix[:, k], market)
+                trade_log = to_trade_log(trades)
+                # Each result's equity is a view of its column of the batch matrix
+                self.batch_results.append(BacktestResult(index, equity[:, k], trade_log, index[trade_log['bar']]))
+        return pd.DataFrame(equity, index=index, columns=signals.columns, copy=False)
+
+    @profiled('regime_dispatch')
+    def _dispatch_signals(self):
+        """
+        Combines the strategies' signals by regime: every strategy generates its
+        signals once over the whole history, and each bar takes the signal of the
+        strategy matching its regime, falling back to 'default'.
+
+        Returns:
+            pd.DataFrame: The dispatched 'signal' for every bar.
         """
-        final_signals = self.strategies.get('default')
-        if final_signals is None:
+        names = list(self.strategies)
+        data = read_only_view(self.data)
+        stacked = np.vstack([
+            self._generate_signals(self.strategies[name], data)['signal'].to_numpy(dtype=float) for name in names
+        ])
+
+        regimes = self.regime_filter.get_regime_series(self.data).to_numpy()
+        codes = np.full(len(regimes), names.index('default'))
+        for k, name in enumerate(names):
+            codes[regimes == name] = k
+
+        signals = pd.DataFrame(index=self.data.index)
+        signals['signal'] = stacked[codes, np.arange(len(codes))]
+        return signals
+
+    @profiled('run_chunked')
+    def run_chunked(self, chunks, atr_window=14):
+        """
+        Executes the backtest over data streamed in consecutive windows, e.g. from
+        MarketDataStore.iter_chunks, for histories that do not fit in memory.
+
+        Only one chunk plus a short warm-up tail of the previous one is held at a
+        time. The strategy carries its indicator state across chunks (see its
+        generate_signals_chunk) and the vectorized engine carries the cash and any
+        open position, so the trades are those of run_backtest over the whole
+        history; the windowed indicators are recomputed per chunk, so equity can
+        differ from it by floating-point rounding.
+
+        Args:
+            chunks (iterable): DataFrames in time order with OHLC and strategy
+                inputs. An 'atr' column is computed if it is missing.
+            atr_window (int): The ATR window used when computing it.
+
+        Returns:
+            BacktestResult: The equity per bar and the trade log, as from run_backtest.
+        """
+        if self.engine != 'vectorized':
+            raise ValueError("Chunked backtests require the 'vectorized' engine.")
+        if self.regime_filter is not None:
+            raise ValueError("Regime switching is not supported by chunked backtests.")
+        strategy = self.strategies.get('default')
+        if strategy is None:
             raise ValueError("A 'default' strategy must be provided.")
-        final_signals = final_signals.generate_signals(self.data)
+        warmup_bars = max(strategy.warmup_bars, atr_window + 1)
+
+        tail, strategy_state, portfolio_state = None, None, None
+        last_signal = np.nan
+        equity_parts, index_parts, trades = [], [], []
+
+        for chunk in chunks:
+            if len(chunk) == 0:
+                continue
+            # 1. Prepend the warm-up tail of the previous chunk
+            warmup_rows = 0 if tail is None else len(tail)
+            frame = chunk if tail is None else pd.concat([tail, chunk])
+            if 'atr' not in chunk.columns:
+                frame = frame.assign(atr=atr(frame['high'], frame['low'], frame['close'], window=atr_window))
+
+            with profiler.stage('generate_signals:chunk'):
+                signals, strategy_state = strategy.generate_signals_chunk(frame, warmup_rows, strategy_state)
+
+            # 2. The engine resumes from the previous chunk's last bar, whose signal is executed now
+            with profiler.stage('execution:chunk'):
+                if portfolio_state is None:
+                    equity, chunk_trades, portfolio_state = self._run_vectorized(signals, frame)
+                else:
+                    engine_signals = pd.DataFrame({'signal': np.concatenate([[last_signal], signals['signal'].to_numpy()])})
+                    equity, chunk_trades, portfolio_state = self._run_vectorized(
+                        engine_signals, frame.iloc[warmup_rows-1:], portfolio_state
+                    )
+                    equity = equity[1:]
+
+            equity_parts.append(equity)
+            index_parts.append(chunk.index)
+            trades.extend(chunk_trades)
+            last_signal = signals['signal'].iloc[-1]
+            tail = frame.iloc[-warmup_bars:].drop(columns='atr') if 'atr' not in chunk.columns else frame.iloc[-warmup_bars:]
+
+        self.trades = trades
+        index = index_parts[0].append(index_parts[1:]) if index_parts else pd.Index([])
+        result = BacktestResult.from_run(index, np.concatenate(equity_parts) if equity_parts else np.empty(0), trades)
+        self.trade_log = result.trades
+        return result
+
+    def _execute_signal(self, bar, signal, market_price, atr, cash, units_held, trades):
+        """
+        Acts on the previous bar's signal at this bar's open price. Shared by the
+        loop engine and the live stream so both trade identically.
+
+        Returns:
+            A tuple containing the updated (cash, units_held).
+        """
+        # If we get a BUY signal and are not in a position
+        if signal == 1.0 and units_held == 0:
+            # SLIPPAGE: We pay a little more than the market price
+            slipped_buy_price = market_price * (1 + self.slippage_pct)
+
+            position_size, stop_loss = self.risk_manager.calculate_trade_parameters(
+                account_balance=cash, risk_percentage=self.risk_percentage, entry_price=market_price, # Sizing is based on market price
+                atr=atr, stop_loss_atr_multiplier=self.stop_loss_atr_multiplier
+            )
+            
+            if position_size > 0:
+                trade_value = position_size * slipped_buy_price
+                commission = trade_value * self.commission_pct
+                
+                if cash >= (trade_value + commission):
+                    cash -= (trade_value + commission)
+                    units_held = position_size
+                    trades.append({'bar': bar, 'type': 'buy', 'price': slipped_buy_price, 'size': units_held, 'commission': commission})
+
+        # If we get a SELL signal and are in a position
+        elif signal == -1.0 and units_held > 0:
+            # SLIPPAGE: We receive a little less than the market price
+            slipped_sell_price = market_price * (1 - self.slippage_pct)
+
+            trade_value = units_held * slipped_sell_price
+            commission = trade_value * self.commission_pct
+            
+            cash += (trade_value - commission)
+            trades.append({'bar': bar, 'type': 'sell', 'price': slipped_sell_price, 'size': units_held, 'commission': commission})
+            units_held = 0
 
+        return cash, units_held
+
+    def _run_loop(self, final_signals):
+        """
+        The reference engine: walks every bar in a Python loop.
+        """
         cash = self.initial_capital
         units_held = 0.0
         equity = [self.initial_capital]
         trades = []
 
         for i in range(1, len(self.data)):
-            signal = final_signals['signal'].iloc[i-1]
-            market_price = self.data['open'].iloc[i]
+            cash, units_held = self._execute_signal(
+                i, final_signals['signal'].iloc[i-1], self.data['open'].iloc[i], self.data['atr'].iloc[i-1],
+                cash, units_held, trades
+            )
+            current_total_equity = cash + (units_held * self.data['close'].iloc[i])
+            equity.append(current_total_equity)
+
+        return equity, trades
+
+    def start_stream(self):
+        """
+        Prepares the portfolio for live, bar-by-bar operation (e.g. paper trading)
+        with the 'default' strategy's incremental signal stream.
+        """
+        strategy = self.strategies.get('default')
+        if strategy is None:
+            raise ValueError("A 'default' strategy must be provided.")
+        self._signal_stream = strategy.start_stream()
+        self._cash = self.initial_capital
+        self._units_held = 0.0
+        self._pending = None  # (signal, atr) of the previous bar
+        self._bar = 0
+        self.trades = []
+
+    def on_bar(self, bar):
+        """
+        Processes one new bar: executes the previous bar's signal at this bar's
+        open, marks the position to market at the close, then updates the strategy
+        so its signal is executed on the next bar.
+
+        Args:
+            bar (dict): The new bar with 'open', 'close', 'atr' and any strategy inputs.
+
+        Returns:
+            float: The total equity at the bar's close.
+        """
+        if self._pending is None:
+            equity = self.initial_capital
+        else:
+            signal, atr = self._pending
+            self._cash, self._units_held = self._execute_signal(
+                self._bar, signal, bar['open'], atr, self._cash, self._units_held, self.trades
+            )
+            equity = self._cash + (self._units_held * bar['close'])
+
+        self._pending = (self._signal_stream.update(bar), bar['atr'])
+        self._bar += 1
+        return equity
+
+    def _run_stream(self):
+        """
+        The streaming engine: replays the data through start_stream/on_bar, the
+        same code path a live paper-trading process uses.
+        """
+        self.start_stream()
+        equity = [self.on_bar(bar) for bar in self.data.to_dict('records')]
+        return equity, self.trades
+
+    def _run_vectorized(self, final_signals, data=None, state=None):
+        """
+        The array engine: pulls the columns into NumPy arrays once, jumps straight
+        from one actionable signal to the next, and rebuilds the cash, units held
+        and equity curves in array form. Produces the same results as the loop.
+        Stop orders, when enabled, are checked over each holding period at once.
+
+        Args:
+            final_signals (pd.DataFrame): The 'signal' for every row of the data.
+            data (pd.DataFrame, optional): The market data. Defaults to self.data.
+            state (dict, optional): For chunked runs, the state returned for the
+                previous chunk, whose last bar must be the first row of the data.
+
+        Returns:
+            A tuple (equity, trades, state). The state holds the global bar number
+            of the last row, the cash and any open position.
+        """
+        data = self.data if data is None else data
+        signal = final_signals['signal'].to_numpy(dtype=float)
+        return self._execute_signals(signal, self._market_arrays(data), state)
+
+    def _market_arrays(self, data):
+        """Pulls the columns the vectorized engine reads into NumPy arrays."""
+        columns = ('open', 'close', 'atr') + (('high', 'low') if self.uses_stops else ())
+        return {column: data[column].to_numpy(dtype=float) for column in columns}
+
+    def _execute_signals(self, signal, market, state=None):
+        """
+        The event walk of the vectorized engine, over one signal array and the
+        market arrays from _market_arrays. See _run_vectorized.
+        """
+        opens, closes, atrs = market['open'], market['close'], market['atr']
+        highs, lows = market.get('high'), market.get('low')
+        n_bars = len(opens)
+
+        # 1. A signal on bar i-1 is executed at the open of bar i
+        buy_bars = np.flatnonzero(signal[:-1] == 1.0) + 1
+        sell_bars = np.flatnonzero(signal[:-1] == -1.0) + 1
+
+        # 2. Size every candidate entry at once; only the balance is left to apply
+        risk_fraction, risk_per_unit, stop_loss_price = self.risk_manager.sizing_terms(
+            opens[buy_bars], atrs[buy_bars - 1], self.risk_percentage, self.stop_loss_atr_multiplier
+        )
 
-            # If we get a BUY signal and are not in a position
-            if signal == 1.0 and units_held == 0:
-                # SLIPPAGE: We pay a little more than the market price
+        # 3. Walk the entry/exit events only, recording the state after each one
+        offset = 0 if state is None else state['bar']
+        cash = self.initial_capital if state is None else state['cash']
+        position = None if state is None else state['position']
+        event_bars, event_cash = [0], [cash]
+        event_units = [0.0 if position is None else position['size']]
+        trades = []
+
+        # A position carried over from the previous chunk is managed from its last bar
+        start = 0
+        b = 0
+        while True:
+            if position is None:
+                if b == len(buy_bars):
+                    break
+                i = buy_bars[b]
+                market_price = opens[i]
                 slipped_buy_price = market_price * (1 + self.slippage_pct)
 
-                position_size, stop_loss = self.risk_manager.calculate_trade_parameters(
-                    account_balance=cash, risk_percentage=0.02, entry_price=market_price, # Sizing is based on market price
-                    atr=self.data['atr'].iloc[i-1], stop_loss_atr_multiplier=2.0
-                )
-                
-                if position_size > 0:
-                    trade_value = position_size * slipped_buy_price
-                    commission = trade_value * self.commission_pct
-                    
-                    if cash >= (trade_value + commission):
-                        cash -= (trade_value + commission)
-                        units_held = position_size
-                        trades.append({'type': 'buy', 'price': slipped_buy_price, 'size': units_held})
-
-            # If we get a SELL signal and are in a position
-            elif signal == -1.0 and units_held > 0:
-                # SLIPPAGE: We receive a little less than the market price
-                slipped_sell_price = market_price * (1 - self.slippage_pct)
-
-                trade_value = units_held * slipped_sell_price
+                if risk_per_unit[b] > 0:
+                    position_size = (cash * risk_fraction[b]) / risk_per_unit[b]
+                else:
+                    position_size = 0.0
+
+                if not position_size > 0:
+                    b += 1
+                    continue
+                trade_value = position_size * slipped_buy_price
                 commission = trade_value * self.commission_pct
-                
-                cash += (trade_value - commission)
-                trades.append({'type': 'sell', 'price': slipped_sell_price, 'size': units_held})
-                units_held = 0
+                if cash < (trade_value + commission):
+                    b += 1
+                    continue
 
-            current_total_equity = cash + (units_held * self.data['close'].iloc[i])
-            equity.append(current_total_equity)
+                cash -= (trade_value + commission)
+                trades.append({'bar': offset + i, 'type': 'buy', 'price': slipped_buy_price, 'size': position_size, 'commission': commission})
+                event_bars.append(i)
+                event_cash.append(cash)
+                event_units.append(position_size)
+                position = {'size': position_size, 'entry_price': market_price, 'atr': atrs[i-1],
+                            'stop_loss': stop_loss_price[b], 'highest': market_price}
+                start = i
+
+            # Hold until the first sell signal after the entry bar, or a stop order
+            s = np.searchsorted(sell_bars, start, side='right')
+            j = sell_bars[s] if s < len(sell_bars) else n_bars
+            exit_price = opens[j] if j < n_bars else np.nan
+            if self.uses_stops:
+                stop_exit = self._find_stop_exit(position, start, j, opens, highs, lows)
+                if stop_exit is not None:
+                    j, exit_price = stop_exit
+            if j == n_bars:
+                if self.trailing_stop_atr_multiplier is not None and n_bars - 1 > start:
+                    # Highs seen before the last bar, which the next chunk starts from
+                    position['highest'] = max(position['highest'], highs[start:n_bars-1].max())
+                break
+
+            slipped_sell_price = exit_price * (1 - self.slippage_pct)
+            trade_value = position['size'] * slipped_sell_price
+            commission = trade_value * self.commission_pct
+
+            cash += (trade_value - commission)
+            trades.append({'bar': offset + j, 'type': 'sell', 'price': slipped_sell_price, 'size': position['size'], 'commission': commission})
+            event_bars.append(j)
+            event_cash.append(cash)
+            event_units.append(0.0)
+            position = None
+
+            # Buy signals are only acted upon once we are flat again
+            b = np.searchsorted(buy_bars, j, side='right')
+
+        # 4. Cash and units are piecewise constant between events
+        state_index = np.searchsorted(np.asarray(event_bars), np.arange(n_bars), side='right') - 1
+        cash_held = np.asarray(event_cash)[state_index]
+        units_held = np.asarray(event_units)[state_index]
+
+        equity = cash_held + (units_held * closes)
+        if state is None:
+            equity[0] = self.initial_capital
+        return equity, trades, {'bar': offset + n_bars - 1, 'cash': cash, 'position': position}
+
+    def _find_stop_exit(self, position, start_bar, end_bar, opens, highs, lows):
+        """
+        Finds the first bar in [start_bar, end_bar) on which a stop order of the
+        open position triggers. The stop and target levels for the whole holding
+        period are built as arrays and compared against the bars' lows and highs
+        in one pass.
+
+        Returns:
+            A tuple (bar, fill_price), or None if no stop triggers. A bar that gaps
+            through a level fills at its open; if a bar reaches both the stop and the
+            target, the stop is assumed to have been hit first.
+        """
+        holding = slice(start_bar, end_bar)
+        n_held = end_bar - start_bar
+        atr = position['atr']
+
+        # 1. The stop level on every bar: the fixed stop, ratcheted up by the trailing stop
+        stop = np.full(n_held, position['stop_loss'] if self.stop_loss else -np.inf)
+        if self.trailing_stop_atr_multiplier is not None:
+            # Trail the highest price of the previous bars, since the order of a
+            # bar's own high and low is unknown
+            highest = np.maximum.accumulate(np.concatenate(([position['highest']], highs[start_bar:end_bar-1])))
+            stop = np.maximum(stop, highest - (atr * self.trailing_stop_atr_multiplier))
+        if self.take_profit_atr_multiplier is not None:
+            target = position['entry_price'] + (atr * self.take_profit_atr_multiplier)
+        else:
+            target = np.inf
 
-        results = pd.DataFrame(index=self.data.index)
-        results['equity'] = equity
-        results['trades'] = pd.Series(trades)
-        return results
\ No newline at end of file
+        # 2. The first bar whose range reaches either level
+        stopped = lows[holding] <= stop
+        hit = stopped | (highs[holding] >= target)
+        if not hit.any():
+            return None
+        k = int(np.argmax(hit))
+        bar = start_bar + k
+        if stopped[k]:
+            return bar, min(opens[bar], stop[k])
+        return bar, max(opens[bar], target)
\ No newline at end of file
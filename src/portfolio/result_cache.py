@@ -0,0 +1,241 @@
+# src/portfolio/result_cache.py
+
+import configparser
+import hashlib
+import json
+import os
+
+import pandas as pd
+import numpy as np
+
+from src.portfolio.backtest_result import BacktestResult
+
+# Bump when the stored format or the engines' results change, to orphan old entries
+CACHE_VERSION = 1
+
+
+def describe_component(component):
+    """
+    Describes a strategy, risk manager or regime filter for a cache key: its
+    class and public settings. Caches it holds (the indicator store) are left out.
+    Array and pandas settings are described by their contents, see _jsonable.
+    """
+    if component is None:
+        return None
+    cls = type(component)
+    settings = {name: value for name, value in vars(component).items()
+                if not name.startswith('_') and name != 'indicator_store'}
+    return [f'{cls.__module__}.{cls.__qualname__}', settings]
+
+
+def _jsonable(value):
+    """
+    Encodes the values json can't for key hashing: NumPy scalars by value, arrays
+    and pandas objects by a hash of their contents.
+
+    Raises:
+        TypeError: If the value can't be described by its contents.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Series, pd.DataFrame, pd.Index)):
+        if isinstance(value, pd.DataFrame):
+            layout = [[str(column), str(dtype)] for column, dtype in value.dtypes.items()]
+        else:
+            layout = str(value.dtype)
+        hashed = pd.util.hash_pandas_object(value, index=not isinstance(value, pd.Index)).to_numpy()
+        return [type(value).__name__, layout, hashlib.sha256(hashed.tobytes()).hexdigest()]
+    if isinstance(value, np.ndarray):
+        return ['ndarray', value.dtype.str, list(value.shape), hashlib.sha256(_array_bytes(value.ravel())).hexdigest()]
+    raise TypeError(f"Cannot describe a {type(value).__name__} value for a result cache key.")
+
+
+def _array_bytes(values):
+    """Returns the bytes to hash for a 1-D array; object values are hashed element-wise."""
+    if values.dtype.kind == 'O':
+        return pd.util.hash_array(values).tobytes()
+    return np.ascontiguousarray(values).view(np.uint8)
+
+
+class ResultCache:
+    """
+    A persistent, content-addressed cache for backtest results and signals.
+
+    Entries are keyed by a hash of everything that determines them: the contents
+    of the input data, the strategy class and parameters, the risk manager's
+    settings and the run settings (costs, capital, engine, stops). Changing the
+    data file changes its contents and therefore the key, so stale entries are
+    never returned; they are simply never read again and age out.
+
+    Each entry is one .npz file. The directory is kept under a size cap by
+    evicting the least recently used files, using their modification time,
+    which every read refreshes.
+    """
+    def __init__(self, root='cache/results', max_bytes=1024 ** 3):
+        """
+        Initializes the cache.
+
+        Args:
+            root (str): The directory holding the cache files.
+            max_bytes (int): The size cap of the directory, in bytes.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.nbytes = None
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, path='config.ini', section='Cache'):
+        """
+        Creates a ResultCache from the [Cache] section of a config file, with
+        'directory' and 'max_mb' keys. Missing keys keep their defaults.
+        """
+        config = configparser.ConfigParser()
+        if not config.read(path) or not config.has_section(section):
+            raise ValueError(f"No [{section}] section found in {path}.")
+        settings = config[section]
+
+        kwargs = {}
+        if 'directory' in settings:
+            kwargs['root'] = settings['directory']
+        if 'max_mb' in settings:
+            kwargs['max_bytes'] = int(settings.getfloat('max_mb') * 1024 ** 2)
+        return cls(**kwargs)
+
+    @staticmethod
+    def data_digest(data):
+        """
+        Hashes the index and every column (name, dtype and values) of a DataFrame.
+        Numeric values are hashed as raw bytes, object values (e.g. strings)
+        element-wise. Compute it once per dataset and pass it to every run.
+        """
+        digest = hashlib.sha256()
+        index = data.index
+        index_values = index.asi8 if isinstance(index, pd.DatetimeIndex) else index.to_numpy()
+        digest.update(str(index.dtype).encode())
+        digest.update(_array_bytes(index_values))
+        for column in data.columns:
+            values = data[column].to_numpy()
+            digest.update(f'{column}:{data[column].dtype}:{len(values)}'.encode())
+            digest.update(_array_bytes(values))
+        return digest.hexdigest()
+
+    @staticmethod
+    def key(*parts):
+        """Returns the key of an entry described by json-encodable parts."""
+        encoded = json.dumps([CACHE_VERSION, *parts], sort_keys=True, default=_jsonable)
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def path(self, key):
+        """Returns the file of an entry, fanned out over subdirectories by key prefix."""
+        return os.path.join(self.root, key[:2], f'{key}.npz')
+
+    def load_result(self, key, index):
+        """
+        Returns the cached BacktestResult of a key, or None.
+
+        Args:
+            key (str): The entry key.
+            index (pd.Index): The timestamps of the run's bars.
+        """
+        arrays = self._load(key)
+        if arrays is None:
+            return None
+        trades = arrays['trades']
+        bars = arrays['bars'] if 'bars' in arrays else None
+        drawdown = float(arrays['max_drawdown']) if 'max_drawdown' in arrays else None
+        return BacktestResult(index if bars is None else index[bars], arrays['equity'], trades,
+                              index[trades['bar']], n_bars=int(arrays['n_bars']), bars=bars, max_drawdown=drawdown)
+
+    def save_result(self, key, result):
+        """Stores a BacktestResult under a key."""
+        arrays = {'equity': result.equity, 'trades': result.trades, 'n_bars': np.int64(result.n_bars)}
+        if result.bars is not None:
+            arrays['bars'] = result.bars
+        if result.max_drawdown is not None:
+            arrays['max_drawdown'] = np.float64(result.max_drawdown)
+        self._save(key, arrays)
+
+    def load_frame(self, key, index):
+        """Returns a cached numeric DataFrame (e.g. signals) on the given index, or None."""
+        arrays = self._load(key)
+        if arrays is None:
+            return None
+        return pd.DataFrame(arrays['values'], index=index, columns=list(arrays['columns']))
+
+    def save_frame(self, key, frame):
+        """Stores the values and column names of a numeric DataFrame under a key."""
+        self._save(key, {'values': frame.to_numpy(dtype=float), 'columns': np.array([str(c) for c in frame.columns])})
+
+    def clear(self):
+        """Deletes every entry."""
+        for path, _ in self._entries():
+            os.remove(path)
+        self.nbytes = 0
+
+    def _load(self, key):
+        """Reads an entry's arrays and marks it as recently used."""
+        path = self.path(key)
+        try:
+            with np.load(path, allow_pickle=False) as stored:
+                arrays = {name: stored[name] for name in stored.files}
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            # Missing, evicted concurrently or truncated: treat as a miss
+            self.misses += 1
+            return None
+        self.hits += 1
+        return arrays
+
+    def _save(self, key, arrays):
+        """Writes an entry atomically, then evicts old entries beyond the size cap."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            np.savez(f, **arrays)
+        size = os.path.getsize(temporary)
+        replaced = os.path.getsize(path) if os.path.exists(path) else 0
+        os.replace(temporary, path)
+
+        if self.nbytes is None:
+            self.nbytes = sum(size for _, size in self._entries())
+        else:
+            self.nbytes += size - replaced
+        if self.nbytes > self.max_bytes:
+            self._evict()
+
+    def _entries(self):
+        """Lists the (path, size) of every entry file."""
+        entries = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith('.npz'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    entries.append((path, os.path.getsize(path)))
+                except FileNotFoundError:
+                    continue
+        return entries
+
+    def _evict(self):
+        """Deletes the least recently used entries until the directory fits the size cap."""
+        entries = []
+        for path, size in self._entries():
+            try:
+                entries.append((os.path.getmtime(path), size, path))
+            except FileNotFoundError:
+                continue
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self.nbytes = total
\ No newline at end of file
@@ -0,0 +1,45 @@
+# src/portfolio/trade_log.py
+
+import numpy as np
+
+# A columnar record of executed trades: one row per fill
+TRADE_DTYPE = np.dtype([
+    ('bar', np.int64),          # position of the fill in the data index
+    ('side', np.int8),          # BUY or SELL
+    ('price', np.float64),      # fill price, including slippage
+    ('size', np.float64),       # units traded
+    ('commission', np.float64), # commission paid
+])
+
+# The trade log of a multi-asset backtest, with the symbol of every fill
+MULTI_ASSET_TRADE_DTYPE = np.dtype(TRADE_DTYPE.descr + [('symbol', 'U32')])
+
+BUY = 1
+SELL = -1
+
+def to_trade_log(trades, with_symbol=False):
+    """
+    Converts a list of trade dicts (as recorded by the backtest engines) into a
+    structured TRADE_DTYPE array, or a MULTI_ASSET_TRADE_DTYPE array if the trades
+    carry a 'symbol'.
+    """
+    if with_symbol:
+        return np.array(
+            [(t['bar'], BUY if t['type'] == 'buy' else SELL, t['price'], t['size'], t['commission'], t['symbol']) for t in trades],
+            dtype=MULTI_ASSET_TRADE_DTYPE
+        )
+    return np.array(
+        [(t['bar'], BUY if t['type'] == 'buy' else SELL, t['price'], t['size'], t['commission']) for t in trades],
+        dtype=TRADE_DTYPE
+    )
+
+def from_trade_log(trade_log):
+    """Converts a structured trade log back into the engines' list of trade dicts."""
+    trades = []
+    for row in trade_log.tolist():
+        bar, side, price, size, commission = row[:5]
+        trade = {'bar': int(bar), 'type': 'buy' if side == BUY else 'sell', 'price': float(price), 'size': float(size), 'commission': float(commission)}
+        if len(row) > 5:
+            trade['symbol'] = row[5]
+        trades.append(trade)
+    return trades
\ No newline at end of file
@@ -0,0 +1,148 @@
+# src/profiling/stage_profiler.py
+
+import contextlib
+import cProfile
+import functools
+import time
+import tracemalloc
+
+import pandas as pd
+
+class StageProfiler:
+    """
+    Opt-in instrumentation for backtest runs. Records wall time, call counts and
+    (optionally) memory allocations per named stage, and can run cProfile
+    alongside for a full call-graph dump.
+
+    When disabled, stages cost one attribute check, so the instrumentation can
+    stay in the hot paths permanently.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.track_allocations = False
+        self._stats = {}
+        self._stack = []
+        self._cprofile = None
+
+    def enable(self, track_allocations=False, cprofile=False):
+        """
+        Starts recording.
+
+        Args:
+            track_allocations (bool): Also record net and peak memory allocated per
+                stage with tracemalloc (slows the run down noticeably).
+            cprofile (bool): Also run cProfile for a dump with dump_cprofile().
+        """
+        self.enabled = True
+        self.track_allocations = track_allocations
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        if cprofile:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def disable(self):
+        """Stops recording; the collected statistics are kept until reset()."""
+        self.enabled = False
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self.track_allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def reset(self):
+        """Drops all collected statistics."""
+        self._stats = {}
+        self._stack = []
+        self._cprofile = None
+
+    def stage(self, name):
+        """
+        Returns a context manager that records one call of a stage.
+
+        Usage:
+            with profiler.stage('merge_price_sopr'):
+                ...
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._record(name)
+
+    @contextlib.contextmanager
+    def _record(self, name):
+        frame = {'child_peak': 0}
+        if self.track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            # Keep the enclosing stage's peak so far before resetting it for this one
+            if self._stack:
+                self._stack[-1]['child_peak'] = max(self._stack[-1]['child_peak'], peak)
+            frame['start_memory'] = current
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            stats = self._stats.setdefault(name, {'calls': 0, 'seconds': 0.0, 'allocated_mb': 0.0, 'peak_mb': 0.0})
+            stats['calls'] += 1
+            stats['seconds'] += elapsed
+
+            if self.track_allocations and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                # A nested stage resets the peak, so fold in the peaks it reported
+                peak = max(peak, frame['child_peak'])
+                stats['allocated_mb'] += (current - frame['start_memory']) / 1024 ** 2
+                stats['peak_mb'] = max(stats['peak_mb'], (peak - frame['start_memory']) / 1024 ** 2)
+                if self._stack:
+                    self._stack[-1]['child_peak'] = max(self._stack[-1]['child_peak'], peak)
+
+    def summary(self):
+        """
+        Returns the per-stage statistics.
+
+        Returns:
+            pd.DataFrame: One row per stage with calls, total and mean seconds and, when
+                allocations are tracked, net allocated and peak MB; slowest first.
+        """
+        table = pd.DataFrame.from_dict(self._stats, orient='index',
+                                       columns=['calls', 'seconds', 'allocated_mb', 'peak_mb'])
+        table.index.name = 'stage'
+        table['mean_seconds'] = table['seconds'] / table['calls']
+        return table.sort_values('seconds', ascending=False)
+
+    def print_summary(self):
+        """Prints the per-stage summary of the run."""
+        print("\n--- Stage Profile ---")
+        print(self.summary().to_string(float_format=lambda x: f"{x:.4f}"))
+        print("---------------------")
+
+    def dump_cprofile(self, path):
+        """
+        Writes the cProfile statistics to a pstats file, which snakeviz, gprof2dot
+        or flameprof can turn into a call graph or flame graph.
+        """
+        if self._cprofile is None:
+            raise RuntimeError("cProfile was not enabled; call enable(cprofile=True) first.")
+        self._cprofile.dump_stats(path)
+
+
+_NULL_STAGE = contextlib.nullcontext()
+
+# The profiler shared by all agents
+profiler = StageProfiler()
+
+
+def profiled(stage_name):
+    """
+    Decorator that records every call of a function as a stage of the shared profiler.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with profiler.stage(stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
\ No newline at end of file
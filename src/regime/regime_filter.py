@@ -3,6 +3,8 @@
 import pandas as pd
 import numpy as np
 
+from src.indicators.indicators import sma, rolling_slope
+
 class RegimeFilter:
     """
     A simple agent to determine the market regime (e.g., bull or bear)
@@ -36,12 +38,44 @@ class RegimeFilter:
         if len(recent_ma) < 2:
             return 'neutral' # Not enough data to determine a regime
 
-        # 3. Use numpy's polyfit to find the slope of the line that best fits the recent MA points
-        # The first element (m) of the returned array [m, c] is the slope.
-        slope = np.polyfit(range(len(recent_ma)), recent_ma, 1)[0]
+        # 3. Find the slope of the least-squares line that best fits the recent MA points
+        slope = rolling_slope(recent_ma, window=len(recent_ma)).iloc[-1]
         
         # 4. Classify the regime based on the slope
         if slope > 0:
             return 'bull'
         else:
-            return 'bear'
\ No newline at end of file
+            return 'bear'
+
+    def get_regime_series(self, data):
+        """
+        Determines the regime of every bar in a single pass, as get_regime would
+        from the data up to and including that bar, so there is no lookahead.
+
+        Args:
+            data (pd.DataFrame): A DataFrame with at least a 'close' column.
+
+        Returns:
+            pd.Series: 'bull', 'bear' or 'neutral' for every bar.
+        """
+        # 1. The moving average and the slope over the last lookback_period MA points
+        ma = sma(data['close'], self.lookback_period)
+        slope = rolling_slope(ma, self.lookback_period).to_numpy().copy()
+
+        # 2. Until a full window of MA points exists, get_regime fits all of them
+        ma_values = ma.to_numpy(dtype=float)
+        first = int(np.argmax(~np.isnan(ma_values))) if (~np.isnan(ma_values)).any() else len(ma_values)
+        warmup = ma_values[first:first + self.lookback_period - 1]
+        k = np.arange(1, len(warmup) + 1, dtype=float)
+        x = k - 1
+        sum_y = np.cumsum(warmup)
+        sum_xy = np.cumsum(x * warmup)
+        sum_x = k * (k - 1) / 2
+        sum_xx = (k - 1) * k * (2 * k - 1) / 6
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slope[first:first + len(warmup)] = (k * sum_xy - sum_x * sum_y) / (k * sum_xx - sum_x ** 2)
+
+        # 3. Classify, with fewer than 2 MA points being neutral
+        regime = np.where(slope > 0, 'bull', 'bear').astype(object)
+        regime[:first + 1] = 'neutral'
+        return pd.Series(regime, index=data.index)
\ No newline at end of file
@@ -1,31 +1,149 @@
 # src/risk/risk_manager.py
 
+import configparser
+import numpy as np
+
+from src.profiling.stage_profiler import profiled
+
 class RiskManager:
     """
     A simple agent responsible for all risk management calculations.
+
+    Every sizing model is linear in the account balance: a position is
+    balance * risk fraction / per-unit risk. 'fixed_fractional' risks
+    risk_percentage of the balance down to an ATR stop, 'volatility_target' sizes
+    the position so one ATR move is target_volatility of the balance, and 'kelly'
+    risks a (scaled) Kelly fraction of the balance down to the ATR stop.
     """
-    def calculate_trade_parameters(self, account_balance, risk_percentage, entry_price, atr, stop_loss_atr_multiplier):
+    SIZING_MODELS = ('fixed_fractional', 'volatility_target', 'kelly')
+
+    def __init__(self, risk_percentage=0.02, stop_loss_atr_multiplier=2.0, sizing_model='fixed_fractional',
+                 target_volatility=0.01, kelly_win_rate=0.55, kelly_payoff_ratio=1.5, kelly_scale=0.5):
         """
-        Calculates the position size and stop-loss price for a trade.
+        Initializes the RiskManager.
+
+        Args:
+            risk_percentage (float): The fraction of the balance risked per trade.
+            stop_loss_atr_multiplier (float): The stop-loss distance in multiples of ATR.
+            sizing_model (str): One of SIZING_MODELS.
+            target_volatility (float): For 'volatility_target', the fraction of the
+                balance a one-ATR move of the position should be worth.
+            kelly_win_rate (float): For 'kelly', the expected fraction of winning trades.
+            kelly_payoff_ratio (float): For 'kelly', the average win over the average loss.
+            kelly_scale (float): For 'kelly', the fraction of the full Kelly bet to take.
+        """
+        if sizing_model not in self.SIZING_MODELS:
+            raise ValueError(f"Unknown sizing model '{sizing_model}'. Choose one of {self.SIZING_MODELS}.")
+        self.risk_percentage = risk_percentage
+        self.stop_loss_atr_multiplier = stop_loss_atr_multiplier
+        self.sizing_model = sizing_model
+        self.target_volatility = target_volatility
+        self.kelly_win_rate = kelly_win_rate
+        self.kelly_payoff_ratio = kelly_payoff_ratio
+        self.kelly_scale = kelly_scale
+
+    @classmethod
+    def from_config(cls, path='config.ini', section='Risk'):
+        """
+        Creates a RiskManager from the [Risk] section of a config file. Missing
+        keys keep their defaults.
+        """
+        config = configparser.ConfigParser()
+        if not config.read(path) or not config.has_section(section):
+            raise ValueError(f"No [{section}] section found in {path}.")
+        settings = config[section]
+
+        kwargs = {}
+        for key in ('risk_percentage', 'stop_loss_atr_multiplier', 'target_volatility',
+                    'kelly_win_rate', 'kelly_payoff_ratio', 'kelly_scale'):
+            if key in settings:
+                kwargs[key] = settings.getfloat(key)
+        if 'sizing_model' in settings:
+            kwargs['sizing_model'] = settings['sizing_model']
+        return cls(**kwargs)
+
+    def sizing_terms(self, entry_price, atr, risk_percentage=None, stop_loss_atr_multiplier=None):
+        """
+        Computes the balance-independent part of the sizing for any number of
+        candidate entries, so engines can size them before the balance is known.
+
+        Args:
+            entry_price (float or np.ndarray): The entry prices.
+            atr (float or np.ndarray): The ATR at each entry.
+            risk_percentage (float, optional): Overrides self.risk_percentage.
+            stop_loss_atr_multiplier (float, optional): Overrides self.stop_loss_atr_multiplier.
 
         Returns:
-            A tuple containing (position_size, stop_loss_price).
-            Returns (0, 0) if risk cannot be calculated (e.g., division by zero).
+            A tuple of arrays (risk_fraction, risk_per_unit, stop_loss_price). The
+            position size is balance * risk_fraction / risk_per_unit wherever
+            risk_per_unit > 0, and no trade otherwise.
         """
-        # Calculate the total dollar amount to risk on this single trade
-        risk_amount_usd = account_balance * risk_percentage
+        if risk_percentage is None:
+            risk_percentage = self.risk_percentage
+        if stop_loss_atr_multiplier is None:
+            stop_loss_atr_multiplier = self.stop_loss_atr_multiplier
+        entry_price = np.asarray(entry_price, dtype=float)
+        atr = np.asarray(atr, dtype=float)
 
         # Calculate the stop-loss price based on volatility (ATR)
         stop_loss_price = entry_price - (atr * stop_loss_atr_multiplier)
 
-        # Calculate the risk per unit of the asset
-        risk_per_unit = entry_price - stop_loss_price
+        if self.sizing_model == 'volatility_target':
+            risk_fraction = np.full(np.shape(atr), self.target_volatility)
+            risk_per_unit = atr
+        else:
+            if self.sizing_model == 'kelly':
+                kelly = self.kelly_win_rate - (1 - self.kelly_win_rate) / self.kelly_payoff_ratio
+                risk_fraction = np.full(np.shape(atr), max(kelly * self.kelly_scale, 0.0))
+            else:
+                risk_fraction = np.full(np.shape(atr), risk_percentage)
+            # Calculate the risk per unit of the asset
+            risk_per_unit = entry_price - stop_loss_price
+
+        return risk_fraction, risk_per_unit, stop_loss_price
+
+    @profiled('risk_sizing')
+    def size_positions(self, account_balance, entry_price, atr, risk_percentage=None, stop_loss_atr_multiplier=None):
+        """
+        Calculates position sizes and stop-loss prices for many entries at once.
+
+        Args:
+            account_balance (float or np.ndarray): The balance each entry is sized from.
+            entry_price (np.ndarray): The entry prices.
+            atr (np.ndarray): The ATR at each entry.
+            risk_percentage (float, optional): Overrides self.risk_percentage.
+            stop_loss_atr_multiplier (float, optional): Overrides self.stop_loss_atr_multiplier.
+
+        Returns:
+            A tuple of arrays (position_size, stop_loss_price). Entries whose risk
+            cannot be calculated get (0, 0), as in calculate_trade_parameters.
+        """
+        risk_fraction, risk_per_unit, stop_loss_price = self.sizing_terms(
+            entry_price, atr, risk_percentage, stop_loss_atr_multiplier
+        )
+        valid = risk_per_unit > 0
+        safe_risk = np.where(valid, risk_per_unit, 1.0)
+        position_size = np.where(valid, (account_balance * risk_fraction) / safe_risk, 0.0)
+        return position_size, np.where(valid, stop_loss_price, 0.0)
+
+    @profiled('risk_sizing')
+    def calculate_trade_parameters(self, account_balance, risk_percentage, entry_price, atr, stop_loss_atr_multiplier):
+        """
+        Calculates the position size and stop-loss price for a trade.
+
+        Returns:
+            A tuple containing (position_size, stop_loss_price).
+            Returns (0, 0) if risk cannot be calculated (e.g., division by zero).
+        """
+        risk_fraction, risk_per_unit, stop_loss_price = self.sizing_terms(
+            entry_price, atr, risk_percentage, stop_loss_atr_multiplier
+        )
 
         # Avoid division by zero if entry price equals the stop-loss price
-        if risk_per_unit <= 0:
+        if not risk_per_unit > 0:
             return 0, 0
 
         # Calculate the number of units to buy/sell
-        position_size = risk_amount_usd / risk_per_unit
+        position_size = (account_balance * risk_fraction) / risk_per_unit
 
-        return position_size, stop_loss_price
\ No newline at end of file
+        return float(position_size), float(stop_loss_price)
\ No newline at end of file
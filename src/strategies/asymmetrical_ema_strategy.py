@@ -3,26 +3,44 @@
 import pandas as pd
 import numpy as np
 
+from src.indicators.indicator_store import default_store
+from src.indicators.indicators import ema, sma, rolling_slope
+from src.indicators.streaming import StreamingEma, StreamingSma, StreamingSlope
+from src.profiling.stage_profiler import profiled
+
 class AsymmetricalEmaStrategy:
     """
     A strategy that uses a fast EMA crossover for entry, but a slow,
     regime-based signal for exiting to hold trends longer.
     """
-    def __init__(self, short_ema=21, long_ema=55, regime_ma=200):
+    def __init__(self, short_ema=21, long_ema=55, regime_ma=200, indicator_store=None):
         self.short_ema = short_ema
         self.long_ema = long_ema
         self.regime_ma = regime_ma
+        self.indicator_store = indicator_store if indicator_store is not None else default_store
+
+    @profiled('generate_signals:AsymmetricalEmaStrategy')
+    def generate_signals(self, data, return_indicators=False):
+        """
+        Generates the final buy/sell signals.
 
-    def generate_signals(self, data):
-        """Generates the final buy/sell signals."""
+        Args:
+            data (pd.DataFrame): A DataFrame with a 'close' column. It is only read.
+            return_indicators (bool): Whether to also return the indicator columns.
+
+        Returns:
+            A pandas DataFrame with a 'signal' column.
+        """
         
+        store = self.indicator_store
+
         # --- Entry Logic ---
-        ema_short = data['close'].ewm(span=self.short_ema, adjust=False).mean()
-        ema_long = data['close'].ewm(span=self.long_ema, adjust=False).mean()
+        ema_short = store.get('ema', data['close'], span=self.short_ema)
+        ema_long = store.get('ema', data['close'], span=self.long_ema)
         
         # --- Exit Logic ---
-        regime_ma = data['close'].rolling(window=self.regime_ma).mean()
-        regime_slope = regime_ma.rolling(window=30).apply(lambda x: np.polyfit(range(30), x, 1)[0], raw=False)
+        regime_ma = store.get('sma', data['close'], window=self.regime_ma)
+        regime_slope = store.get('rolling_slope', regime_ma, window=30)
         
         # --- Position Logic ---
         position = pd.Series(index=data.index, dtype=float)
@@ -42,6 +60,100 @@ class AsymmetricalEmaStrategy:
         # Determine final trades
         signals = pd.DataFrame(index=data.index)
         signals['signal'] = position.diff()
+        if return_indicators:
+            signals['ema_short'] = ema_short
+            signals['ema_long'] = ema_long
+            signals['regime_ma'] = regime_ma
+            signals['regime_slope'] = regime_slope
         
         return signals
-    
\ No newline at end of file
+
+    @property
+    def warmup_bars(self):
+        """The bars of history the windowed indicators need before a new chunk."""
+        return self.regime_ma + 30 - 1
+
+    def generate_signals_chunk(self, data, warmup_rows=0, state=None):
+        """
+        Generates the signals of one chunk of a longer history. See
+        SoprEmaStrategy.generate_signals_chunk.
+
+        Returns:
+            A tuple (signals, state) with the signals of the new chunk's rows.
+        """
+        state = state or {}
+        chunk = data.iloc[warmup_rows:]
+
+        # Chunks are seen once, so they bypass the indicator cache
+        ema_short = ema(chunk['close'], self.short_ema, initial=state.get('ema_short'))
+        ema_long = ema(chunk['close'], self.long_ema, initial=state.get('ema_long'))
+        regime_slope = rolling_slope(sma(data['close'], self.regime_ma), 30).iloc[warmup_rows:]
+
+        previous_short = ema_short.shift(1, fill_value=state.get('ema_short', np.nan))
+        previous_long = ema_long.shift(1, fill_value=state.get('ema_long', np.nan))
+        buy_trigger = (ema_short > ema_long) & (previous_short <= previous_long)
+
+        position = pd.Series(index=chunk.index, dtype=float)
+        position[buy_trigger] = 1.0
+        position[regime_slope < 0] = 0.0
+        position = position.ffill().fillna(state.get('position', 0.0))
+
+        signals = pd.DataFrame(index=chunk.index)
+        signals['signal'] = position.diff()
+        if 'position' in state and len(position):
+            signals.iloc[0, 0] = position.iloc[0] - state['position']
+
+        if len(chunk):
+            state = {'ema_short': ema_short.iloc[-1], 'ema_long': ema_long.iloc[-1], 'position': position.iloc[-1]}
+        return signals, state
+
+    def start_stream(self):
+        """
+        Starts an incremental signal stream that produces the same signals as
+        generate_signals, one bar at a time.
+        """
+        return AsymmetricalEmaSignalStream(self)
+
+
+class AsymmetricalEmaSignalStream:
+    """
+    The incremental form of AsymmetricalEmaStrategy for live, bar-by-bar updates.
+    Each new bar costs O(1).
+    """
+    def __init__(self, strategy):
+        self.ema_short = StreamingEma(strategy.short_ema)
+        self.ema_long = StreamingEma(strategy.long_ema)
+        self.regime_ma = StreamingSma(strategy.regime_ma)
+        self.regime_slope = StreamingSlope(30)
+        self._previous_emas = (np.nan, np.nan)
+        self._position = None
+
+    def update(self, bar):
+        """
+        Folds in one bar and returns its signal.
+
+        Args:
+            bar (dict): The new bar, with at least 'close'.
+
+        Returns:
+            float: 1.0 (buy), -1.0 (sell) or 0.0 (hold); NaN for the first bar.
+        """
+        ema_short = self.ema_short.update(bar['close'])
+        ema_long = self.ema_long.update(bar['close'])
+        regime_slope = self.regime_slope.update(self.regime_ma.update(bar['close']))
+
+        previous_short, previous_long = self._previous_emas
+        buy_trigger = (ema_short > ema_long) and (previous_short <= previous_long)
+        self._previous_emas = (ema_short, ema_long)
+
+        # The exit trigger overrides an entry on the same bar, as in the batch path
+        if regime_slope < 0:
+            position = 0.0
+        elif buy_trigger:
+            position = 1.0
+        else:
+            position = self._position if self._position is not None else 0.0
+
+        signal = np.nan if self._position is None else position - self._position
+        self._position = position
+        return signal
\ No newline at end of file
@@ -3,43 +3,109 @@
 import pandas as pd
 import numpy as np
 
+from src.indicators.indicator_store import default_store
+from src.indicators.indicators import sma
+from src.indicators.streaming import StreamingSma
+from src.profiling.stage_profiler import profiled
+
 class MovingAverageCrossoverStrategy:
     """
     A simple strategy that generates signals based on two moving averages crossing.
     """
-    def __init__(self, short_window=5, long_window=10):
+    def __init__(self, short_window=5, long_window=10, indicator_store=None):
         """
         Initializes the strategy with specific window lengths.
 
         Args:
             short_window (int): The lookback period for the short moving average.
             long_window (int): The lookback period for the long moving average.
+            indicator_store (IndicatorStore, optional): Where moving averages are cached.
+                Defaults to the store shared by all strategies.
         """
         self.short_window = short_window
         self.long_window = long_window
+        self.indicator_store = indicator_store if indicator_store is not None else default_store
 
-    def generate_signals(self, data):
+    @profiled('generate_signals:MovingAverageCrossoverStrategy')
+    def generate_signals(self, data, return_indicators=False):
         """
         Generates buy (1), sell (-1), or hold (0) signals.
 
         Args:
-            data (pd.DataFrame): A DataFrame with at least a 'close' column.
+            data (pd.DataFrame): A DataFrame with at least a 'close' column. It is only read.
+            return_indicators (bool): Whether to also return the moving averages and position.
 
         Returns:
             A pandas DataFrame with a 'signal' column.
         """
-        # Create a new DataFrame to avoid modifying the original data
-        signals = pd.DataFrame(index=data.index)
-        signals['signal'] = 0.0
-
         # Calculate the short and long moving averages
-        signals['short_ma'] = data['close'].rolling(window=self.short_window).mean()
-        signals['long_ma'] = data['close'].rolling(window=self.long_window).mean()
+        short_ma = self.indicator_store.get('sma', data['close'], window=self.short_window)
+        long_ma = self.indicator_store.get('sma', data['close'], window=self.long_window)
 
-        # Create the position state directly in the signals DataFrame to preserve the index
-        signals['position'] = np.where(signals['short_ma'] > signals['long_ma'], 1.0, 0.0)
+        # The position state, aligned with the input index
+        position = pd.Series(np.where(short_ma > long_ma, 1.0, 0.0), index=data.index)
         
         # The signal is the change in state from the previous day
-        signals['signal'] = signals['position'].diff()
+        signals = pd.DataFrame(index=data.index)
+        signals['signal'] = position.diff()
+        if return_indicators:
+            signals['short_ma'] = short_ma
+            signals['long_ma'] = long_ma
+            signals['position'] = position
+
+        return signals
+
+    @property
+    def warmup_bars(self):
+        """The bars of history the moving averages need before a new chunk."""
+        return max(self.short_window, self.long_window)
+
+    def generate_signals_chunk(self, data, warmup_rows=0, state=None):
+        """
+        Generates the signals of one chunk of a longer history. The crossover
+        only depends on the last long_window bars, so the warm-up rows carry all
+        the state there is.
+
+        Returns:
+            A tuple (signals, state) with the signals of the new chunk's rows.
+        """
+        short_ma = sma(data['close'], self.short_window)
+        long_ma = sma(data['close'], self.long_window)
+        position = pd.Series(np.where(short_ma > long_ma, 1.0, 0.0), index=data.index)
+
+        signals = pd.DataFrame(index=data.index)
+        signals['signal'] = position.diff()
+        return signals.iloc[warmup_rows:], {}
 
-        return signals
\ No newline at end of file
+    def start_stream(self):
+        """
+        Starts an incremental signal stream that produces the same signals as
+        generate_signals, one bar at a time.
+        """
+        return MovingAverageCrossoverSignalStream(self)
+
+
+class MovingAverageCrossoverSignalStream:
+    """
+    The incremental form of MovingAverageCrossoverStrategy for live, bar-by-bar updates.
+    Each new bar costs O(1).
+    """
+    def __init__(self, strategy):
+        self.short_ma = StreamingSma(strategy.short_window)
+        self.long_ma = StreamingSma(strategy.long_window)
+        self._position = None
+
+    def update(self, bar):
+        """
+        Folds in one bar and returns its signal.
+
+        Args:
+            bar (dict): The new bar, with at least 'close'.
+
+        Returns:
+            float: 1.0 (buy), -1.0 (sell) or 0.0 (hold); NaN for the first bar.
+        """
+        position = 1.0 if self.short_ma.update(bar['close']) > self.long_ma.update(bar['close']) else 0.0
+        signal = np.nan if self._position is None else position - self._position
+        self._position = position
+        return signal
\ No newline at end of file
@@ -0,0 +1,26 @@
+# src/strategies/precomputed_signal_strategy.py
+
+import pandas as pd
+
+class PrecomputedSignalStrategy:
+    """
+    Serves signals that were generated once over the full history, cut to
+    whatever window of data it is asked about. Because every indicator is causal,
+    a window's signals are the same as if they had been computed bar by bar with
+    all earlier history available, so e.g. walk-forward folds need not recompute them.
+    """
+    def __init__(self, signals):
+        """
+        Args:
+            signals (pd.Series): The signal for every bar of the full history.
+        """
+        self.signals = signals
+
+    def generate_signals(self, data, return_indicators=False):
+        """
+        Returns the stored signals on the data's index. There are no indicators,
+        so return_indicators has no effect.
+        """
+        signals = pd.DataFrame(index=data.index)
+        signals['signal'] = self.signals.reindex(data.index)
+        return signals
\ No newline at end of file
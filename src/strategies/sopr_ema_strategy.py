@@ -3,6 +3,11 @@
 import pandas as pd
 import numpy as np
 
+from src.indicators.indicator_store import default_store
+from src.indicators.indicators import ema, sma, rolling_min, rolling_slope
+from src.indicators.streaming import StreamingEma, StreamingSma, StreamingRollingMin, StreamingSlope
+from src.profiling.stage_profiler import profiled
+
 class SoprEmaStrategy:
     """
     The final strategy:
@@ -10,29 +15,42 @@ class SoprEmaStrategy:
     - ENTRY: Buys on a fast EMA crossover.
     - EXIT: Sells on a slow, long-term regime change.
     """
-    def __init__(self, short_ema=21, long_ema=55, regime_ma=200, sopr_threshold=1.0):
+    def __init__(self, short_ema=21, long_ema=55, regime_ma=200, sopr_threshold=1.0, indicator_store=None):
         self.short_ema = short_ema
         self.long_ema = long_ema
         self.regime_ma = regime_ma
         self.sopr_threshold = sopr_threshold
+        self.indicator_store = indicator_store if indicator_store is not None else default_store
+
+    @profiled('generate_signals:SoprEmaStrategy')
+    def generate_signals(self, data, return_indicators=False):
+        """
+        Generates the final buy/sell signals.
+
+        Args:
+            data (pd.DataFrame): A DataFrame with 'close' and 'sopr' columns. It is only read.
+            return_indicators (bool): Whether to also return the indicator columns.
 
-    def generate_signals(self, data):
-        """Generates the final buy/sell signals."""
+        Returns:
+            A pandas DataFrame with a 'signal' column.
+        """
         
         # --- Calculate all necessary indicators ---
-        data['ema_short'] = data['close'].ewm(span=self.short_ema, adjust=False).mean()
-        data['ema_long'] = data['close'].ewm(span=self.long_ema, adjust=False).mean()
+        store = self.indicator_store
+        ema_short = store.get('ema', data['close'], span=self.short_ema)
+        ema_long = store.get('ema', data['close'], span=self.long_ema)
         
-        regime_ma = data['close'].rolling(window=self.regime_ma).mean()
-        regime_slope = regime_ma.rolling(window=30).apply(lambda x: np.polyfit(range(30), x, 1)[0], raw=False)
+        regime_ma = store.get('sma', data['close'], window=self.regime_ma)
+        regime_slope = store.get('rolling_slope', regime_ma, window=30)
         
         # --- Define Conditions ---
         # Condition 1: The market must have recently been in capitulation (SOPR < 1)
         # We create a rolling window to see if SOPR has been below 1 in the last 30 days
-        is_armed = (data['sopr'].rolling(window=30).min() < self.sopr_threshold)
+        sopr_min = store.get('rolling_min', data['sopr'], window=30)
+        is_armed = (sopr_min < self.sopr_threshold)
         
         # Condition 2: The medium-term trend must turn bullish
-        is_ema_cross_buy = (data['ema_short'] > data['ema_long']) & (data['ema_short'].shift(1) <= data['ema_long'].shift(1))
+        is_ema_cross_buy = (ema_short > ema_long) & (ema_short.shift(1) <= ema_long.shift(1))
         
         # Condition 3: The long-term trend must be bullish for us to hold
         is_bull_regime = (regime_slope > 0)
@@ -52,5 +70,184 @@ class SoprEmaStrategy:
         
         signals = pd.DataFrame(index=data.index)
         signals['signal'] = position.diff()
+        if return_indicators:
+            signals['ema_short'] = ema_short
+            signals['ema_long'] = ema_long
+            signals['regime_ma'] = regime_ma
+            signals['regime_slope'] = regime_slope
+            signals['sopr_min'] = sopr_min
         
-        return signals
\ No newline at end of file
+        return signals
+
+    @profiled('generate_signals_batch:SoprEmaStrategy')
+    def generate_signals_batch(self, data, param_sets, block_size=256):
+        """
+        Generates the signals of many parameter sets in one pass. Each distinct EMA
+        span, regime window and SOPR threshold is computed once, and the crossovers,
+        arming and positions of all configurations are evaluated as a 2-D array
+        (bars x configs), a block of configurations at a time.
+
+        Args:
+            data (pd.DataFrame): A DataFrame with 'close' and 'sopr' columns. It is only read.
+            param_sets (list): One dict per configuration with any of 'short_ema',
+                'long_ema', 'regime_ma' and 'sopr_threshold'; missing keys take this
+                strategy's values.
+            block_size (int): The number of configurations evaluated together, which
+                bounds the memory of the intermediate arrays.
+
+        Returns:
+            A pandas DataFrame with one 'signal' column per parameter set, in order.
+        """
+        # 1. Resolve every configuration against this strategy's parameters
+        names = ('short_ema', 'long_ema', 'regime_ma', 'sopr_threshold')
+        configs = []
+        for params in param_sets:
+            unknown = set(params) - set(names)
+            if unknown:
+                raise ValueError(f"Unknown SoprEmaStrategy parameters: {sorted(unknown)}")
+            configs.append({name: params.get(name, getattr(self, name)) for name in names})
+
+        # 2. Each distinct indicator once, as a column of a matrix
+        store = self.indicator_store
+        spans = sorted({c['short_ema'] for c in configs} | {c['long_ema'] for c in configs})
+        emas = np.column_stack([store.get('ema', data['close'], span=span).to_numpy(dtype=float) for span in spans]) if configs else None
+        windows = sorted({c['regime_ma'] for c in configs})
+        slopes = np.column_stack([
+            store.get('rolling_slope', store.get('sma', data['close'], window=window), window=30).to_numpy(dtype=float)
+            for window in windows
+        ]) if configs else None
+        sopr_min = store.get('rolling_min', data['sopr'], window=30).to_numpy(dtype=float)
+
+        short_column = np.array([spans.index(c['short_ema']) for c in configs], dtype=int)
+        long_column = np.array([spans.index(c['long_ema']) for c in configs], dtype=int)
+        regime_column = np.array([windows.index(c['regime_ma']) for c in configs], dtype=int)
+        thresholds = np.array([c['sopr_threshold'] for c in configs], dtype=float)
+
+        n_bars = len(data)
+        bars = np.arange(n_bars)[:, None]
+        signals = np.empty((n_bars, len(configs)))
+        for start in range(0, len(configs), block_size):
+            block = slice(start, start + block_size)
+            ema_short = emas[:, short_column[block]]
+            ema_long = emas[:, long_column[block]]
+
+            # 3. The same conditions as generate_signals, for the whole block
+            is_armed = sopr_min[:, None] < thresholds[None, block]
+            is_ema_cross_buy = ema_short > ema_long
+            is_ema_cross_buy[0] = False
+            is_ema_cross_buy[1:] &= ema_short[:-1] <= ema_long[:-1]
+            is_bear_regime = ~(slopes[:, regime_column[block]] > 0)
+
+            # 4. Hold the position set by the most recent buy or exit (exits win ties)
+            last_event = np.where((is_armed & is_ema_cross_buy) | is_bear_regime, bars, -1)
+            np.maximum.accumulate(last_event, axis=0, out=last_event)
+            position = np.take_along_axis(np.where(is_bear_regime, 0.0, 1.0), np.maximum(last_event, 0), axis=0)
+            position[last_event < 0] = 0.0
+
+            signals[0, block] = np.nan
+            signals[1:, block] = np.diff(position, axis=0)
+
+        return pd.DataFrame(signals, index=data.index, copy=False)
+
+    @property
+    def warmup_bars(self):
+        """The bars of history the windowed indicators need before a new chunk."""
+        return self.regime_ma + 30 - 1
+
+    def generate_signals_chunk(self, data, warmup_rows=0, state=None):
+        """
+        Generates the signals of one chunk of a longer history, for data that is
+        processed in windows. The windowed indicators are computed over the
+        preceding warm-up rows; the EMAs and the held position continue from the
+        state returned for the previous chunk.
+
+        Args:
+            data (pd.DataFrame): The last `warmup_rows` rows of the previous chunk
+                (at most warmup_bars are needed), followed by the new chunk.
+            warmup_rows (int): The number of leading warm-up rows.
+            state (dict, optional): The state returned for the previous chunk.
+
+        Returns:
+            A tuple (signals, state) with the signals of the new chunk's rows.
+        """
+        state = state or {}
+        chunk = data.iloc[warmup_rows:]
+
+        # Chunks are seen once, so they bypass the indicator cache
+        ema_short = ema(chunk['close'], self.short_ema, initial=state.get('ema_short'))
+        ema_long = ema(chunk['close'], self.long_ema, initial=state.get('ema_long'))
+        regime_slope = rolling_slope(sma(data['close'], self.regime_ma), 30).iloc[warmup_rows:]
+        is_armed = rolling_min(data['sopr'], 30).iloc[warmup_rows:] < self.sopr_threshold
+
+        previous_short = ema_short.shift(1, fill_value=state.get('ema_short', np.nan))
+        previous_long = ema_long.shift(1, fill_value=state.get('ema_long', np.nan))
+        is_ema_cross_buy = (ema_short > ema_long) & (previous_short <= previous_long)
+
+        position = pd.Series(index=chunk.index, dtype=float)
+        position[is_armed & is_ema_cross_buy] = 1.0
+        position[~(regime_slope > 0)] = 0.0
+        position = position.ffill().fillna(state.get('position', 0.0))
+
+        signals = pd.DataFrame(index=chunk.index)
+        signals['signal'] = position.diff()
+        if 'position' in state and len(position):
+            signals.iloc[0, 0] = position.iloc[0] - state['position']
+
+        if len(chunk):
+            state = {'ema_short': ema_short.iloc[-1], 'ema_long': ema_long.iloc[-1], 'position': position.iloc[-1]}
+        return signals, state
+
+    def start_stream(self):
+        """
+        Starts an incremental signal stream that produces the same signals as
+        generate_signals, one bar at a time.
+        """
+        return SoprEmaSignalStream(self)
+
+
+class SoprEmaSignalStream:
+    """
+    The incremental form of SoprEmaStrategy for live, bar-by-bar updates. Keeps the
+    EMA states, the regime MA and slope windows and the SOPR window, so each new
+    bar costs O(1) instead of a pass over the whole history.
+    """
+    def __init__(self, strategy):
+        self.sopr_threshold = strategy.sopr_threshold
+        self.ema_short = StreamingEma(strategy.short_ema)
+        self.ema_long = StreamingEma(strategy.long_ema)
+        self.regime_ma = StreamingSma(strategy.regime_ma)
+        self.regime_slope = StreamingSlope(30)
+        self.sopr_min = StreamingRollingMin(30)
+        self._previous_emas = (np.nan, np.nan)
+        self._position = None
+
+    def update(self, bar):
+        """
+        Folds in one bar and returns its signal.
+
+        Args:
+            bar (dict): The new bar, with at least 'close' and 'sopr'.
+
+        Returns:
+            float: 1.0 (buy), -1.0 (sell) or 0.0 (hold); NaN for the first bar.
+        """
+        ema_short = self.ema_short.update(bar['close'])
+        ema_long = self.ema_long.update(bar['close'])
+        regime_slope = self.regime_slope.update(self.regime_ma.update(bar['close']))
+        is_armed = self.sopr_min.update(bar['sopr']) < self.sopr_threshold
+
+        previous_short, previous_long = self._previous_emas
+        is_ema_cross_buy = (ema_short > ema_long) and (previous_short <= previous_long)
+        self._previous_emas = (ema_short, ema_long)
+
+        # The regime exit overrides an entry on the same bar, as in the batch path
+        if not regime_slope > 0:
+            position = 0.0
+        elif is_armed and is_ema_cross_buy:
+            position = 1.0
+        else:
+            position = self._position if self._position is not None else 0.0
+
+        signal = np.nan if self._position is None else position - self._position
+        self._position = position
+        return signal
\ No newline at end of file
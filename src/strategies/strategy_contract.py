@@ -0,0 +1,29 @@
+# src/strategies/strategy_contract.py
+
+import pandas as pd
+
+# The contract every strategy follows:
+# - generate_signals(data, return_indicators=False) only reads the input columns.
+#   It never adds, removes or overwrites columns of `data`, so one data block can
+#   be shared by many runs, worker processes and cached indicators without copies.
+# - It returns a DataFrame on data's index holding just the 'signal' column
+#   (1.0 buy, -1.0 sell, 0.0 hold), plus its indicator columns on request.
+#
+# Engines hand strategies a read_only_view of their data, so a strategy that
+# breaks the contract by writing into the input values fails loudly.
+
+def read_only_view(data, columns=None):
+    """
+    Returns a zero-copy DataFrame over the columns of `data` whose values cannot
+    be written to. Columns added to the view do not reach the original frame.
+
+    Args:
+        data (pd.DataFrame): The market data.
+        columns (list, optional): The columns to expose. Defaults to all.
+    """
+    views = {}
+    for column in (data.columns if columns is None else columns):
+        values = data[column].to_numpy().view()
+        values.flags.writeable = False
+        views[column] = values
+    return pd.DataFrame(views, index=data.index, copy=False)
\ No newline at end of file
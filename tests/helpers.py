@@ -0,0 +1,48 @@
+# tests/helpers.py
+
+import pandas as pd
+import numpy as np
+
+# Shared market data fixtures for the tests
+
+def make_ohlc_data(n_bars, seed, freq='D', start='2020-01-01', drift=0.0, open_noise=0.5, atr=2.0, volume=None):
+    """
+    A random walk of OHLC bars around 100 with the columns the backtests read.
+
+    Args:
+        n_bars (int): The number of bars.
+        seed (int): The random seed.
+        freq (str, optional): The bar frequency of a DatetimeIndex from `start`. None
+            keeps a RangeIndex.
+        start (str): The first timestamp.
+        drift (float): The mean close-to-close change.
+        open_noise (float): The standard deviation of the opens around the closes;
+            0 opens every bar at its close.
+        atr (float, optional): A constant ATR. None draws it uniformly from [0.5, 3).
+        volume (float, optional): A constant volume column, if given.
+
+    Returns:
+        pd.DataFrame: 'open', 'high', 'low', 'close' and 'atr' columns, the highs and
+            lows one unit from the close.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(drift, 1, n_bars))
+    data = pd.DataFrame({
+        'open': close + rng.normal(0, open_noise, n_bars) if open_noise else close,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'atr': rng.uniform(0.5, 3.0, n_bars) if atr is None else np.full(n_bars, atr),
+    })
+    if volume is not None:
+        data['volume'] = np.full(n_bars, volume)
+    if freq is not None:
+        data.index = pd.date_range(start, periods=n_bars, freq=freq)
+    return data
+
+def add_sopr(data, seed=None, noise=0.01):
+    """Adds a 'sopr' column oscillating around 1, with optional random noise."""
+    sopr = 1 + 0.03 * np.sin(np.arange(len(data)) / 15)
+    if seed is not None:
+        sopr = sopr + np.random.default_rng(seed).normal(0, noise, len(data))
+    return data.assign(sopr=sopr)
\ No newline at end of file
@@ -0,0 +1,78 @@
+# tests/test_backtest_result.py
+
+import unittest
+import numpy as np
+
+from src.analytics.performance_metrics import compute_metrics, max_drawdown
+from src.optimization.parameter_sweep import ParameterSweep
+from src.portfolio.backtest_result import BacktestResult
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.risk.risk_manager import RiskManager
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+from tests.helpers import make_ohlc_data
+
+class TestBacktestResult(unittest.TestCase):
+
+    def setUp(self):
+        self.data = make_ohlc_data(2000, seed=11, freq='h')
+        self.result = PortfolioManager(
+            self.data, {'default': MovingAverageCrossoverStrategy(short_window=3, long_window=8)}, RiskManager(),
+            commission_pct=0.001, engine='vectorized'
+        ).run_backtest()
+
+    def test_trades_carry_their_timestamps(self):
+        """Tests that every trade is stamped with the date of the bar it was filled on."""
+        self.assertEqual(self.result.equity.dtype, np.float64)
+        self.assertGreater(len(self.result.trades), 10)
+        trades = self.result.trades_frame()
+        self.assertTrue(trades.index.equals(self.data.index[self.result.trades['bar']]))
+        np.testing.assert_array_equal(trades['price'], self.result.trades['price'])
+        self.assertEqual(set(trades['type']), {'buy', 'sell'})
+
+    def test_compact_storage(self):
+        """
+        Tests float32 storage and downsampling, which keeps the final equity and
+        the maximum drawdown of the full curve.
+        """
+        single = self.result.compact(dtype=np.float32)
+        self.assertEqual(single.equity.dtype, np.float32)
+        self.assertLess(single.nbytes, self.result.nbytes)
+
+        small = self.result.compact(dtype=np.float64, max_points=100)
+        self.assertLessEqual(len(small.equity), 102)
+        self.assertEqual(small.final_equity, self.result.final_equity)
+        self.assertEqual(max_drawdown(small), max_drawdown(self.result.equity))
+        self.assertTrue(small.index.equals(self.data.index[small.bars]))
+        with self.assertRaises(ValueError):
+            compute_metrics(small)
+        self.assertEqual(compute_metrics(self.result)['trade_count'], len(self.result.trades) // 2)
+
+    def test_compact_keeps_drawdown_of_the_full_curve(self):
+        """
+        Tests that a bucket holding a peak, a trough and a higher high keeps the
+        full curve's drawdown, although the downsampled points drop the peak.
+        """
+        equity = np.array([100, 150, 50, 180, 190, 200, 210, 220], dtype=float)
+        result = BacktestResult(self.data.index[:8], equity, self.result.trades[:0], self.data.index[:0])
+        small = result.compact(dtype=np.float64, max_points=4)
+
+        np.testing.assert_array_equal(small.equity, [100, 50, 180, 190, 220])
+        self.assertAlmostEqual(max_drawdown(small.equity), 0.5)
+        self.assertAlmostEqual(max_drawdown(small), 2 / 3)
+        self.assertAlmostEqual(max_drawdown(small.compact(max_points=2)), 2 / 3)
+        self.assertIsNone(result.max_drawdown)
+        self.assertAlmostEqual(max_drawdown(result), 2 / 3)
+
+    def test_sweep_keeps_compact_results(self):
+        """Tests that a sweep can keep every run's result in compact form."""
+        results = ParameterSweep(
+            self.data, MovingAverageCrossoverStrategy, {'short_window': [3, 5], 'long_window': [10]},
+            max_workers=1, keep_results=True, result_dtype='float32', max_equity_points=50
+        ).run()
+        for _, row in results.iterrows():
+            self.assertEqual(row['result'].equity.dtype, np.float32)
+            self.assertLessEqual(len(row['result'].equity), 52)
+            self.assertAlmostEqual(row['result'].final_equity / 100000.0 - 1, row['total_return_pct'] / 100, places=5)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+# tests/test_batch_downloader.py
+
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import ccxt
+
+from src.data.batch_downloader import BatchDownloader, RateLimiter
+from src.data.market_store import MarketDataStore
+from tests.test_data_manager import FakeExchange
+
+
+class FlakyExchange(FakeExchange):
+    """A fake exchange whose first request for every symbol fails with a network error."""
+    def __init__(self, n_candles, broken_symbols=()):
+        super().__init__(n_candles)
+        self.failed_once = set()
+        self.broken_symbols = set(broken_symbols)
+
+    def fetch_ohlcv(self, symbol, timeframe, since, limit=1000):
+        if symbol in self.broken_symbols:
+            raise ccxt.NetworkError("Exchange unavailable")
+        if (symbol, timeframe) not in self.failed_once:
+            self.failed_once.add((symbol, timeframe))
+            raise ccxt.NetworkError("Temporary failure")
+        return super().fetch_ohlcv(symbol, timeframe, since, limit)
+
+
+class TestBatchDownloader(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.events = []
+        self._lock = threading.Lock()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _record(self, symbol, timeframe, event, detail):
+        with self._lock:
+            self.events.append((symbol, timeframe, event))
+
+    def test_downloads_all_series_with_retries(self):
+        """
+        Tests that every (symbol, timeframe) series is fetched concurrently,
+        transient errors are retried, and a permanently failing series is
+        reported without stopping the others.
+        """
+        symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'BAD/USDT']
+        downloader = BatchDownloader(
+            exchange_factory=lambda: FlakyExchange(7, broken_symbols=['BAD/USDT']),
+            max_workers=4, requests_per_second=1000, max_retries=2, backoff_seconds=0.001,
+            progress=self._record
+        )
+        report = downloader.download(symbols, ['1d', '4h'], '2025-01-01', data_dir=self.temp_dir)
+
+        store = MarketDataStore(os.path.join(self.temp_dir, 'store'))
+        for symbol in symbols[:3]:
+            for timeframe in ['1d', '4h']:
+                self.assertEqual(report[(symbol, timeframe)], {'status': 'done', 'new_candles': 7})
+                self.assertEqual(len(store.read(symbol, timeframe)), 7)
+        self.assertEqual(report[('BAD/USDT', '1d')]['status'], 'failed')
+        self.assertIsInstance(report[('BAD/USDT', '1d')]['error'], ccxt.NetworkError)
+
+        # Per-series progress was reported
+        self.assertIn(('ETH/USDT', '4h', 'page'), self.events)
+        self.assertIn(('BAD/USDT', '4h', 'failed'), self.events)
+
+    def test_rate_limiter_spaces_requests_across_threads(self):
+        """Tests that concurrent callers together respect the requests-per-second limit."""
+        limiter = RateLimiter(requests_per_second=100)
+        stamps = []
+
+        def call():
+            limiter.wait()
+            stamps.append(time.monotonic())
+
+        threads = [threading.Thread(target=call) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stamps.sort()
+        self.assertGreaterEqual(stamps[-1] - stamps[0], 9 * 0.01 * 0.9)
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
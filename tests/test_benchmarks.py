@@ -0,0 +1,39 @@
+# tests/test_benchmarks.py
+
+import unittest
+import copy
+
+from benchmarks.run_benchmarks import run_benchmarks, compare_results
+from benchmarks.synthetic_data import generate_market_data
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_synthetic_data_is_valid_ohlc(self):
+        """Tests that the generated bars are internally consistent."""
+        data = generate_market_data(1000, seed=1)
+        self.assertEqual(len(data), 1000)
+        self.assertTrue((data['high'] >= data[['open', 'close']].max(axis=1)).all())
+        self.assertTrue((data['low'] <= data[['open', 'close']].min(axis=1)).all())
+        self.assertTrue((data['low'] > 0).all())
+
+    def test_suite_runs_and_compares(self):
+        """
+        Tests that a small run times every stage and that a comparison flags a
+        stage that got slower.
+        """
+        report = run_benchmarks(sizes=[400], max_loop_bars=400)
+        stages = [row['stage'] for row in report['results']]
+
+        self.assertIn('load_data:store', stages)
+        self.assertIn('generate_signals:SoprEmaStrategy', stages)
+        self.assertIn('run_backtest:loop', stages)
+        self.assertTrue(all(row['peak_memory_mb'] is not None for row in report['results']))
+
+        slower = copy.deepcopy(report)
+        slower['results'][0]['seconds'] *= 2
+        table = compare_results(report, slower)
+        self.assertEqual(table['regression'].sum(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,82 @@
+# tests/test_chunked_backtest.py
+
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from benchmarks.synthetic_data import generate_market_data
+from src.data.market_store import MarketDataStore
+from src.indicators.indicator_store import IndicatorStore
+from src.indicators.indicators import atr
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.risk.risk_manager import RiskManager
+from src.strategies.sopr_ema_strategy import SoprEmaStrategy
+from src.strategies.asymmetrical_ema_strategy import AsymmetricalEmaStrategy
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+
+class TestChunkedBacktest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = generate_market_data(6000, seed=3)
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def run_both(self, strategy_class, chunk_rows, **kwargs):
+        """Runs the in-memory and the chunked backtest of the same configuration."""
+        def portfolio_manager():
+            return PortfolioManager(None, {'default': strategy_class(indicator_store=IndicatorStore())}, RiskManager(),
+                                    commission_pct=0.001, slippage_pct=0.0005, engine='vectorized', **kwargs)
+
+        full = portfolio_manager()
+        full.data = self.data.assign(atr=atr(self.data['high'], self.data['low'], self.data['close'], window=14))
+        in_memory = full.run_backtest()
+
+        chunked = portfolio_manager()
+        chunks = (self.data.iloc[k:k + chunk_rows] for k in range(0, len(self.data), chunk_rows))
+        return full, in_memory, chunked, chunked.run_chunked(chunks)
+
+    def assert_same_backtest(self, full, in_memory, chunked, results):
+        np.testing.assert_array_equal(chunked.trade_log['bar'], full.trade_log['bar'])
+        np.testing.assert_allclose(chunked.trade_log['price'], full.trade_log['price'], rtol=1e-12)
+        np.testing.assert_allclose(results.equity, in_memory.equity, rtol=1e-9)
+        self.assertTrue(results.index.equals(in_memory.index))
+
+    def test_matches_in_memory_run(self):
+        """
+        Tests that every strategy gives the same trades and equity when the data
+        arrives in chunks, including chunks shorter than the warm-up.
+        """
+        for strategy_class in (SoprEmaStrategy, AsymmetricalEmaStrategy, MovingAverageCrossoverStrategy):
+            for chunk_rows in (1000, 97):
+                with self.subTest(strategy=strategy_class.__name__, chunk_rows=chunk_rows):
+                    full, in_memory, chunked, results = self.run_both(strategy_class, chunk_rows)
+                    self.assertGreater(len(full.trades), 4)
+                    self.assert_same_backtest(full, in_memory, chunked, results)
+
+    def test_open_position_and_stops_carry_over(self):
+        """Tests that positions and trailing stops carry across chunk boundaries."""
+        full, in_memory, chunked, results = self.run_both(
+            AsymmetricalEmaStrategy, 250, stop_loss=True, trailing_stop_atr_multiplier=3.0
+        )
+        self.assertGreater(len(full.trades), 4)
+        self.assert_same_backtest(full, in_memory, chunked, results)
+
+    def test_store_chunks_with_join(self):
+        """Tests a chunked run streamed from the store, with SOPR joined from its own partition."""
+        store = MarketDataStore(os.path.join(self.temp_dir, 'store'))
+        store.write('BTC/USDT', '1m', self.data.drop(columns='sopr'))
+        store.write('bitcoin_sopr', '1m', self.data[['sopr']])
+
+        full, in_memory, _, _ = self.run_both(SoprEmaStrategy, 1000)
+        chunked = PortfolioManager(None, {'default': SoprEmaStrategy(indicator_store=IndicatorStore())}, RiskManager(),
+                                   commission_pct=0.001, slippage_pct=0.0005, engine='vectorized')
+        chunks = store.iter_chunks('BTC/USDT', '1m', chunk_rows=700, join=[('bitcoin_sopr', '1m', ['sopr'])])
+        results = chunked.run_chunked(chunks)
+        self.assert_same_backtest(full, in_memory, chunked, results)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -2,8 +2,41 @@
 
 import unittest
 import os
+import shutil
+import tempfile
 import pandas as pd
 from src.data.data_manager import DataManager
+from src.data.market_store import MarketDataStore
+
+
+class FakeExchange:
+    """
+    Stands in for ccxt.kraken(): serves daily candles from memory in pages and
+    can be told to fail after a number of pages to simulate an interrupted fetch.
+    """
+    DAY_MS = 24 * 60 * 60 * 1000
+
+    def __init__(self, n_candles, page_size=3, fail_after_pages=None):
+        start = pd.Timestamp('2025-01-01').value // 10**6
+        self.candles = [[start + i * self.DAY_MS, 100 + i, 101 + i, 99 + i, 100.5 + i, 10 + i] for i in range(n_candles)]
+        self.page_size = page_size
+        self.fail_after_pages = fail_after_pages
+        self.requests = []
+
+    def parse8601(self, iso_string):
+        return pd.Timestamp(iso_string).value // 10**6
+
+    def iso8601(self, ms):
+        return pd.Timestamp(ms, unit='ms').isoformat()
+
+    def fetch_ohlcv(self, symbol, timeframe, since, limit=1000):
+        if self.fail_after_pages is not None and len(self.requests) >= self.fail_after_pages:
+            raise ConnectionError("Simulated network failure")
+        self.requests.append(since)
+        # Like real exchanges, overlap the previous page by one candle
+        page = [c for c in self.candles if c[0] >= since - self.DAY_MS]
+        return page[:min(limit, self.page_size)]
+
 
 class TestDataManager(unittest.TestCase):
     def test_clean_and_validate_data(self):
@@ -39,6 +72,47 @@ class TestDataManager(unittest.TestCase):
         # The values on Jan 2nd should match the values from Jan 1st
         self.assertEqual(cleaned_df.loc['2025-01-02']['close'], 101)
 
+    def test_clean_infers_bar_interval(self):
+        """Tests that gaps are filled at the series' own frequency, not daily."""
+        index = pd.to_datetime(['2025-01-01 00:00', '2025-01-01 01:00', '2025-01-01 03:00', '2025-01-01 04:00'])
+        hourly_df = pd.DataFrame({'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5}, index=index)
+
+        cleaned_df = DataManager().clean_and_validate_data(hourly_df)
+        self.assertEqual(len(cleaned_df), 5)
+        self.assertIn(pd.Timestamp('2025-01-01 02:00'), cleaned_df.index)
+
+    def test_clean_sorts_descending_data(self):
+        """Tests that newest-first data is returned oldest-first, with its gaps filled."""
+        index = pd.to_datetime(['2025-01-04', '2025-01-03', '2025-01-01'])
+        descending_df = pd.DataFrame({'open': [4.0, 3.0, 1.0], 'high': 5.0, 'low': 0.5, 'close': [4.0, 3.0, 1.0]}, index=index)
+
+        cleaned_df = DataManager().clean_and_validate_data(descending_df)
+        self.assertEqual(list(cleaned_df.index), list(pd.date_range('2025-01-01', '2025-01-04', freq='D')))
+        self.assertEqual(list(cleaned_df['close']), [1.0, 1.0, 3.0, 4.0])
+
+    def test_clean_single_row(self):
+        """Tests that a single bar, which has no interval to infer, is returned as it is."""
+        single_df = pd.DataFrame({'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5}, index=pd.to_datetime(['2025-01-01']))
+
+        cleaned_df, report = DataManager().clean_and_validate_data(single_df, return_report=True)
+        pd.testing.assert_frame_equal(cleaned_df, single_df)
+        self.assertIsNone(report.interval)
+
+    def test_clean_keeps_out_of_order_bars(self):
+        """
+        Tests that a valid bar arriving late is sorted into place with its own prices,
+        while a repeated timestamp is dropped.
+        """
+        index = pd.to_datetime(['2025-01-01', '2025-01-02', '2025-01-04', '2025-01-03', '2025-01-05', '2025-01-05'])
+        late_df = pd.DataFrame({'open': 100.0, 'high': 110.0, 'low': 90.0,
+                                'close': [101.0, 102.0, 104.0, 103.0, 105.0, 99.0]}, index=index)
+
+        cleaned_df, report = DataManager().clean_and_validate_data(late_df, return_report=True)
+        self.assertEqual(report.counts['out_of_order_timestamps'], 1)
+        self.assertEqual(report.counts['duplicate_timestamps'], 1)
+        self.assertEqual(list(cleaned_df.index), list(pd.date_range('2025-01-01', '2025-01-05', freq='D')))
+        self.assertEqual(list(cleaned_df['close']), [101.0, 102.0, 103.0, 104.0, 105.0])
+
     def setUp(self):
         """
         This method is run before each test.
@@ -89,5 +163,50 @@ class TestDataManager(unittest.TestCase):
         self.assertEqual(list(loaded_df.columns), ['open', 'high', 'low', 'close'])
 
 
+class TestIncrementalFetch(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = MarketDataStore(os.path.join(self.temp_dir, 'store'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_interrupted_fetch_resumes_without_duplicates(self):
+        """
+        Tests that a fetch interrupted part-way keeps the completed pages and a
+        second run only downloads the rest, with no duplicated candles.
+        """
+        data_manager = DataManager()
+
+        # --- 1. The first fetch fails after two pages ---
+        with self.assertRaises(ConnectionError):
+            data_manager.fetch_and_save_data('BTC/USDT', '1d', '2025-01-01', data_dir=self.temp_dir,
+                                             exchange=FakeExchange(10, fail_after_pages=2))
+        self.assertEqual(len(self.store.read('BTC/USDT', '1d')), 5)
+
+        # --- 2. The rerun resumes after the last stored candle ---
+        exchange = FakeExchange(10)
+        data_manager.fetch_and_save_data('BTC/USDT', '1d', '2025-01-01', data_dir=self.temp_dir, exchange=exchange)
+        self.assertEqual(exchange.requests[0], pd.Timestamp('2025-01-05').value // 10**6 + 1)
+
+        # --- 3. The stored series is complete and unique ---
+        stored = self.store.read('BTC/USDT', '1d')
+        self.assertEqual(len(stored), 10)
+        self.assertTrue(stored.index.is_unique)
+        self.assertEqual(stored['close'].iloc[-1], 109.5)
+
+    def test_up_to_date_series_fetches_only_the_tail(self):
+        """Tests that a complete series triggers no new candles on refetch."""
+        data_manager = DataManager()
+        data_manager.fetch_and_save_data('BTC/USDT', '1d', '2025-01-01', data_dir=self.temp_dir, exchange=FakeExchange(6))
+
+        exchange = FakeExchange(6)
+        data_manager.fetch_and_save_data('BTC/USDT', '1d', '2025-01-01', data_dir=self.temp_dir, exchange=exchange)
+
+        self.assertEqual(len(exchange.requests), 1)
+        self.assertEqual(len(self.store.read('BTC/USDT', '1d')), 6)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
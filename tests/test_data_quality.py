@@ -0,0 +1,108 @@
+# tests/test_data_quality.py
+
+import unittest
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+
+from src.data.data_manager import DataManager
+from src.data.data_quality import validate_ohlcv, validate_chunks
+from src.data.market_store import MarketDataStore
+
+def make_hourly_bars(n_bars=500, seed=0):
+    """Creates clean random-walk hourly bars."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01', periods=n_bars, freq='h', name='timestamp').as_unit('ns')
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n_bars))
+    return pd.DataFrame({
+        'open': close - 0.1,
+        'high': close + 1,
+        'low': close - 1,
+        'close': close,
+        'volume': rng.uniform(1, 10, n_bars),
+    }, index=index)
+
+class TestDataQuality(unittest.TestCase):
+
+    def setUp(self):
+        """Hourly bars with one problem of every kind."""
+        df = make_hourly_bars()
+        df.iloc[10, df.columns.get_loc('low')] = df['high'].iloc[10] + 1   # low above high
+        df.iloc[20, df.columns.get_loc('close')] = -5.0                    # non-positive price
+        df.iloc[30, df.columns.get_loc('volume')] = 10000.0                # volume spike
+        df.iloc[40, df.columns.get_loc('volume')] = 0.0                    # no trading
+        df.iloc[50, df.columns.get_loc('open')] = np.nan                   # missing value
+        df = df.drop(df.index[100:103])                                    # a 3-bar gap
+        # A duplicated bar and a late bar arriving out of order
+        self.df = pd.concat([df.iloc[:200], df.iloc[[199]], df.iloc[[150]], df.iloc[200:]])
+
+    def test_report_counts(self):
+        """Tests that every kind of issue is counted."""
+        report, invalid = validate_ohlcv(self.df)
+        self.assertEqual(report.interval, pd.Timedelta('1h'))
+        self.assertEqual(report.rows, len(self.df))
+        expected = {'ohlc_inconsistent': 2, 'non_positive_price': 1, 'volume_spikes': 1, 'zero_volume': 1,
+                    'missing_values': 1, 'gaps': 1, 'missing_bars': 3, 'duplicate_timestamps': 1,
+                    'out_of_order_timestamps': 1, 'negative_volume': 0}
+        self.assertEqual(report.counts, expected)
+        self.assertEqual(report.largest_gap, pd.Timedelta('4h'))
+        self.assertEqual(int(invalid.sum()), 4)
+        self.assertFalse(report.is_clean)
+
+    def test_chunked_matches_whole(self):
+        """Tests that validating chunk by chunk gives the same report as one pass."""
+        whole, _ = validate_ohlcv(self.df, volume_spike_factor=1e9)
+        chunks = [self.df.iloc[k:k + 64] for k in range(0, len(self.df), 64)]
+        chunked = validate_chunks(chunks, interval='1h', volume_spike_factor=1e9)
+        self.assertEqual(chunked.to_dict(), whole.to_dict())
+
+    def test_chunk_boundary_repeats(self):
+        """
+        Tests that bars repeating or preceding a timestamp of an earlier chunk are
+        counted as in one pass and flagged invalid, past the chunk's first row too.
+        """
+        df = make_hourly_bars(200)
+        late = df.iloc[[50]].set_axis(df.index[[50]] + pd.Timedelta('30min'))
+        df = pd.concat([df.iloc[:100], late, df.iloc[[99]], df.iloc[100:]])
+        whole, _ = validate_ohlcv(df)
+
+        report, first = validate_ohlcv(df.iloc[:100], interval='1h')
+        report, second = validate_ohlcv(df.iloc[100:], report=report)
+        self.assertEqual(report.to_dict(), whole.to_dict())
+        self.assertEqual((report.counts['out_of_order_timestamps'], report.counts['duplicate_timestamps']), (1, 1))
+        self.assertFalse(first.any())
+        self.assertEqual(list(np.flatnonzero(second)), [0, 1])
+
+    def test_store_chunks(self):
+        """Tests chunked validation of a store partition."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            store = MarketDataStore(temp_dir)
+            store.write('BTC/USDT', '1h', make_hourly_bars().drop(pd.Timestamp('2024-01-03 05:00')))
+            report = validate_chunks(store.iter_chunks('BTC/USDT', '1h', chunk_rows=100))
+            self.assertEqual((report.rows, report.counts['gaps'], report.counts['missing_bars']), (499, 1, 1))
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_clean_matches_reference(self):
+        """
+        Tests that cleaning produces what dropping bad rows, reindexing,
+        forward-filling and dropping NaNs produces, on the series' own frequency.
+        """
+        df = make_hourly_bars()
+        df.iloc[0, df.columns.get_loc('volume')] = np.nan
+        df.iloc[60, df.columns.get_loc('close')] = np.nan
+        df.iloc[70, df.columns.get_loc('low')] = df['high'].iloc[70] + 1
+        df = df.drop(df.index[200:210])
+
+        cleaned, report = DataManager().clean_and_validate_data(df, return_report=True)
+
+        reference = df.drop(df.index[df['low'] > df['high']])
+        reference = reference.reindex(pd.date_range(reference.index[0], reference.index[-1], freq='h', name='timestamp'))
+        reference = reference.ffill().dropna()
+        pd.testing.assert_frame_equal(cleaned, reference, check_freq=False)
+        self.assertEqual(report.counts['missing_bars'], 10)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
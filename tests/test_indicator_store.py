@@ -0,0 +1,77 @@
+# tests/test_indicator_store.py
+
+import unittest
+import pandas as pd
+import numpy as np
+
+from src.indicators.indicator_store import IndicatorStore
+from src.strategies.sopr_ema_strategy import SoprEmaStrategy
+
+class TestIndicatorStore(unittest.TestCase):
+
+    def setUp(self):
+        """Create a sample close series."""
+        rng = np.random.default_rng(3)
+        self.close = pd.Series(100 + np.cumsum(rng.normal(0, 1, 300)),
+                               index=pd.date_range('2021-01-01', periods=300, freq='D'))
+
+    def test_indicator_is_computed_once(self):
+        """
+        Tests that repeated requests for the same indicator are served from the
+        cache and match a direct computation.
+        """
+        store = IndicatorStore()
+        first = store.get('ema', self.close, span=55)
+        second = store.get('ema', self.close.copy(), span=55)
+
+        self.assertEqual(store.misses, 1)
+        self.assertEqual(store.hits, 1)
+        pd.testing.assert_series_equal(second, self.close.ewm(span=55, adjust=False).mean())
+        pd.testing.assert_series_equal(first, second)
+
+        # A different parameter is a different entry
+        store.get('ema', self.close, span=21)
+        self.assertEqual(store.misses, 2)
+
+    def test_cached_values_follow_the_callers_index(self):
+        """Tests that identical data under another index reuses the entry with that index."""
+        store = IndicatorStore()
+        store.get('sma', self.close, window=10)
+        shifted = pd.Series(self.close.to_numpy(), index=range(300))
+        result = store.get('sma', shifted, window=10)
+
+        self.assertEqual(store.hits, 1)
+        self.assertTrue(result.index.equals(shifted.index))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Tests that the memory cap evicts the least recently used indicator first."""
+        entry_bytes = self.close.to_numpy().nbytes
+        store = IndicatorStore(max_bytes=2 * entry_bytes)
+
+        store.get('sma', self.close, window=5)
+        store.get('sma', self.close, window=10)
+        store.get('sma', self.close, window=5)   # refresh window=5
+        store.get('sma', self.close, window=20)  # evicts window=10
+
+        self.assertEqual(len(store), 2)
+        self.assertLessEqual(store.nbytes, store.max_bytes)
+        store.get('sma', self.close, window=5)
+        self.assertEqual(store.misses, 3)
+        store.get('sma', self.close, window=10)
+        self.assertEqual(store.misses, 4)
+
+    def test_strategies_share_the_store(self):
+        """Tests that a second strategy run over the same data recomputes nothing."""
+        store = IndicatorStore()
+        data = pd.DataFrame({'close': self.close, 'sopr': np.full(300, 0.99)})
+
+        SoprEmaStrategy(indicator_store=store).generate_signals(data.copy())
+        misses = store.misses
+        SoprEmaStrategy(short_ema=13, indicator_store=store).generate_signals(data.copy())
+
+        # Only the new short EMA had to be computed
+        self.assertEqual(store.misses, misses + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,39 @@
+# tests/test_indicators.py
+
+import unittest
+import pandas as pd
+import numpy as np
+
+from src.indicators.indicators import rolling_slope
+
+class TestRollingSlope(unittest.TestCase):
+
+    def setUp(self):
+        """Create a trending random walk with a gap of missing values."""
+        rng = np.random.default_rng(11)
+        self.series = pd.Series(30000 + np.cumsum(rng.normal(0, 300, 3000)),
+                                index=pd.date_range('2018-01-01', periods=3000, freq='D'))
+        self.series.iloc[500:503] = np.nan
+
+    def test_matches_rolling_polyfit(self):
+        """
+        Tests that the closed-form slope matches a rolling np.polyfit, including
+        where the windows contain missing values.
+        """
+        for window in (2, 30, 200):
+            expected = self.series.rolling(window=window).apply(
+                lambda x: np.polyfit(range(window), x, 1)[0], raw=False)
+            # A small block size exercises the re-anchoring of the running sum
+            actual = rolling_slope(self.series, window, block_size=64)
+
+            pd.testing.assert_series_equal(actual.isna(), expected.isna())
+            np.testing.assert_allclose(actual.dropna(), expected.dropna(), rtol=1e-8, atol=1e-6)
+
+    def test_rejects_single_point_window(self):
+        """Tests that a one-point window, which has no slope, is rejected."""
+        with self.assertRaises(ValueError):
+            rolling_slope(self.series, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,155 @@
+# tests/test_job_runner.py
+
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import pandas as pd
+import numpy as np
+
+from src.analytics.performance_metrics import compute_metrics
+from src.data.market_store import MarketDataStore
+from src.jobs.job_runner import JobRunner, load_job_file, load_dataset
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.risk.risk_manager import RiskManager
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+from tests.helpers import make_ohlc_data, add_sopr
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestJobRunner(unittest.TestCase):
+
+    def setUp(self):
+        """Write a price CSV, a SOPR CSV, a config file and a job file to a temporary directory."""
+        self.root = tempfile.mkdtemp()
+        prices = make_ohlc_data(500, seed=23, volume=10.0).drop(columns='atr').rename_axis('timestamp')
+        sopr = add_sopr(prices[[]]).rename(columns={'sopr': 'sopr_value'}).rename_axis('date')
+        prices.to_csv(os.path.join(self.root, 'prices.csv'))
+        sopr.iloc[10:].to_csv(os.path.join(self.root, 'sopr.csv'))
+
+        self.config = os.path.join(self.root, 'config.ini')
+        with open(self.config, 'w') as f:
+            f.write(f"[Risk]\nrisk_percentage = 0.01\nstop_loss_atr_multiplier = 3.0\n\n"
+                    f"[Cache]\ndirectory = {os.path.join(self.root, 'cache')}\nmax_mb = 64\n")
+
+        self.job = {
+            'config': self.config,
+            'datasets': {
+                'daily': {
+                    'path': os.path.join(self.root, 'prices.csv'),
+                    'join': [{'path': os.path.join(self.root, 'sopr.csv'), 'index_col': 'date',
+                              'rename': {'sopr_value': 'sopr'}, 'columns': ['sopr']}],
+                },
+            },
+            'cost_models': {
+                'default': {'commission_pct': 0.001, 'slippage_pct': 0.0005},
+                'free': {},
+            },
+            'backtests': [
+                {'name': 'ma_grid', 'dataset': 'daily', 'strategy': 'ma_crossover',
+                 'params': {'short_window': [3, 5], 'long_window': 20, 'risk_percentage': [0.01, 0.02]}},
+                {'name': 'sopr', 'dataset': 'daily', 'strategy': 'sopr_ema', 'cost_model': 'free',
+                 'params': {'regime_ma': 50}, 'risk': {'sizing_model': 'volatility_target'}, 'outputs': []},
+            ],
+        }
+        self.job_path = os.path.join(self.root, 'job.json')
+        with open(self.job_path, 'w') as f:
+            json.dump(self.job, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_runs_write_structured_outputs(self):
+        """
+        Tests that every parameter set becomes a run with its own directory and
+        summary row, and that the results match a backtest set up by hand.
+        """
+        output_dir = os.path.join(self.root, 'out')
+        summary = JobRunner(self.job_path, output_dir=output_dir, max_workers=1).run()
+
+        self.assertEqual(len(summary), 5)
+        self.assertEqual(list(summary['backtest']), ['ma_grid'] * 4 + ['sopr'])
+        for name in ('job.json', 'summary.csv', os.path.join('ma_grid', 'summary.csv'),
+                     os.path.join('ma_grid', 'run_0000', 'run.json'), os.path.join('ma_grid', 'run_0000', 'equity.csv'),
+                     os.path.join('ma_grid', 'run_0000', 'trades.csv'), os.path.join('sopr', 'run_0000', 'run.json')):
+            self.assertTrue(os.path.exists(os.path.join(output_dir, name)), name)
+        self.assertFalse(os.path.exists(os.path.join(output_dir, 'sopr', 'run_0000', 'equity.csv')))
+        self.assertNotIn('short_window', pd.read_csv(os.path.join(output_dir, 'sopr', 'summary.csv')).columns)
+
+        # The config's stop distance applies, the run's risk_percentage overrides the config's
+        data = load_dataset(self.job['datasets']['daily'])
+        self.assertEqual(len(data), 490 - 13)
+        expected = PortfolioManager(
+            data, {'default': MovingAverageCrossoverStrategy(short_window=5, long_window=20)},
+            RiskManager(stop_loss_atr_multiplier=3.0), commission_pct=0.001, slippage_pct=0.0005,
+            engine='vectorized', risk_percentage=0.02
+        ).run_backtest()
+        row = summary[(summary['short_window'] == 5) & (summary['risk_percentage'] == 0.02)].iloc[0]
+        self.assertAlmostEqual(row['final_equity'], expected.final_equity)
+        self.assertAlmostEqual(row['sharpe_ratio'], compute_metrics(expected)['sharpe_ratio'])
+        equity = pd.read_csv(os.path.join(output_dir, 'ma_grid', row['run_id'], 'equity.csv'), index_col=0)
+        np.testing.assert_allclose(equity['equity'].to_numpy(), expected.equity)
+
+    def test_worker_pool_matches_serial_run(self):
+        """Tests that spreading the runs over processes, and rerunning from the cache, changes nothing."""
+        serial = JobRunner(self.job_path, output_dir=os.path.join(self.root, 'serial'), max_workers=1, use_cache=False).run()
+        parallel = JobRunner(self.job_path, output_dir=os.path.join(self.root, 'parallel'), max_workers=2).run()
+        cached = JobRunner(self.job_path, output_dir=os.path.join(self.root, 'cached'), max_workers=1).run()
+
+        pd.testing.assert_frame_equal(serial, parallel)
+        pd.testing.assert_frame_equal(serial, cached)
+        self.assertTrue(os.listdir(os.path.join(self.root, 'cache')))
+
+    def test_chunked_dataset_matches_in_memory_run(self):
+        """
+        Tests that a store dataset with chunk_rows is streamed through run_chunked
+        with the job's costs, trading as the in-memory run of the same dataset.
+        """
+        store = MarketDataStore(os.path.join(self.root, 'store'))
+        store.write('BTC/USDT', '1d', make_ohlc_data(500, seed=23, volume=10.0))
+        store.write('sopr', '1d', add_sopr(make_ohlc_data(500, seed=23)[[]]).iloc[10:])
+        dataset = {'path': store.partition_path('BTC/USDT', '1d'),
+                   'join': [{'path': store.partition_path('sopr', '1d'), 'columns': ['sopr']}]}
+        job = dict(self.job, datasets={'daily': dataset}, backtests=self.job['backtests'][:1])
+
+        in_memory = JobRunner(job, output_dir=os.path.join(self.root, 'memory'), max_workers=1, use_cache=False).run()
+        chunked_job = dict(job, datasets={'daily': dict(dataset, chunk_rows=120)})
+        chunked = JobRunner(chunked_job, output_dir=os.path.join(self.root, 'chunked'), max_workers=2).run()
+        overridden = JobRunner(job, output_dir=os.path.join(self.root, 'override'), max_workers=1, chunk_rows=120).run()
+
+        self.assertTrue(in_memory['trade_count'].gt(0).all())
+        pd.testing.assert_series_equal(chunked['trade_count'], in_memory['trade_count'])
+        np.testing.assert_allclose(chunked['final_equity'], in_memory['final_equity'])
+        pd.testing.assert_frame_equal(overridden, chunked)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'cache')))
+
+    def test_invalid_job_files_are_rejected(self):
+        """Tests that unknown datasets, strategies, cost models and outputs are reported."""
+        self.job['datasets']['chunked'] = dict(self.job['datasets']['daily'], chunk_rows=100)
+        for change in ({'dataset': 'hourly'}, {'strategy': 'unknown'}, {'cost_model': 'cheap'}, {'outputs': ['chart']},
+                       {'dataset': 'chunked', 'outputs': ['plot']}):
+            job = dict(self.job, backtests=[dict(self.job['backtests'][0], **change)])
+            with open(self.job_path, 'w') as f:
+                json.dump(job, f)
+            with self.subTest(change=change), self.assertRaises(ValueError):
+                load_job_file(self.job_path)
+
+    def test_headless_startup_does_not_import_matplotlib(self):
+        """Tests that the CLI only loads matplotlib when a run is plotted."""
+        check = "import sys, main; sys.exit('matplotlib' in sys.modules)"
+        self.assertEqual(subprocess.run([sys.executable, '-c', check], cwd=ROOT).returncode, 0)
+
+    @unittest.skipUnless(importlib.util.find_spec('matplotlib'), "matplotlib is not installed")
+    def test_plot_output(self):
+        """Tests that plots are written for the runs that request them."""
+        output_dir = os.path.join(self.root, 'out')
+        JobRunner(self.job_path, output_dir=output_dir, max_workers=1, plot=True).run()
+        self.assertTrue(os.path.exists(os.path.join(output_dir, 'sopr', 'run_0000', 'plot.png')))
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+# tests/test_market_store.py
+
+import unittest
+import os
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+
+from src.data.market_store import MarketDataStore
+from src.data.data_manager import DataManager
+
+class TestMarketDataStore(unittest.TestCase):
+
+    def setUp(self):
+        """Create a temporary store root and ten days of sample OHLCV data."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = MarketDataStore(os.path.join(self.temp_dir, 'store'))
+        index = pd.date_range('2025-01-01', periods=10, freq='D', name='timestamp').as_unit('ns')
+        self.df = pd.DataFrame({
+            'open': np.arange(10, dtype=float),
+            'high': np.arange(10, dtype=float) + 1,
+            'low': np.arange(10, dtype=float) - 1,
+            'close': np.arange(10, dtype=float) + 0.5,
+            'volume': np.arange(10, dtype=np.int64),
+        }, index=index)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_round_trip(self):
+        """Tests that a written partition reads back unchanged."""
+        self.store.write('BTC/USDT', '1d', self.df)
+        pd.testing.assert_frame_equal(self.store.read('BTC/USDT', '1d'), self.df, check_freq=False)
+
+    def test_date_range_and_column_selection(self):
+        """Tests that only the requested window and columns are returned."""
+        self.store.write('BTC/USDT', '1d', self.df)
+        window = self.store.read('BTC/USDT', '1d', start='2025-01-03', end='2025-01-05', columns=['close'])
+
+        self.assertEqual(list(window.columns), ['close'])
+        self.assertEqual(list(window.index.day), [3, 4, 5])
+
+    def test_append_skips_overlapping_rows(self):
+        """Tests that appending overlapping data only adds the new rows."""
+        self.store.write('BTC/USDT', '1d', self.df.iloc[:6])
+        appended = self.store.append('BTC/USDT', '1d', self.df.iloc[4:])
+
+        self.assertEqual(appended, 4)
+        pd.testing.assert_frame_equal(self.store.read('BTC/USDT', '1d'), self.df, check_freq=False)
+        self.assertEqual(self.store.last_timestamp('BTC/USDT', '1d'), pd.Timestamp('2025-01-10'))
+
+    def test_csv_migration_and_load_data(self):
+        """
+        Tests that a migrated CSV can be loaded through DataManager.load_data,
+        with the date range pushed down to the store.
+        """
+        csv_path = os.path.join(self.temp_dir, 'BTC_USDT_1d.csv')
+        self.df.to_csv(csv_path)
+
+        data_manager = DataManager()
+        partition = data_manager.migrate_csv_to_store(csv_path, 'BTC/USDT', '1d', data_dir=self.temp_dir)
+        loaded = data_manager.load_data(partition, start='2025-01-08')
+
+        self.assertEqual(len(loaded), 3)
+        self.assertEqual(loaded.index.name, 'timestamp')
+        pd.testing.assert_frame_equal(loaded, self.df.iloc[7:], check_freq=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,57 @@
+# tests/test_monte_carlo.py
+
+import unittest
+import numpy as np
+
+from src.analytics.monte_carlo import MonteCarloAnalyzer
+from src.portfolio.trade_log import TRADE_DTYPE, BUY, SELL
+
+class TestMonteCarloAnalyzer(unittest.TestCase):
+
+    def setUp(self):
+        """Two closed trades: +10% and -5% of the equity at entry."""
+        self.equity = np.array([100.0, 100.0, 110.0, 110.0, 104.5])
+        self.trade_log = np.array([
+            (1, BUY, 10.0, 10.0, 0.0),
+            (2, SELL, 11.0, 10.0, 0.0),
+            (3, BUY, 11.0, 10.0, 0.0),
+            (4, SELL, 10.45, 10.0, 0.0),
+        ], dtype=TRADE_DTYPE)
+
+    def test_trade_returns(self):
+        """Tests that trade P&L is expressed relative to the equity before entry."""
+        returns = MonteCarloAnalyzer.trade_returns(self.equity, self.trade_log)
+        np.testing.assert_allclose(returns, [0.10, -0.05])
+
+    def test_bootstrap_trades(self):
+        """Tests that every path compounds to one of the three possible outcomes."""
+        analyzer = MonteCarloAnalyzer(n_paths=5000, seed=1, batch_size=700)
+        simulation = analyzer.bootstrap_trades(self.equity, self.trade_log)
+        self.assertEqual(len(simulation['final_return']), 5000)
+
+        outcomes = np.round(simulation['final_return'], 6)
+        np.testing.assert_array_equal(np.unique(outcomes), np.round([0.95 ** 2 - 1, 1.1 * 0.95 - 1, 1.1 ** 2 - 1], 6))
+        self.assertTrue((simulation['max_drawdown'] >= 0).all())
+
+        summary = analyzer.summarize(simulation)
+        self.assertAlmostEqual(summary.loc['final_return', 'p50'], 1.1 * 0.95 - 1)
+        self.assertAlmostEqual(summary.loc['final_return', 'probability_of_loss'], 0.25, delta=0.03)
+
+    def test_block_bootstrap(self):
+        """Tests that a block spanning the whole curve reproduces the backtest exactly."""
+        equity = 100 * np.cumprod(1 + np.random.default_rng(0).normal(0, 0.01, 250))
+        whole = MonteCarloAnalyzer(n_paths=50, seed=2).block_bootstrap(equity, block_size=len(equity))
+        np.testing.assert_allclose(whole['final_return'], equity[-1] / equity[0] - 1)
+
+        simulation = MonteCarloAnalyzer(n_paths=1000, seed=2).block_bootstrap(equity, block_size=20)
+        self.assertEqual(len(simulation['max_drawdown']), 1000)
+        self.assertEqual(len(np.unique(simulation['final_return'])), 1000)
+
+    def test_seed_is_reproducible(self):
+        """Tests that the same seed gives the same paths."""
+        first = MonteCarloAnalyzer(n_paths=100, seed=3).bootstrap_trades(self.equity, self.trade_log)
+        second = MonteCarloAnalyzer(n_paths=100, seed=3).bootstrap_trades(self.equity, self.trade_log)
+        np.testing.assert_array_equal(first['final_return'], second['final_return'])
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
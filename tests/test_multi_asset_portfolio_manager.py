@@ -0,0 +1,96 @@
+# tests/test_multi_asset_portfolio_manager.py
+
+import unittest
+import pandas as pd
+import numpy as np
+
+from src.analytics.performance_metrics import compute_metrics, round_trips
+from src.risk.risk_manager import RiskManager
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.portfolio.multi_asset_portfolio_manager import MultiAssetPortfolioManager
+from src.portfolio.trade_log import TRADE_DTYPE, SELL
+from src.strategies.precomputed_signal_strategy import PrecomputedSignalStrategy
+from tests.helpers import make_ohlc_data
+
+def make_market(seed, n_bars=300):
+    """Creates a random-walk OHLC+ATR frame."""
+    return make_ohlc_data(n_bars, seed, start='2022-01-01', atr=None)
+
+class TestMultiAssetPortfolioManager(unittest.TestCase):
+
+    def test_single_symbol_matches_portfolio_manager(self):
+        """
+        Tests that a one-symbol panel reproduces the single-instrument backtest exactly.
+        """
+        data = make_market(1)
+        strategy = MovingAverageCrossoverStrategy(short_window=3, long_window=8)
+        kwargs = dict(risk_manager=RiskManager(), commission_pct=0.001, slippage_pct=0.0005)
+
+        single = PortfolioManager(data=data, strategies={'default': strategy}, **kwargs).run_backtest()
+        multi = MultiAssetPortfolioManager(data={'BTC/USDT': data}, strategy=strategy, **kwargs).run_backtest()
+
+        np.testing.assert_array_equal(multi.equity, single.equity)
+        for field in TRADE_DTYPE.names:
+            np.testing.assert_array_equal(multi.trades[field], single.trades[field])
+        self.assertTrue((multi.trades['symbol'] == 'BTC/USDT').all())
+        self.assertEqual(compute_metrics(multi), compute_metrics(single))
+
+    def test_shared_cash_across_symbols(self):
+        """
+        Tests that several symbols trade from one cash pool, cash never goes
+        negative, and equity is cash plus every position marked to market.
+        """
+        panel = {'BTC/USDT': make_market(1), 'ETH/USDT': make_market(2), 'SOL/USDT': make_market(3).iloc[5:]}
+        portfolio_manager = MultiAssetPortfolioManager(
+            data=panel,
+            strategy=MovingAverageCrossoverStrategy(short_window=3, long_window=8),
+            risk_manager=RiskManager(),
+            commission_pct=0.001,
+            risk_percentage=0.005
+        )
+        results = portfolio_manager.run_backtest()
+
+        # Aligned on the common timestamps
+        self.assertEqual(len(results.equity), 295)
+        self.assertTrue((portfolio_manager.cash >= 0).all())
+        self.assertEqual(set(results.trades['symbol']), set(panel))
+        self.assertTrue(results.trade_index.equals(portfolio_manager.index[results.trades['bar']]))
+
+        closes = pd.DataFrame({symbol: portfolio_manager.data[symbol]['close'] for symbol in panel})
+        marked = portfolio_manager.cash + (portfolio_manager.positions * closes).sum(axis=1)
+        np.testing.assert_allclose(results.equity, marked.to_numpy())
+
+        # Round trips pair each symbol's own buys and sells
+        trips = round_trips(results.trades)
+        self.assertEqual(len(trips['pnl']), int((results.trades['side'] == SELL).sum()))
+        per_symbol = sum(round_trips(results.trades[results.trades['symbol'] == symbol])['pnl'].sum() for symbol in panel)
+        self.assertAlmostEqual(trips['pnl'].sum(), per_symbol)
+        self.assertTrue((np.diff(trips['entry_bar'][:len(trips['pnl'])]) >= 0).all())
+        self.assertEqual(compute_metrics(results)['trade_count'], len(trips['pnl']))
+
+        # More than one position was open at the same time
+        self.assertGreater(((portfolio_manager.positions > 0).sum(axis=1) > 1).sum(), 0)
+
+    def test_skipped_entry_leaves_cash_for_later_entries(self):
+        """
+        Tests that an entry the cash can't pay for does not block a cheaper entry
+        later in the panel on the same bar.
+        """
+        expensive = make_market(1).assign(atr=0.1)   # a tight stop makes a huge position
+        cheap = make_market(2)
+        signals = pd.Series(0.0, index=expensive.index)
+        signals.iloc[10] = 1.0
+        portfolio_manager = MultiAssetPortfolioManager(
+            data={'AAA': expensive, 'BBB': cheap},
+            strategy={'AAA': PrecomputedSignalStrategy(signals), 'BBB': PrecomputedSignalStrategy(signals)},
+            risk_manager=RiskManager(),
+        )
+        results = portfolio_manager.run_backtest()
+
+        self.assertEqual(list(results.trades['symbol']), ['BBB'])
+        self.assertEqual(list(results.trades['bar']), [11])
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -0,0 +1,116 @@
+# tests/test_parameter_sweep.py
+
+import unittest
+import pandas as pd
+
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+from src.strategies.sopr_ema_strategy import SoprEmaStrategy
+from src.optimization.parameter_sweep import ParameterSweep, SharedMarketData, attach_shared_data
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.risk.risk_manager import RiskManager
+from tests.helpers import make_ohlc_data, add_sopr
+
+class TestParameterSweep(unittest.TestCase):
+
+    def setUp(self):
+        """Create a random walk with enough crossovers to trade."""
+        self.data = make_ohlc_data(400, seed=7)
+
+        self.param_ranges = {
+            'short_window': [3, 5],
+            'long_window': [10, 20],
+            'risk_percentage': [0.01, 0.02],
+        }
+
+    def test_parallel_sweep_matches_serial_sweep(self):
+        """
+        Tests that fanning the grid out over worker processes gives the same
+        ranked table as running it in-process.
+        """
+        serial = ParameterSweep(self.data, MovingAverageCrossoverStrategy, self.param_ranges, max_workers=1).run()
+        parallel = ParameterSweep(self.data, MovingAverageCrossoverStrategy, self.param_ranges, max_workers=2).run()
+
+        self.assertEqual(len(serial), 8)
+        self.assertEqual(list(serial.columns), ['short_window', 'long_window', 'risk_percentage',
+                                                'total_return_pct', 'max_drawdown_pct', 'trade_count'])
+        pd.testing.assert_frame_equal(serial, parallel)
+        # Ranked best first
+        self.assertTrue(serial['total_return_pct'].is_monotonic_decreasing)
+
+    def test_batched_sweep_matches_per_config_sweep(self):
+        """
+        Tests that the batched sweep, one signal matrix and batched backtest per
+        risk setting, gives every configuration the same results as its own run.
+        """
+        data = add_sopr(self.data, seed=3)
+        param_ranges = {
+            'short_ema': [5, 8],
+            'long_ema': [13, 21],
+            'regime_ma': [20, 50],
+            'risk_percentage': [0.01, 0.02],
+        }
+        keys = list(param_ranges)
+        per_config = ParameterSweep(data, SoprEmaStrategy, param_ranges, max_workers=1).run()
+        batched = ParameterSweep(data, SoprEmaStrategy, param_ranges, batched=True, keep_results=True).run()
+
+        self.assertEqual(len(batched), 16)
+        self.assertGreater(batched['trade_count'].sum(), 0)
+        pd.testing.assert_frame_equal(
+            batched.drop(columns='result').sort_values(keys).reset_index(drop=True),
+            per_config.sort_values(keys).reset_index(drop=True),
+        )
+        self.assertTrue(batched['total_return_pct'].is_monotonic_decreasing)
+        self.assertEqual(len(batched.loc[0, 'result'].equity), len(data))
+
+        with self.assertRaises(ValueError):
+            ParameterSweep(data, MovingAverageCrossoverStrategy, param_ranges, batched=True)
+
+    def test_risk_manager_settings_apply_to_every_run(self):
+        """
+        Tests that the sweep's risk manager sizes every run, with the swept risk
+        parameters overriding its settings, per config and batched.
+        """
+        risk_manager = RiskManager(stop_loss_atr_multiplier=4.0)
+        param_ranges = {'short_ema': [5, 8], 'long_ema': [21], 'regime_ma': [50], 'risk_percentage': [0.01, 0.03]}
+        data = add_sopr(self.data, seed=8)
+        per_config = ParameterSweep(data, SoprEmaStrategy, param_ranges, max_workers=1, risk_manager=risk_manager).run()
+        batched = ParameterSweep(data, SoprEmaStrategy, param_ranges, batched=True, risk_manager=risk_manager).run()
+        default = ParameterSweep(data, SoprEmaStrategy, param_ranges, max_workers=1).run()
+
+        for row in per_config.to_dict('records'):
+            expected = PortfolioManager(
+                data, {'default': SoprEmaStrategy(short_ema=row['short_ema'], long_ema=21, regime_ma=50)},
+                risk_manager, engine='vectorized', risk_percentage=row['risk_percentage']
+            ).run_backtest()
+            self.assertAlmostEqual(row['total_return_pct'], (expected.final_equity / 100000.0 - 1) * 100)
+        keys = list(param_ranges)
+        pd.testing.assert_frame_equal(batched.sort_values(keys).reset_index(drop=True),
+                                      per_config.sort_values(keys).reset_index(drop=True))
+        self.assertTrue(per_config['trade_count'].gt(0).all())
+        self.assertFalse(per_config.sort_values(keys)['total_return_pct'].reset_index(drop=True).equals(
+            default.sort_values(keys)['total_return_pct'].reset_index(drop=True)))
+
+    def test_random_search_draws_from_ranges(self):
+        """Tests that random search samples the requested number of configurations."""
+        sweep = ParameterSweep(self.data, MovingAverageCrossoverStrategy, self.param_ranges, max_workers=1)
+        results = sweep.run(search='random', n_samples=5, seed=1)
+
+        self.assertEqual(len(results), 5)
+        self.assertTrue(results['short_window'].isin([3, 5]).all())
+
+    def test_shared_data_is_read_only(self):
+        """Tests that workers see the same data and cannot write to it."""
+        shared = SharedMarketData(self.data)
+        try:
+            view, shm = attach_shared_data(shared.spec)
+            pd.testing.assert_frame_equal(view, self.data)
+            with self.assertRaises(ValueError):
+                view.to_numpy()[0, 0] = 0.0
+            del view
+            shm.close()
+        finally:
+            shared.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
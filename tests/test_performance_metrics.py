@@ -0,0 +1,77 @@
+# tests/test_performance_metrics.py
+
+import unittest
+import numpy as np
+
+from src.analytics.performance_metrics import compute_metrics, max_drawdown, max_drawdown_duration, round_trips
+from src.portfolio.trade_log import TRADE_DTYPE, BUY, SELL
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.risk.risk_manager import RiskManager
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+from tests.helpers import make_ohlc_data
+
+class TestPerformanceMetrics(unittest.TestCase):
+
+    def setUp(self):
+        """A small equity curve with two 10% drawdowns and a hand-made trade log."""
+        self.equity = np.array([100.0, 110.0, 99.0, 120.0, 108.0])
+        self.trade_log = np.array([
+            (1, BUY, 10.0, 5.0, 0.5),
+            (3, SELL, 12.0, 5.0, 0.6),
+            (4, BUY, 11.0, 2.0, 0.2),
+        ], dtype=TRADE_DTYPE)
+
+    def test_drawdown_metrics(self):
+        """Tests the drawdown depth and duration against hand-computed values."""
+        self.assertAlmostEqual(max_drawdown(self.equity), 0.1)
+        self.assertEqual(max_drawdown_duration(self.equity), 1)
+
+    def test_trade_metrics(self):
+        """Tests per-trade P&L, win rate and exposure from the structured trade log."""
+        trips = round_trips(self.trade_log, final_bar=4)
+        np.testing.assert_allclose(trips['pnl'], [60.0 - 0.6 - 50.5])
+
+        metrics = compute_metrics(self.equity, trade_log=self.trade_log)
+        self.assertEqual(metrics['trade_count'], 1)
+        self.assertEqual(metrics['win_rate'], 1.0)
+        # Held from bar 1 to 3, then from bar 4 to the end
+        self.assertAlmostEqual(metrics['exposure'], 2 / 5)
+        self.assertAlmostEqual(metrics['turnover'], (50 + 60 + 22) / self.equity.mean())
+
+    def test_many_curves_at_once(self):
+        """Tests that a (bars x runs) array gives the same metrics as scoring each run."""
+        rng = np.random.default_rng(0)
+        curves = 100 * np.cumprod(1 + rng.normal(0.001, 0.02, (500, 20)), axis=0)
+
+        table = compute_metrics(curves)
+        self.assertEqual(len(table), 20)
+        for run in (0, 7, 19):
+            single = compute_metrics(curves[:, run])
+            for name, value in single.items():
+                self.assertAlmostEqual(table[name].iloc[run], value, places=10)
+
+    def test_trade_log_from_backtest(self):
+        """Tests that the backtest's trade log P&L accounts for the whole equity change."""
+        data = make_ohlc_data(300, seed=2, freq=None, open_noise=0)
+
+        portfolio_manager = PortfolioManager(
+            data=data,
+            strategies={'default': MovingAverageCrossoverStrategy(short_window=3, long_window=8)},
+            risk_manager=RiskManager(),
+            commission_pct=0.001,
+            engine='vectorized'
+        )
+        results = portfolio_manager.run_backtest()
+        trade_log = portfolio_manager.trade_log
+        # Only count trades closed before the end
+        if trade_log['side'][-1] == BUY:
+            trade_log = trade_log[:-1]
+
+        trips = round_trips(trade_log)
+        final_cash = results.equity[0] + trips['pnl'].sum()
+        last_exit = trade_log['bar'][-1]
+        self.assertAlmostEqual(results.equity[last_exit], final_cash, places=6)
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
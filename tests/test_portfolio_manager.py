@@ -8,6 +8,9 @@ import numpy as np
 from src.risk.risk_manager import RiskManager
 from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
 from src.portfolio.portfolio_manager import PortfolioManager
+from src.strategies.precomputed_signal_strategy import PrecomputedSignalStrategy
+from src.regime.regime_filter import RegimeFilter
+from tests.helpers import make_ohlc_data
 
 class TestPortfolioManager(unittest.TestCase):
 
@@ -71,11 +74,105 @@ class TestPortfolioManager(unittest.TestCase):
             slippage_pct=slippage_pct # Pass in the new slippage parameter
         )
         results = portfolio_manager.run_backtest()
-        final_equity = results['equity'].iloc[-1]
+        final_equity = results.equity[-1]
 
         # --- 4. Assertion ---
         self.assertAlmostEqual(final_equity, expected_final_equity, places=2)
 
+    def test_engines_match_loop(self):
+        """
+        Tests that the vectorized and streaming engines reproduce the loop engine
+        exactly, including slippage, commission and the "only buy when flat" rule.
+        """
+        # --- 1. Setup: a random walk with many crossovers ---
+        data = make_ohlc_data(500, seed=42, freq=None, atr=None)
+
+        results = {}
+        for engine in ('loop', 'vectorized', 'stream'):
+            portfolio_manager = PortfolioManager(
+                data=data,
+                strategies={'default': MovingAverageCrossoverStrategy(short_window=3, long_window=8)},
+                risk_manager=RiskManager(),
+                commission_pct=0.001,
+                slippage_pct=0.0005,
+                engine=engine
+            )
+            results[engine] = portfolio_manager.run_backtest()
+
+        # --- 2. Assertions ---
+        for engine in ('vectorized', 'stream'):
+            np.testing.assert_array_equal(results['loop'].equity, results[engine].equity)
+            np.testing.assert_array_equal(results['loop'].trades, results[engine].trades)
+        self.assertGreater(len(results['loop'].trades), 10)
+
+    def test_intrabar_stop_orders(self):
+        """
+        Tests that stops trigger on the bar's low/high, fill at the stop price or
+        at the open when the bar gaps through it, and that the stop wins when a
+        bar reaches both levels.
+        """
+        data = pd.DataFrame({
+            'open':  [100.0, 100.0, 101.0, 99.0, 90.0, 95.0],
+            'high':  [101.0, 102.0, 103.0, 100.0, 91.0, 96.0],
+            'low':   [99.0, 99.0, 100.0, 97.0, 89.0, 94.0],
+            'close': [100.0, 101.0, 100.0, 98.0, 90.0, 95.0],
+            'atr':   [2.0, 2.0, 2.0, 2.0, 2.0, 2.0],
+        })
+        # Buy at the open of bar 1, never sell on a signal
+        signals = pd.Series([1.0, 0.0, 0.0, 0.0, 0.0, 0.0], index=data.index)
+
+        def exits(**stops):
+            portfolio_manager = PortfolioManager(
+                data=data, strategies={'default': PrecomputedSignalStrategy(signals)},
+                risk_manager=RiskManager(), engine='vectorized', **stops
+            )
+            portfolio_manager.run_backtest()
+            return [(t['bar'], t['price']) for t in portfolio_manager.trades if t['type'] == 'sell']
+
+        # Stop at 100 - 2 * 2 = 96: bar 4 gaps below it and fills at its open
+        self.assertEqual(exits(stop_loss=True), [(4, 90.0)])
+        # Target at 100 + 1 * 2 = 102 is reached intrabar on bar 1
+        self.assertEqual(exits(take_profit_atr_multiplier=1.0), [(1, 102.0)])
+        # Trailing 1 ATR below the previous highs: 102 - 2 = 100 on bar 2, reached by its low
+        self.assertEqual(exits(trailing_stop_atr_multiplier=1.0), [(2, 100.0)])
+        # Bar 2 reaches both a 102.5 target and the 100 trailing stop: the stop is taken
+        self.assertEqual(exits(take_profit_atr_multiplier=1.25, trailing_stop_atr_multiplier=1.0), [(2, 100.0)])
+
+        with self.assertRaises(ValueError):
+            PortfolioManager(data, {}, RiskManager(), engine='loop', stop_loss=True)
+
+    def test_regime_dispatch(self):
+        """
+        Tests that each bar takes its signal from the strategy of its regime,
+        with 'default' covering regimes that have no strategy.
+        """
+        data = make_ohlc_data(600, seed=5, freq=None, open_noise=0)
+        fast = MovingAverageCrossoverStrategy(short_window=3, long_window=8)
+        slow = MovingAverageCrossoverStrategy(short_window=10, long_window=30)
+        regime_filter = RegimeFilter(lookback_period=50)
+
+        portfolio_manager = PortfolioManager(data, {'default': fast, 'bear': slow}, RiskManager(),
+                                             regime_filter=regime_filter, engine='vectorized')
+        result = portfolio_manager.run_backtest()
+
+        bear = (regime_filter.get_regime_series(data) == 'bear').to_numpy()
+        expected = np.where(bear, slow.generate_signals(data)['signal'], fast.generate_signals(data)['signal'])
+        reference = PortfolioManager(data, {'default': PrecomputedSignalStrategy(pd.Series(expected, index=data.index))},
+                                     RiskManager(), engine='vectorized').run_backtest()
+        self.assertTrue(bear.any() and not bear.all())
+        np.testing.assert_array_equal(result.equity, reference.equity)
+        np.testing.assert_array_equal(result.trades, reference.trades)
+
+        loop = PortfolioManager(data, {'default': fast, 'bear': slow}, RiskManager(), regime_filter=regime_filter).run_backtest()
+        np.testing.assert_array_equal(loop.equity, result.equity)
+
+    def test_unknown_engine_is_rejected(self):
+        """
+        Tests that an unknown engine name raises an error.
+        """
+        with self.assertRaises(ValueError):
+            PortfolioManager(self.sample_data, {}, RiskManager(), engine='warp')
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -47,5 +47,19 @@ class TestRegimeFilter(unittest.TestCase):
         self.assertEqual(regime, 'bear')
 
 
+    def test_regime_series_matches_get_regime(self):
+        """
+        Tests that the per-bar regime series equals calling get_regime on the
+        data up to each bar, i.e. it has no lookahead.
+        """
+        rng = np.random.default_rng(0)
+        data = pd.DataFrame({'close': 100 + np.cumsum(rng.normal(0, 1, 300))})
+        regime_filter = RegimeFilter(lookback_period=20)
+
+        regimes = regime_filter.get_regime_series(data)
+        expected = [regime_filter.get_regime(data.iloc[:t + 1]) for t in range(len(data))]
+        self.assertEqual(regimes.tolist(), expected)
+        self.assertEqual(set(regimes), {'neutral', 'bull', 'bear'})
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+# tests/test_resampler.py
+
+import unittest
+import os
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+
+from src.data.market_store import MarketDataStore
+from src.data.resampler import OhlcvResampler, resample_ohlcv, align_to_timeframe, timeframe_to_timedelta
+
+def make_minute_bars(n_bars=3 * 24 * 60, seed=0):
+    """Creates random-walk minute bars, with a few missing minutes."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01', periods=n_bars, freq='min', name='timestamp').as_unit('ns')
+    close = 100 + np.cumsum(rng.normal(0, 0.1, n_bars))
+    df = pd.DataFrame({
+        'open': close + rng.normal(0, 0.05, n_bars),
+        'high': close + 0.2,
+        'low': close - 0.2,
+        'close': close,
+        'volume': rng.uniform(0, 10, n_bars),
+    }, index=index)
+    return df.drop(df.index[[5, 6, 700, 2000]])
+
+class TestResampler(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = MarketDataStore(os.path.join(self.temp_dir, 'store'))
+        self.minutes = make_minute_bars()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_matches_pandas_resample(self):
+        """Tests the single-pass resampler against pandas' groupby-based resample."""
+        expected = self.minutes.resample('4h').agg(
+            {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+        ).dropna()
+        pd.testing.assert_frame_equal(resample_ohlcv(self.minutes, '4h'), expected, check_freq=False, check_names=False)
+
+    def test_alignment_has_no_lookahead(self):
+        """
+        Tests that a daily value only reaches the hourly bars that close after
+        the day has closed.
+        """
+        hours = resample_ohlcv(self.minutes, '1h')
+        days = resample_ohlcv(self.minutes, '1d')
+        aligned = align_to_timeframe(days['close'], '1d', hours.index, '1h')
+
+        # The first day is unknown until its last hour closes
+        self.assertTrue(aligned.iloc[:23].isna().all())
+        self.assertEqual(aligned.iloc[23], days['close'].iloc[0])
+        self.assertEqual(aligned.iloc[24], days['close'].iloc[0])
+        # Every hour sees a day that closed no later than the hour itself
+        day_close = aligned.dropna().map(dict(zip(days['close'], days.index + timeframe_to_timedelta('1d'))))
+        self.assertTrue((day_close <= aligned.dropna().index + timeframe_to_timedelta('1h')).all())
+
+    def test_store_backed_cache(self):
+        """Tests that resampled frames are cached and refreshed when the base partition grows."""
+        self.store.write('BTC/USDT', '1m', self.minutes.iloc[:2000])
+        resampler = OhlcvResampler(self.store, base_timeframe='1m')
+
+        first = resampler.get('BTC/USDT', '1h')
+        self.assertIs(resampler.get('BTC/USDT', '1h'), first)
+        self.assertEqual((resampler.hits, resampler.misses), (1, 1))
+
+        self.store.append('BTC/USDT', '1m', self.minutes.iloc[2000:])
+        refreshed = resampler.get('BTC/USDT', '1h')
+        self.assertEqual(resampler.misses, 2)
+        pd.testing.assert_frame_equal(refreshed, resample_ohlcv(self.minutes, '1h'))
+
+    def test_empty_window(self):
+        """Tests that a window without base bars resamples and aligns to empty or NaN values."""
+        self.store.write('BTC/USDT', '1m', self.minutes)
+        resampler = OhlcvResampler(self.store, base_timeframe='1m')
+
+        empty = resampler.get('BTC/USDT', '1h', start='2025-01-01')
+        self.assertTrue(empty.empty)
+        self.assertEqual(list(empty.columns), list(self.minutes.columns))
+
+        hours = resample_ohlcv(self.minutes, '1h')
+        aligned = align_to_timeframe(empty['close'], '1h', hours.index, '1h')
+        self.assertTrue(aligned.index.equals(hours.index))
+        self.assertTrue(aligned.isna().all())
+        self.assertEqual(list(align_to_timeframe(empty, '1h', hours.index, '1h').columns), list(empty.columns))
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
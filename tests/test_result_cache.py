@@ -0,0 +1,185 @@
+# tests/test_result_cache.py
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+import numpy as np
+
+from src.optimization.parameter_sweep import ParameterSweep
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.portfolio.result_cache import ResultCache
+from src.risk.risk_manager import RiskManager
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+from src.strategies.precomputed_signal_strategy import PrecomputedSignalStrategy
+from src.strategies.sopr_ema_strategy import SoprEmaStrategy
+from tests.helpers import make_ohlc_data, add_sopr
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        """Create a random walk with SOPR and a temporary cache directory."""
+        self.data = add_sopr(make_ohlc_data(600, seed=17), seed=18)
+        self.root = tempfile.mkdtemp()
+        self.cache = ResultCache(self.root)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _portfolio_manager(self, data=None, commission_pct=0.001, cache=None):
+        return PortfolioManager(
+            self.data if data is None else data,
+            {'default': MovingAverageCrossoverStrategy(short_window=3, long_window=8)}, RiskManager(),
+            commission_pct=commission_pct, engine='vectorized', result_cache=cache or self.cache
+        )
+
+    def test_repeated_run_is_loaded_from_disk(self):
+        """Tests that an unchanged backtest is loaded, with the same equity and trades."""
+        first = self._portfolio_manager()
+        computed = first.run_backtest()
+        self.assertEqual(self.cache.hits, 0)
+
+        # A new process would start from an empty in-memory state
+        second = self._portfolio_manager(cache=ResultCache(self.root))
+        loaded = second.run_backtest()
+
+        self.assertEqual(second.result_cache.hits, 1)
+        np.testing.assert_array_equal(loaded.equity, computed.equity)
+        np.testing.assert_array_equal(loaded.trades, computed.trades)
+        self.assertTrue(loaded.trade_index.equals(computed.trade_index))
+        self.assertEqual(second.trades, first.trades)
+
+    def test_changed_inputs_miss(self):
+        """Tests that different data contents or run settings get a different key."""
+        base = self._portfolio_manager().cache_key()
+        changed = self.data.copy()
+        changed.iloc[300, changed.columns.get_loc('close')] += 1.0
+
+        self.assertEqual(self._portfolio_manager().cache_key(), base)
+        self.assertNotEqual(self._portfolio_manager(data=changed).cache_key(), base)
+        self.assertNotEqual(self._portfolio_manager(commission_pct=0.002).cache_key(), base)
+
+        risk_manager = RiskManager(risk_percentage=0.01)
+        manager = PortfolioManager(self.data, {'default': MovingAverageCrossoverStrategy(short_window=3, long_window=8)},
+                                   risk_manager, commission_pct=0.001, engine='vectorized', result_cache=self.cache)
+        self.assertNotEqual(manager.cache_key(), base)
+
+    def test_array_settings_are_keyed_by_content(self):
+        """
+        Tests that strategies differing only in an array or Series setting get
+        different keys and results, and that undescribable settings raise.
+        """
+        signals = MovingAverageCrossoverStrategy(short_window=3, long_window=8).generate_signals(self.data)['signal']
+        shifted = signals.shift(5, fill_value=0.0)
+
+        def manager(strategy):
+            return PortfolioManager(self.data, {'default': strategy}, RiskManager(), commission_pct=0.001,
+                                    engine='vectorized', result_cache=self.cache)
+
+        first = manager(PrecomputedSignalStrategy(signals))
+        second = manager(PrecomputedSignalStrategy(shifted))
+        self.assertNotEqual(first.cache_key(), second.cache_key())
+        self.assertEqual(first.cache_key(), manager(PrecomputedSignalStrategy(signals.copy())).cache_key())
+        self.assertNotEqual(manager(PrecomputedSignalStrategy(signals.to_numpy())).cache_key(),
+                            manager(PrecomputedSignalStrategy(shifted.to_numpy())).cache_key())
+
+        # Only the run with the same signals is loaded from the stored entry
+        expected = manager(PrecomputedSignalStrategy(shifted)).run_backtest()
+        self.assertFalse(np.array_equal(first.run_backtest().equity, expected.equity))
+        np.testing.assert_array_equal(second.run_backtest().equity, expected.equity)
+        self.assertEqual(self.cache.hits, 1)
+
+        with self.assertRaises(TypeError):
+            manager(PrecomputedSignalStrategy(object())).cache_key()
+
+    def test_object_columns_are_digested(self):
+        """Tests that string columns and indexes are hashed by their values."""
+        data = pd.DataFrame({'close': [1.0, 2.0], 'venue': ['a', 'b']}, index=pd.Index(['x', 'y'], dtype=object))
+        changed = data.copy()
+        changed.loc['y', 'venue'] = 'c'
+        renamed = data.set_axis(['x', 'z'])
+
+        digest = ResultCache.data_digest(data)
+        self.assertEqual(ResultCache.data_digest(data.copy()), digest)
+        self.assertNotEqual(ResultCache.data_digest(changed), digest)
+        self.assertNotEqual(ResultCache.data_digest(renamed), digest)
+
+    def test_sweep_hashes_data_once(self):
+        """Tests that a cached sweep hashes its data once, not once per configuration."""
+        ranges = {'short_window': [3, 5], 'long_window': [8, 13]}
+        with mock.patch.object(ResultCache, 'data_digest', side_effect=ResultCache.data_digest) as data_digest:
+            ParameterSweep(self.data, MovingAverageCrossoverStrategy, ranges, max_workers=1,
+                           result_cache=self.cache).run()
+        self.assertEqual(data_digest.call_count, 1)
+        self.assertEqual(len(self.cache._entries()), 8)
+
+    def test_compact_results_round_trip(self):
+        """Tests that downsampled float32 results are stored and restored as they were."""
+        result = self._portfolio_manager().run_backtest().compact(max_points=50)
+        self.cache.save_result('compact', result)
+        loaded = self.cache.load_result('compact', self.data.index)
+
+        self.assertEqual(loaded.equity.dtype, np.float32)
+        self.assertTrue(loaded.is_downsampled)
+        np.testing.assert_array_equal(loaded.bars, result.bars)
+        self.assertTrue(loaded.index.equals(result.index))
+        self.assertEqual(loaded.n_bars, len(self.data))
+        self.assertEqual(loaded.max_drawdown, result.max_drawdown)
+
+    def test_size_bounded_eviction(self):
+        """Tests that the least recently used entries are evicted beyond the size cap."""
+        frame = pd.DataFrame({'signal': np.ones(1000)})
+        self.cache.save_frame('first', frame)
+        entry_size = os.path.getsize(self.cache.path('first'))
+        cache = ResultCache(self.root, max_bytes=int(entry_size * 2.5))
+
+        cache.save_frame('second', frame)
+        # Make the entries' ages unambiguous, then use the oldest one
+        os.utime(cache.path('first'), (1000, 1000))
+        os.utime(cache.path('second'), (2000, 2000))
+        self.assertIsNotNone(cache.load_frame('first', frame.index))
+        cache.save_frame('third', frame)
+
+        self.assertTrue(os.path.exists(cache.path('first')))
+        self.assertFalse(os.path.exists(cache.path('second')))
+        self.assertTrue(os.path.exists(cache.path('third')))
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+
+    def test_overlapping_sweep_only_computes_new_points(self):
+        """
+        Tests that a sweep overlapping an earlier one loads the shared points and
+        that the results equal an uncached sweep, in batched and per-config mode.
+        """
+        ranges = {'short_ema': [5, 8], 'long_ema': [13, 21], 'regime_ma': [20]}
+        ParameterSweep(self.data, SoprEmaStrategy, ranges, batched=True, result_cache=self.cache).run()
+        self.assertEqual(len(self.cache._entries()), 4)
+
+        wider = dict(ranges, long_ema=[13, 21, 34])
+        cached = ParameterSweep(self.data, SoprEmaStrategy, wider, batched=True, result_cache=self.cache).run()
+        self.assertEqual(self.cache.hits, 4)
+        self.assertEqual(len(self.cache._entries()), 6)
+
+        uncached = ParameterSweep(self.data, SoprEmaStrategy, wider, max_workers=1).run()
+        keys = list(wider)
+        pd.testing.assert_frame_equal(cached.sort_values(keys).reset_index(drop=True),
+                                      uncached.sort_values(keys).reset_index(drop=True))
+
+        # Per-config runs share the batched runs' entries
+        ParameterSweep(self.data, SoprEmaStrategy, wider, max_workers=1, result_cache=ResultCache(self.root)).run()
+        self.assertEqual(len(self.cache._entries()), 6)
+
+    def test_from_config(self):
+        """Tests reading the cache location and size cap from a [Cache] section."""
+        path = os.path.join(self.root, 'config.ini')
+        with open(path, 'w') as f:
+            f.write("[Cache]\ndirectory = results\nmax_mb = 2\n")
+        cache = ResultCache.from_config(path)
+
+        self.assertEqual(cache.root, 'results')
+        self.assertEqual(cache.max_bytes, 2 * 1024 ** 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
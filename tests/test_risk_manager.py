@@ -2,6 +2,7 @@
 
 import unittest
 import configparser
+import numpy as np
 from src.risk.risk_manager import RiskManager
 
 class TestRiskManager(unittest.TestCase):
@@ -44,5 +45,44 @@ class TestRiskManager(unittest.TestCase):
         self.assertAlmostEqual(actual_stop_loss_price, expected_stop_loss_price, places=7)
 
 
+    def test_size_positions_matches_scalar(self):
+        """
+        Tests that the array API sizes every entry exactly like the scalar call,
+        including the zero-risk guard.
+        """
+        risk_manager = RiskManager()
+        entry_price = np.array([50000.0, 3000.0, 100.0, 20.0])
+        atr = np.array([1500.0, 90.0, 0.0, np.nan])
+        balance = np.array([100000.0, 50000.0, 10000.0, 10000.0])
+
+        sizes, stops = risk_manager.size_positions(balance, entry_price, atr)
+        for k in range(len(entry_price)):
+            expected = risk_manager.calculate_trade_parameters(balance[k], 0.02, entry_price[k], atr[k], 2.0)
+            self.assertEqual((sizes[k], stops[k]), expected)
+        np.testing.assert_array_equal(sizes[2:], [0.0, 0.0])
+
+    def test_sizing_models(self):
+        """Tests the volatility-target and Kelly sizing models."""
+        volatility = RiskManager(sizing_model='volatility_target', target_volatility=0.01)
+        sizes, _ = volatility.size_positions(100000.0, np.array([50000.0]), np.array([1000.0]))
+        # One ATR move of the position is worth 1% of the balance
+        self.assertAlmostEqual(sizes[0] * 1000.0, 1000.0)
+
+        kelly = RiskManager(sizing_model='kelly', kelly_win_rate=0.6, kelly_payoff_ratio=2.0, kelly_scale=0.5)
+        sizes, stops = kelly.size_positions(100000.0, np.array([50000.0]), np.array([1000.0]))
+        self.assertAlmostEqual(sizes[0] * (50000.0 - stops[0]), 100000.0 * 0.5 * (0.6 - 0.4 / 2.0))
+
+        with self.assertRaises(ValueError):
+            RiskManager(sizing_model='martingale')
+
+    def test_from_config(self):
+        """Tests that the risk settings are read from config.ini."""
+        config = configparser.ConfigParser()
+        config.read('config.ini')
+        risk_manager = RiskManager.from_config('config.ini')
+        self.assertEqual(risk_manager.risk_percentage, config.getfloat('Risk', 'risk_percentage'))
+        self.assertEqual(risk_manager.sizing_model, config.get('Risk', 'sizing_model'))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,90 @@
+# tests/test_stage_profiler.py
+
+import unittest
+import os
+import pstats
+import tempfile
+import numpy as np
+
+from src.profiling.stage_profiler import StageProfiler, profiler
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.risk.risk_manager import RiskManager
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+from src.indicators.indicator_store import IndicatorStore
+from tests.helpers import make_ohlc_data
+
+class TestStageProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.data = make_ohlc_data(300, seed=4, freq=None, open_noise=0)
+        profiler.reset()
+
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+
+    def _run_backtest(self):
+        portfolio_manager = PortfolioManager(
+            data=self.data,
+            strategies={'default': MovingAverageCrossoverStrategy(3, 8, indicator_store=IndicatorStore())},
+            risk_manager=RiskManager()
+        )
+        portfolio_manager.run_backtest()
+        return portfolio_manager
+
+    def test_records_every_stage_of_a_backtest(self):
+        """
+        Tests that an enabled profiler records wall time and call counts for the
+        strategy, risk sizing and execution stages.
+        """
+        profiler.enable(track_allocations=True)
+        portfolio_manager = self._run_backtest()
+        profiler.disable()
+
+        summary = profiler.summary()
+        for stage in ('run_backtest', 'generate_signals:MovingAverageCrossoverStrategy', 'execution:loop', 'indicator:sma'):
+            self.assertIn(stage, summary.index)
+        self.assertEqual(summary.loc['run_backtest', 'calls'], 1)
+        self.assertEqual(summary.loc['indicator:sma', 'calls'], 2)
+        buys = sum(1 for trade in portfolio_manager.trades if trade['type'] == 'buy')
+        self.assertEqual(summary.loc['risk_sizing', 'calls'], buys)
+        # The whole run takes at least as long, and peaks at least as high, as any stage within it
+        self.assertGreaterEqual(summary.loc['run_backtest', 'seconds'], summary.loc['execution:loop', 'seconds'])
+        self.assertGreaterEqual(summary.loc['run_backtest', 'peak_mb'], summary.loc['generate_signals:MovingAverageCrossoverStrategy', 'peak_mb'])
+
+    def test_disabled_profiler_records_nothing(self):
+        """Tests that nothing is recorded while the profiler is off."""
+        self._run_backtest()
+        self.assertTrue(profiler.summary().empty)
+
+    def test_nested_peak_memory(self):
+        """Tests that an outer stage's peak includes memory allocated before a nested stage."""
+        local = StageProfiler()
+        local.enable(track_allocations=True)
+        with local.stage('outer'):
+            big = np.ones(2_000_000)
+            del big
+            with local.stage('inner'):
+                small = np.ones(1000)
+        local.disable()
+
+        summary = local.summary()
+        self.assertGreater(summary.loc['outer', 'peak_mb'], 15)
+        self.assertLess(summary.loc['inner', 'peak_mb'], 1)
+        self.assertGreaterEqual(summary.loc['inner', 'peak_mb'], small.nbytes / 1024 ** 2)
+
+    def test_cprofile_dump(self):
+        """Tests that the cProfile dump is a readable pstats file."""
+        profiler.enable(cprofile=True)
+        self._run_backtest()
+        profiler.disable()
+
+        path = os.path.join(tempfile.mkdtemp(), 'run.pstats')
+        profiler.dump_cprofile(path)
+        stats = pstats.Stats(path)
+        self.assertTrue(any(func[2] == 'run_backtest' for func in stats.stats))
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
@@ -2,7 +2,11 @@
 
 import unittest
 import pandas as pd
+import numpy as np
 from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+from src.strategies.sopr_ema_strategy import SoprEmaStrategy
+from src.strategies.asymmetrical_ema_strategy import AsymmetricalEmaStrategy
+from src.strategies.strategy_contract import read_only_view
 
 class TestMovingAverageCrossoverStrategy(unittest.TestCase):
 
@@ -44,5 +48,90 @@ class TestMovingAverageCrossoverStrategy(unittest.TestCase):
         total_signals = signals['signal'].abs().sum()
         self.assertEqual(total_signals, 2.0)
 
+class TestSignalStreams(unittest.TestCase):
+
+    def setUp(self):
+        """Create a long random walk with SOPR oscillating around 1."""
+        rng = np.random.default_rng(5)
+        self.data = pd.DataFrame({
+            'close': 10000 + np.cumsum(rng.normal(0, 150, 1500)),
+            'sopr': 1 + 0.03 * np.sin(np.arange(1500) / 15) + rng.normal(0, 0.01, 1500),
+        }, index=pd.date_range('2019-01-01', periods=1500, freq='D'))
+
+    def test_streams_match_batch_signals(self):
+        """
+        Tests that feeding the bars one at a time through each strategy's stream
+        produces the same signals as generate_signals over the whole history.
+        """
+        strategies = [
+            SoprEmaStrategy(),
+            AsymmetricalEmaStrategy(),
+            MovingAverageCrossoverStrategy(short_window=5, long_window=20),
+        ]
+        for strategy in strategies:
+            expected = strategy.generate_signals(self.data)['signal'].to_numpy()
+
+            stream = strategy.start_stream()
+            actual = np.array([stream.update(bar) for bar in self.data.to_dict('records')])
+
+            np.testing.assert_array_equal(actual, expected)
+            self.assertGreater(np.nansum(np.abs(expected)), 0)
+
+    def test_batched_signals_match_per_config_signals(self):
+        """
+        Tests that generate_signals_batch gives every parameter set exactly the
+        signals of its own generate_signals run, across block boundaries.
+        """
+        param_sets = [
+            {'short_ema': short, 'long_ema': long, 'regime_ma': regime, 'sopr_threshold': threshold}
+            for short in (8, 21) for long in (34, 55) for regime in (100, 200) for threshold in (0.99, 1.0)
+        ]
+        batch = SoprEmaStrategy().generate_signals_batch(self.data, param_sets, block_size=3)
+
+        self.assertEqual(batch.shape, (len(self.data), len(param_sets)))
+        for k, params in enumerate(param_sets):
+            expected = SoprEmaStrategy(**params).generate_signals(self.data)['signal'].to_numpy()
+            np.testing.assert_array_equal(batch[k].to_numpy(), expected)
+        self.assertGreater(np.nansum(np.abs(batch.to_numpy())), 0)
+
+        with self.assertRaises(ValueError):
+            SoprEmaStrategy().generate_signals_batch(self.data, [{'short_window': 5}])
+
+    def test_strategies_do_not_mutate_inputs(self):
+        """
+        Tests the strategy contract: generate_signals only reads its input, works
+        on a read-only view of it and returns just the signal unless asked for
+        the indicators.
+        """
+        strategies = [
+            SoprEmaStrategy(),
+            AsymmetricalEmaStrategy(),
+            MovingAverageCrossoverStrategy(short_window=5, long_window=20),
+        ]
+        original = self.data.copy()
+        for strategy in strategies:
+            with self.subTest(strategy=type(strategy).__name__):
+                signals = strategy.generate_signals(self.data)
+                pd.testing.assert_frame_equal(self.data, original)
+                self.assertEqual(list(signals.columns), ['signal'])
+
+                # Build the input over writable buffers: Series.to_numpy() is
+                # read-only under copy-on-write anyway and would prove nothing.
+                buffers = {column: self.data[column].to_numpy().copy() for column in self.data.columns}
+                writable = pd.DataFrame(buffers, index=self.data.index, copy=False)
+                view = read_only_view(writable)
+                for values in view._mgr.arrays:
+                    self.assertFalse(values.flags.writeable)
+                    self.assertTrue(any(np.shares_memory(values, buffer) for buffer in buffers.values()))
+                with self.assertRaises(ValueError):
+                    view.iloc[0, view.columns.get_loc('close')] = 0.0
+                pd.testing.assert_frame_equal(writable, original)
+
+                from_view = strategy.generate_signals(view, return_indicators=True)
+                pd.testing.assert_series_equal(from_view['signal'], signals['signal'])
+                self.assertGreater(len(from_view.columns), 1)
+                self.assertEqual(list(view.columns), list(original.columns))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,65 @@
+# tests/test_walk_forward.py
+
+import unittest
+import pandas as pd
+import numpy as np
+
+from src.strategies.ma_crossover_strategy import MovingAverageCrossoverStrategy
+from src.optimization.walk_forward import WalkForwardOptimizer
+from src.risk.risk_manager import RiskManager
+from tests.helpers import make_ohlc_data
+
+class TestWalkForwardOptimizer(unittest.TestCase):
+
+    def setUp(self):
+        """Create a random walk long enough for several folds."""
+        self.data = make_ohlc_data(700, seed=9, drift=0.05, open_noise=0.3)
+        self.param_ranges = {'short_window': [3, 5, 8], 'long_window': [15, 30], 'risk_percentage': [0.01, 0.02]}
+
+    def test_folds_roll_forward_without_overlapping_tests(self):
+        """Tests the positional train/test windows."""
+        optimizer = WalkForwardOptimizer(self.data, MovingAverageCrossoverStrategy, self.param_ranges,
+                                         train_bars=300, test_bars=100)
+        folds = optimizer.folds()
+
+        self.assertEqual(len(folds), 4)
+        self.assertEqual(folds[0], {'train': (0, 300), 'test': (300, 400)})
+        self.assertEqual(folds[-1], {'train': (300, 600), 'test': (600, 700)})
+
+    def test_parallel_run_stitches_out_of_sample_equity(self):
+        """
+        Tests that folds run in parallel give the same result as in-process, and
+        that the stitched equity covers exactly the test windows, chained end to end.
+        """
+        kwargs = dict(train_bars=300, test_bars=100, commission_pct=0.001)
+        serial_equity, serial_report = WalkForwardOptimizer(
+            self.data, MovingAverageCrossoverStrategy, self.param_ranges, max_workers=1, **kwargs).run()
+        equity, report = WalkForwardOptimizer(
+            self.data, MovingAverageCrossoverStrategy, self.param_ranges, max_workers=2, **kwargs).run()
+
+        pd.testing.assert_series_equal(equity, serial_equity)
+        pd.testing.assert_frame_equal(report, serial_report)
+
+        self.assertEqual(len(equity), 400)
+        self.assertEqual(equity.index[0], self.data.index[300])
+        self.assertEqual(list(report.columns[3:6]), ['short_window', 'long_window', 'risk_percentage'])
+        # The stitched return compounds the per-fold test returns
+        compounded = np.prod(1 + report['test_return_pct'] / 100)
+        self.assertAlmostEqual(equity.iloc[-1] / 100000.0, compounded)
+
+    def test_risk_manager_settings_reach_every_fold(self):
+        """Tests that the optimizer's risk manager sizes the folds' backtests, in workers too."""
+        kwargs = dict(train_bars=300, test_bars=100, risk_manager=RiskManager(stop_loss_atr_multiplier=4.0))
+        serial_equity, _ = WalkForwardOptimizer(
+            self.data, MovingAverageCrossoverStrategy, self.param_ranges, max_workers=1, **kwargs).run()
+        equity, _ = WalkForwardOptimizer(
+            self.data, MovingAverageCrossoverStrategy, self.param_ranges, max_workers=2, **kwargs).run()
+        default_equity, _ = WalkForwardOptimizer(
+            self.data, MovingAverageCrossoverStrategy, self.param_ranges, max_workers=1, train_bars=300, test_bars=100).run()
+
+        pd.testing.assert_series_equal(equity, serial_equity)
+        self.assertFalse(np.allclose(equity.to_numpy(), default_equity.to_numpy()))
+
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file